@@ -0,0 +1,124 @@
+"""Per-user range scan timings on expenses_tracker with and without the migration indexes.
+
+Seeds a scratch copy of the table in the configured database, times the
+queries the tabs run most, applies the indexes from migration 0001 and times
+them again. The scratch table is dropped afterwards.
+
+    python -m benchmarks.range_scan_benchmark --rows 500000 --users 200
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+from pages.common.db_pool import get_db_connection
+from pages.common.migrations import EXPENSE_INDEXES, create_index
+
+TABLE = "bench_expenses_tracker"
+CATEGORIES = ["Food", "Rent", "Transport", "Utilities", "Leisure", "Health", "Shopping", "Travel"]
+
+QUERIES = {
+    "month total": (
+        f"SELECT COALESCE(SUM(amount), 0) FROM {TABLE} WHERE user_id = %s AND date >= %s AND date < %s",
+        lambda user_id: (user_id, date(2024, 3, 1), date(2024, 4, 1)),
+    ),
+    "month by category": (
+        f"SELECT category, SUM(amount) FROM {TABLE} "
+        f"WHERE user_id = %s AND date >= %s AND date < %s GROUP BY category",
+        lambda user_id: (user_id, date(2024, 3, 1), date(2024, 4, 1)),
+    ),
+    "category year": (
+        f"SELECT COALESCE(SUM(amount), 0) FROM {TABLE} "
+        f"WHERE user_id = %s AND category = %s AND date >= %s AND date < %s",
+        lambda user_id: (user_id, "Food", date(2024, 1, 1), date(2025, 1, 1)),
+    ),
+}
+
+
+def seed(cursor, connection, rows, users, chunk_size=5000):
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+        CREATE TABLE {TABLE} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            amount DECIMAL(10, 2) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            date DATE NOT NULL,
+            user_id INT NOT NULL
+        )
+    """)
+    rng = random.Random(42)
+    start = date(2019, 1, 1)
+    query = f"INSERT INTO {TABLE} (description, amount, category, date, user_id) VALUES (%s, %s, %s, %s, %s)"
+    batch = []
+    for i in range(rows):
+        batch.append((
+            f"expense {i}",
+            round(rng.uniform(1, 500), 2),
+            rng.choice(CATEGORIES),
+            start + timedelta(days=rng.randrange(6 * 365)),
+            rng.randrange(1, users + 1),
+        ))
+        if len(batch) >= chunk_size:
+            cursor.executemany(query, batch)
+            batch = []
+    if batch:
+        cursor.executemany(query, batch)
+    connection.commit()
+
+
+def run_queries(cursor, users, repeat):
+    results = {}
+    rng = random.Random(7)
+    sample = [rng.randrange(1, users + 1) for _ in range(repeat)]
+    for label, (sql, params_for) in QUERIES.items():
+        cursor.execute("EXPLAIN " + sql, params_for(sample[0]))
+        columns = [c[0] for c in cursor.description]
+        plan = dict(zip(columns, cursor.fetchone()))
+
+        started = time.perf_counter()
+        for user_id in sample:
+            cursor.execute(sql, params_for(user_id))
+            cursor.fetchall()
+        elapsed = (time.perf_counter() - started) / len(sample)
+        results[label] = (elapsed, plan.get("key"), plan.get("rows"))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    try:
+        print(f"Seeding {args.rows} rows for {args.users} users...")
+        seed(cursor, connection, args.rows, args.users)
+        cursor.execute(f"ANALYZE TABLE {TABLE}")
+        cursor.fetchall()
+        before = run_queries(cursor, args.users, args.repeat)
+
+        for name, columns in EXPENSE_INDEXES:
+            cursor.execute(create_index(TABLE, name, columns))
+        cursor.execute(f"ANALYZE TABLE {TABLE}")
+        cursor.fetchall()
+        after = run_queries(cursor, args.users, args.repeat)
+
+        print(f"{'query':<20}{'before ms':>12}{'after ms':>12}{'speedup':>10}  rows examined / key")
+        for label in QUERIES:
+            b_time, b_key, b_rows = before[label]
+            a_time, a_key, a_rows = after[label]
+            print(
+                f"{label:<20}{b_time * 1000:>12.2f}{a_time * 1000:>12.2f}{b_time / a_time:>9.1f}x"
+                f"  {b_rows} ({b_key or 'full scan'}) -> {a_rows} ({a_key})"
+            )
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Occurrence generation throughput of pages.common.recurrence.
+
+Expands a random mix of schedules over a date window in one bulk call and
+compares it with stepping through the dates one at a time in Python, after
+checking that both agree on a sample. No database is needed.
+
+    python -m benchmarks.recurrence_benchmark --schedules 20000 --years 10
+"""
+import argparse
+import calendar
+import random
+import time
+from datetime import date, timedelta
+from pages.common.recurrence import FREQUENCIES, expand, step
+
+
+def step_dates(anchor, frequency, start, end):
+    """Reference: one occurrence at a time, clamping the day to the month"""
+    count, unit = step(frequency)
+    dates = []
+    k = 0
+    while True:
+        if unit == "D":
+            current = anchor + timedelta(days=k * count)
+        else:
+            months = anchor.month - 1 + k * count
+            year, month = anchor.year + months // 12, months % 12 + 1
+            current = date(year, month, min(anchor.day, calendar.monthrange(year, month)[1]))
+        if current > end:
+            return dates
+        if current >= start:
+            dates.append(current)
+        k += 1
+
+
+def make_schedules(count, years, seed=42):
+    rng = random.Random(seed)
+    origin = date(2015, 1, 1)
+    anchors = [origin + timedelta(days=rng.randrange(5 * 365)) for _ in range(count)]
+    frequencies = [rng.choice(FREQUENCIES) for _ in range(count)]
+    starts = [anchor for anchor in anchors]
+    ends = [anchor + timedelta(days=years * 365) for anchor in anchors]
+    return anchors, frequencies, starts, ends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schedules", type=int, default=20000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--reference", type=int, default=2000,
+                        help="schedules to run through the one-at-a-time loop")
+    args = parser.parse_args()
+
+    anchors, frequencies, starts, ends = make_schedules(args.schedules, args.years)
+
+    started = time.perf_counter()
+    indexes, dates = expand(anchors, frequencies, starts, ends)
+    bulk_seconds = time.perf_counter() - started
+    bulk_rate = len(dates) / bulk_seconds
+
+    sample = min(args.reference, args.schedules)
+    started = time.perf_counter()
+    expected = [step_dates(anchors[i], frequencies[i], starts[i], ends[i]) for i in range(sample)]
+    loop_seconds = time.perf_counter() - started
+    loop_count = sum(len(occurrences) for occurrences in expected)
+    loop_rate = loop_count / loop_seconds
+
+    in_sample = indexes < sample
+    got = [[] for _ in range(sample)]
+    for index, occurrence in zip(indexes[in_sample].tolist(), dates[in_sample].tolist()):
+        got[index].append(occurrence)
+    if got != expected:
+        mismatch = next(i for i in range(sample) if got[i] != expected[i])
+        raise SystemExit(f"Bulk and loop disagree for schedule {mismatch} "
+                         f"({anchors[mismatch]}, {frequencies[mismatch]})")
+
+    print(f"{'method':<10}{'occurrences':>14}{'seconds':>10}{'occurrences/s':>16}")
+    print(f"{'bulk':<10}{len(dates):>14}{bulk_seconds:>10.3f}{bulk_rate:>16,.0f}")
+    print(f"{'loop':<10}{loop_count:>14}{loop_seconds:>10.3f}{loop_rate:>16,.0f}")
+    print(f"Bulk is {bulk_rate / loop_rate:.1f}x faster per occurrence; "
+          f"{sample} schedules matched the loop exactly")
+
+
+if __name__ == "__main__":
+    main()
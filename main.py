@@ -1,23 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
+import importlib
 import sys
 import time
-import threading
-
-from pages.income_tracking.income_tracking_tab import create_income_tracking_tab
-from pages.expense_tracking.expense_tracking_tab import create_expense_tracking_tab
-from pages.budget_tool.budget_tool_tab import create_budget_tool_tab
-from pages.financial_data_visualization.financial_data_visualization_tab import create_financial_data_visualization_tab
-from pages.recurring_transactions.recurring_transactions_tab import create_recurring_transactions_tab
-from pages.alerts_and_reminder.alerts_and_reminder_tab import create_alerts_and_reminder_tab
-from pages.data_export_and_import.data_export_and_import_tab import create_data_export_and_import_tab
-from pages.dashboard.dashboard_tab import create_dashboard_tab
-from pages.home.home_tab import create_home_tab
-from pages.ai_insights.ai_insights_tab import create_ai_insights_tab
+
 from pages.auth.auth_window import AuthWindow
-from pages.income_tracking.database import process_recurring_income
-from pages.currency_exchange.currency_exchange_tab import create_currency_exchange_tab
+from pages.income_tracking.database import SCHEDULE_TOPIC, get_recurring_due_dates, process_recurring_income
+from pages.recurring_transactions import database as recurring_expenses
+from pages.common.cache import get_cache_metrics
+from pages.common.db_pool import get_pool_metrics
+from pages.common import executor, notifications
+from pages.common.scheduler import DueDateScheduler
+from pages.common.lazy_tabs import LazyNotebook
+
+
+def load_tab(module, name):
+    """Import a tab module when its tab is first built, so heavy dependencies
+    (matplotlib, pandas, reportlab, speech) stay out of startup"""
+    return getattr(importlib.import_module(f"pages.{module}"), name)
 
 
 def main(user_id=None):
@@ -25,61 +26,64 @@ def main(user_id=None):
         print("No user logged in")
         return
 
+    started = time.perf_counter()
     root = tk.Tk()
     root.title(f"Personal Finance Management System - User ID: {user_id}")
 
-    # Create a flag to control the processor thread
-    stop_processor = False
+    # Database calls from the tabs run in the background and report back here
+    executor.install(root)
+    # Alerts raised by background writes are shown from the Tk thread
+    notifications.install(root, messagebox.showwarning)
+
+    # Recurring income is posted when a schedule falls due; the scheduler
+    # sleeps until then and is woken when a schedule is added or edited
+    income_scheduler = DueDateScheduler(SCHEDULE_TOPIC, get_recurring_due_dates, process_recurring_income)
+    # Recurring expenses are recorded the same way; until then they are
+    # projected on read
+    expense_scheduler = DueDateScheduler(
+        recurring_expenses.SCHEDULE_TOPIC,
+        recurring_expenses.get_recurring_due_dates,
+        recurring_expenses.process_recurring_transactions
+    )
 
     def on_closing():
         """Handle application closing"""
         if messagebox.askyesno("Quit", "Are you sure you want to quit?"):
-            nonlocal stop_processor
-            stop_processor = True  # Signal thread to stop
+            income_scheduler.stop()
+            expense_scheduler.stop()
+            print(f"[{datetime.now()}] Database pool metrics: {get_pool_metrics()}")
+            print(f"[{datetime.now()}] Query cache metrics: {get_cache_metrics()}")
+            executor.shutdown()
             root.destroy()  # Destroy immediately - the daemon thread will be terminated
             sys.exit(0)  # Force exit the application
             
-    def recurring_income_processor():
-        """Process recurring incomes while the application is running"""
-        print(f"[{datetime.now()}] Starting recurring income processor...")
-
-        while not stop_processor:
-            try:
-                success, message = process_recurring_income()
-                if success:
-                    print(f"[{datetime.now()}] {message}")
-                else:
-                    print(f"[{datetime.now()}] Warning: {message}")
-            except Exception as e:
-                print(f"[{datetime.now()}] Error in recurring income processor: {e}")
-
-            # Sleep for 5 seconds between checks
-            try:
-                time.sleep(5) 
-            except (KeyboardInterrupt, SystemExit):
-                print(f"[{datetime.now()}] Stopping recurring income processor...")
-                break
-
-    # Start the recurring income processor in a daemon thread
-    processor_thread = threading.Thread(target=recurring_income_processor, daemon=True)
-    processor_thread.start()
-    print(f"[{datetime.now()}] Recurring income processor thread started")
+    income_scheduler.start()
+    expense_scheduler.start()
 
     notebook = ttk.Notebook(root)
     notebook.pack(fill=tk.BOTH, expand=True)
 
-    # Pass user_id to all tab creation functions
-    create_home_tab(notebook, user_id)
-    create_dashboard_tab(notebook, user_id)
-    create_income_tracking_tab(notebook, user_id)
-    create_expense_tracking_tab(notebook, user_id)
-    create_budget_tool_tab(notebook, user_id)
-    create_financial_data_visualization_tab(notebook, user_id)
-    create_recurring_transactions_tab(notebook, user_id)
-    create_alerts_and_reminder_tab(notebook, user_id)
-    create_data_export_and_import_tab(notebook, user_id)
-    create_ai_insights_tab(notebook, user_id)
-    create_currency_exchange_tab(notebook)
+    # Tabs are placeholders until first selected, so startup only builds Home
+    tabs = LazyNotebook(notebook)
+    tabs.register("Home", lambda: load_tab("home.home_tab", "create_home_tab")(notebook, user_id))
+    tabs.register("Dashboard", lambda: load_tab("dashboard.dashboard_tab", "create_dashboard_tab")(notebook, user_id))
+    tabs.register("Income Tracking", lambda: load_tab("income_tracking.income_tracking_tab", "create_income_tracking_tab")(notebook, user_id))
+    tabs.register("Expense Tracking", lambda: load_tab("expense_tracking.expense_tracking_tab", "create_expense_tracking_tab")(notebook, user_id))
+    tabs.register("Budget Tool", lambda: load_tab("budget_tool.budget_tool_tab", "create_budget_tool_tab")(notebook, user_id))
+    tabs.register("Financial Data Visualization", lambda: load_tab("financial_data_visualization.financial_data_visualization_tab", "create_financial_data_visualization_tab")(notebook, user_id))
+    tabs.register("Recurring Expenses", lambda: load_tab("recurring_transactions.recurring_transactions_tab", "create_recurring_transactions_tab")(notebook, user_id))
+    tabs.register("Alerts and Reminder", lambda: load_tab("alerts_and_reminder.alerts_and_reminder_tab", "create_alerts_and_reminder_tab")(notebook, user_id))
+    tabs.register("Data Export and Import", lambda: load_tab("data_export_and_import.data_export_and_import_tab", "create_data_export_and_import_tab")(notebook, user_id))
+    tabs.register("AI Insights", lambda: load_tab("ai_insights.ai_insights_tab", "create_ai_insights_tab")(notebook, user_id))
+    tabs.register("Currency Exchange", lambda: load_tab("currency_exchange.currency_exchange_tab", "create_currency_exchange_tab")(notebook))
+    tabs.build_current()
+
+    def report_startup():
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[{datetime.now()}] First interactive frame after {elapsed:.0f} ms")
+
+    # Runs once the window has been drawn and the event loop is idle
+    root.after_idle(report_startup)
 
     # Set up clean shutdown
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -88,7 +92,8 @@ def main(user_id=None):
         root.mainloop()
     except KeyboardInterrupt:
         print("\nReceived keyboard interrupt, shutting down...")
-        stop_processor = True
+        income_scheduler.stop()
+        expense_scheduler.stop()
         root.destroy()
         sys.exit(0)
 
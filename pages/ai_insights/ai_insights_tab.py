@@ -1,11 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
-import requests
-import pyttsx3
 import os
 import threading
-import speech_recognition as sr
 from dotenv import load_dotenv
 from pages.ai_insights.database import (
     get_income_tracker,
@@ -16,6 +13,7 @@ from pages.ai_insights.database import (
     get_expenses_category,
 )
 from pages.ai_insights.database import get_fixed_queries, add_fixed_query, delete_fixed_query
+from pages.common.executor import LatestRequest, submit
 
 tts_thread = None
 stop_reading_flag = False
@@ -30,11 +28,21 @@ load_dotenv()
 API_KEY = os.getenv("OPENAI_API_KEY")
 API_URL = "https://api.openai.com/v1/chat/completions"
 
-tts_engine = pyttsx3.init()
+# Created on the first Read Aloud; pyttsx3.init() loads the platform speech
+# driver, which is too slow to pay for on every start
+tts_engine = None
+
+def get_tts_engine():
+    global tts_engine
+    if tts_engine is None:
+        import pyttsx3
+        tts_engine = pyttsx3.init()
+    return tts_engine
 
 def voice_input(voice_button, query_text):
     """Capture voice input and transcribe it into the query input field."""
     global is_listening
+    import speech_recognition as sr
 
     recognizer = sr.Recognizer()
 
@@ -93,10 +101,14 @@ def create_ai_insights_tab(notebook, user_id):
     fixed_queries_frame.pack(side="left", fill="both", expand=True, padx=(0, 10))
 
     queries = []
+    queries_loader = LatestRequest()
+    ai_loader = LatestRequest()
 
     def load_fixed_queries():
+        queries_loader.submit(get_fixed_queries, user_id, on_success=show_fixed_queries)
+
+    def show_fixed_queries(queries):
         fixed_queries_tree.delete(*fixed_queries_tree.get_children())
-        queries = get_fixed_queries(user_id)
         for query in queries:
             fixed_queries_tree.insert("", "end", values=(query[1], query[0]))
 
@@ -104,8 +116,7 @@ def create_ai_insights_tab(notebook, user_id):
         """Add a new query to the user's saved queries."""
         new_query = user_input.get("1.0", tk.END).strip()
         if new_query:
-            add_fixed_query(user_id, new_query)
-            load_fixed_queries()
+            submit(add_fixed_query, user_id, new_query, on_success=lambda _: load_fixed_queries())
 
     add_button = ttk.Button(fixed_queries_frame, text="Add Query", command=add_query)
     add_button.pack(pady=5)
@@ -115,8 +126,7 @@ def create_ai_insights_tab(notebook, user_id):
         selected_item = fixed_queries_tree.selection()
         if selected_item:
             query_id = fixed_queries_tree.item(selected_item, "values")[1]  # Get the query ID
-            delete_fixed_query(query_id, user_id)
-            load_fixed_queries()
+            submit(delete_fixed_query, query_id, user_id, on_success=lambda _: load_fixed_queries())
 
     remove_button = ttk.Button(fixed_queries_frame, text="Remove Query", command=remove_query)
     remove_button.pack(pady=5)
@@ -198,25 +208,21 @@ def create_ai_insights_tab(notebook, user_id):
 
     def fetch_database_data():
         """Fetch all relevant data from the database."""
-        try:
-            income = get_income_tracker(user_id)
-            expenses = get_expenses_tracker(user_id)
-            income_sources = get_income_sources(user_id)
-            recurring_income = get_recurring_income(user_id)
-            recurring_transactions = get_recurring_transactions(user_id)
-            expense_categories = get_expenses_category(user_id)
-
-            return {
-                "income": income,
-                "expenses": expenses,
-                "income_sources": income_sources,
-                "recurring_income": recurring_income,
-                "recurring_transactions": recurring_transactions,
-                "expense_categories": expense_categories,
-            }
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error fetching data: {e}")
-            return None
+        income = get_income_tracker(user_id)
+        expenses = get_expenses_tracker(user_id)
+        income_sources = get_income_sources(user_id)
+        recurring_income = get_recurring_income(user_id)
+        recurring_transactions = get_recurring_transactions(user_id)
+        expense_categories = get_expenses_category(user_id)
+
+        return {
+            "income": income,
+            "expenses": expenses,
+            "income_sources": income_sources,
+            "recurring_income": recurring_income,
+            "recurring_transactions": recurring_transactions,
+            "expense_categories": expense_categories,
+        }
 
     def get_openai_response():
         query = user_input.get("1.0", tk.END).strip()
@@ -224,9 +230,17 @@ def create_ai_insights_tab(notebook, user_id):
         loading_label.config(text="Loading... please wait.")
         response_text.config(state=tk.NORMAL)
 
+        ai_loader.submit(ask_openai, query, on_success=show_response, on_error=show_error)
+
+    def show_error(e):
+        loading_label.config(text="")
+        messagebox.showerror("Database Error", f"Error fetching data: {e}")
+
+    def ask_openai(query):
+        """Runs on a worker thread: gather the user's data and query the API"""
+        import requests
+
         data = fetch_database_data()
-        if not data:
-            return
 
         prompt = f"User Query: {query}\n\nHere is the user's financial data:\n"
 
@@ -288,7 +302,9 @@ def create_ai_insights_tab(notebook, user_id):
 
         except Exception as e:
             result = f"Error occurred: {e}"
+        return result
 
+    def show_response(result):
         response_text.delete("1.0", tk.END)
         response_text.insert("1.0", result)
         response_text.config(state=tk.DISABLED)
@@ -303,13 +319,14 @@ def create_ai_insights_tab(notebook, user_id):
             return
 
         stop_reading_flag = False
+        engine = get_tts_engine()
 
         def tts_worker():
             """Worker function to read text in a separate thread."""
             text = response_text.get("1.0", tk.END).strip()
             if text:
-                tts_engine.say(text)
-                tts_engine.runAndWait()
+                engine.say(text)
+                engine.runAndWait()
 
         tts_thread = threading.Thread(target=tts_worker, daemon=True)
         tts_thread.start()
@@ -322,7 +339,8 @@ def create_ai_insights_tab(notebook, user_id):
         """Stop reading the response text."""
         global stop_reading_flag
         stop_reading_flag = True
-        tts_engine.stop()
+        if tts_engine is not None:
+            tts_engine.stop()
         read_aloud_button.config(state=tk.NORMAL)
         stop_button.config(state=tk.DISABLED)
 
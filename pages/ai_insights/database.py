@@ -1,16 +1,9 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from datetime import date
+from pages.common.cache import CATEGORIES, EXPENSE_RECORDS, INCOME_SOURCES, cached, invalidate, skip_store
+from pages.common.db_pool import get_db_connection
+from pages.common.rollup import EXPENSE, add_to_rollup
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_income_tracker(user_id):
     try:
@@ -44,6 +37,7 @@ def get_expenses_tracker(user_id):
         cursor.close()
         connection.close()
         
+@cached(INCOME_SOURCES)
 def get_income_sources(user_id):
     try:
         connection = get_db_connection()
@@ -55,6 +49,7 @@ def get_income_sources(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -92,6 +87,7 @@ def get_recurring_transactions(user_id):
         cursor.close()
         connection.close()
 
+@cached(CATEGORIES)
 def get_expenses_category(user_id):
     try:
         connection = get_db_connection()
@@ -103,6 +99,7 @@ def get_expenses_category(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -114,12 +111,15 @@ def add_expense(user_id, amount, category, description):
         connection = get_db_connection()
         cursor = connection.cursor()
 
+        today = date.today()
         query = """
             INSERT INTO expenses_tracker (user_id, amount, category, description, date)
-            VALUES (%s, %s, %s, %s, CURDATE())
+            VALUES (%s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (user_id, amount, category, description))
+        cursor.execute(query, (user_id, amount, category, description, today))
+        add_to_rollup(cursor, user_id, EXPENSE, [(category, today, amount)])
         connection.commit()
+        invalidate(user_id, EXPENSE_RECORDS)
 
         return True  # Indicate success
     except mysql.connector.Error as err:
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import ttk
+from pages.common.executor import LatestRequest
 from .database import check_budget_exceeded, fetch_alerts
 
 def create_alerts_and_reminder_tab(notebook, user_id):
@@ -8,8 +9,9 @@ def create_alerts_and_reminder_tab(notebook, user_id):
 
     # Add the tab to the notebook
     notebook.add(tab_frame, text="Alerts and Reminder")
+    loader = LatestRequest()
 
-    def refresh_alerts():
+    def clear_tab():
         # Clear the current contents of the tab frame
         for widget in tab_frame.winfo_children():
             widget.destroy()
@@ -17,10 +19,15 @@ def create_alerts_and_reminder_tab(notebook, user_id):
         # Add a title
         tk.Label(tab_frame, text="Alerts and Reminder Tab", font=("Arial", 16)).pack(pady=10)
 
+    def refresh_alerts():
+        clear_tab()
+        tk.Label(tab_frame, text="Loading...", font=("Arial", 12)).pack(anchor="w", padx=10, pady=5)
 
+        # Fetch alerts from the database in the background
+        loader.submit(fetch_alerts, user_id, on_success=show_alerts)
 
-        # Fetch alerts from the database
-        alerts = fetch_alerts(user_id)
+    def show_alerts(alerts):
+        clear_tab()
 
         # Display Alerts Section
         if alerts:
@@ -39,7 +46,7 @@ def create_alerts_and_reminder_tab(notebook, user_id):
             refresh_alerts()
 
     # Bind the tab change event after the tab is added
-    notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
+    notebook.bind("<<NotebookTabChanged>>", on_tab_changed, add="+")
 
     # Refresh alerts when the tab is first created
     refresh_alerts()
@@ -2,13 +2,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from .database import create_user, verify_user, username_exists, email_exists, create_tables
 from .admin_panel import AdminPanel
+from pages.common.db_pool import warm_pool
 import re
+import threading
 
 class AuthWindow:
     def __init__(self):
         # Create necessary database tables
         create_tables()
         
+        # Open pooled connections while the user is typing their credentials
+        threading.Thread(target=warm_pool, daemon=True).start()
+        
         self.window = tk.Tk()
         self.window.title("Personal Finance Management System")
         self.window.geometry("400x500")
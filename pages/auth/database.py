@@ -1,17 +1,9 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
 import hashlib
+from pages.common.cache import invalidate_user
+from pages.common.db_pool import get_db_connection
+from pages.common.migrations import apply_migrations
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def create_tables():
     try:
@@ -168,7 +160,10 @@ def create_tables():
         
         connection.commit()
         print("Tables verified successfully")
-        return True
+        
+        # Evolve existing deployments (indexes, new columns) past the base tables
+        success, _ = apply_migrations()
+        return success
     except mysql.connector.Error as err:
         print(f"Error creating tables: {err}")
         return False
@@ -314,11 +309,14 @@ def delete_user(user_id, admin_id):
         cursor.execute("DELETE FROM recurring_transactions WHERE user_id = %s", (user_id,))
         cursor.execute("DELETE FROM expenses_tracker WHERE user_id = %s", (user_id,))
         cursor.execute("DELETE FROM expenses_category WHERE user_id = %s", (user_id,))
+        cursor.execute("DELETE FROM budget_state WHERE user_id = %s", (user_id,))
         cursor.execute("DELETE FROM budgets WHERE user_id = %s", (user_id,))
+        cursor.execute("DELETE FROM user_month_totals WHERE user_id = %s", (user_id,))
         
         # Finally delete the user
         cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
         connection.commit()
+        invalidate_user(user_id)
         return True, "User and all associated data deleted successfully"
     except mysql.connector.Error as err:
         return False, f"Error: {err}"
@@ -1,117 +1,42 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime
-from .database import insert_budget, get_budgets, delete_budget
-from pages.expense_tracking.database import get_expenses_tracker, get_expenses_categories
-
-def filter_expense_stats(expenses, date_filter):
-
-    filtered_stats = {}
-    for expense in expenses:
-        expense_date = expense['date']
-        if date_filter(expense_date):
-            category = expense['category']
-            if category not in filtered_stats:
-                filtered_stats[category] = {
-                    'count': 0,
-                    'total': 0,
-                    'min': float('inf'),
-                    'max': float('-inf'),
-                    'avg': 0,
-                }
-            filtered_stats[category]['count'] += 1
-            filtered_stats[category]['total'] += expense['amount']
-            filtered_stats[category]['min'] = min(filtered_stats[category]['min'], expense['amount'])
-            filtered_stats[category]['max'] = max(filtered_stats[category]['max'], expense['amount'])
-
-
-    for category, data in filtered_stats.items():
-        data['avg'] = data['total'] / data['count'] if data['count'] > 0 else 0
-
-    return filtered_stats
+from datetime import date
+from .database import insert_budget, delete_budget, get_budget_progress
+from pages.expense_tracking.database import get_expenses_categories
+from pages.common.executor import LatestRequest, busy_cursor, submit
 
 def create_budget_tool_tab(notebook, user_id):
     def load_categories():
-        try:
-            categories = get_expenses_categories(user_id)
+        def show_categories(categories):
             category_combobox['values'] = categories
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error loading categories: {e}")
-
-    def is_current_month(date_obj):
-        """Check if a given date is in the current month."""
-        now = datetime.now()
-        return date_obj.year == now.year and date_obj.month == now.month
 
-    def is_current_year(date_obj):
-        """Check if a given date is in the current year."""
-        now = datetime.now()
-        return date_obj.year == now.year
+        categories_loader.submit(
+            get_expenses_categories, user_id,
+            on_success=show_categories,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading categories: {e}")
+        )
 
     def load_progress():
         """Reloads both monthly and yearly progress, including the Overall category."""
+        progress_loader.submit(
+            get_budget_progress, user_id, date.today(),
+            on_success=show_progress,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load progress: {e}")
+        )
+
+    def show_progress(progress):
         monthly_table.delete(*monthly_table.get_children())
         yearly_table.delete(*yearly_table.get_children())
-        try:
-            budgets = get_budgets(user_id)
-            all_expenses = get_expenses_tracker(user_id)
-
-
-            monthly_stats = filter_expense_stats(all_expenses, is_current_month)
-            total_monthly_budget = 0
-            total_monthly_spent = 0
-
-            for budget in budgets:
-                if budget["frequency"] != "Monthly":
-                    continue
-
-                category = budget["category"] or "All"
-                spent = monthly_stats.get(category, {}).get("total", 0)
-                remaining = budget["amount"] - spent
-                status = "Within Budget" if remaining >= 0 else "Exceeding Budget"
-
-                monthly_table.insert("", "end", values=(category, budget["amount"], spent, remaining, status))
-                total_monthly_budget += budget["amount"]
-                total_monthly_spent += spent
-
-
-            monthly_table.insert(
-                "", "end",
-                values=(
-                "Overall", total_monthly_budget, total_monthly_spent, total_monthly_budget - total_monthly_spent,
-                "Within Budget" if total_monthly_budget - total_monthly_spent >= 0 else "Exceeding Budget"),
-            )
-
-            # Yearly Progress
-            yearly_stats = filter_expense_stats(all_expenses, is_current_year)
-            total_yearly_budget = 0
-            total_yearly_spent = 0
-
-            for budget in budgets:
-                if budget["frequency"] != "Yearly":
-                    continue
-
-                category = budget["category"] or "All"
-                spent = yearly_stats.get(category, {}).get("total", 0)
-                remaining = budget["amount"] - spent
-                status = "Within Budget" if remaining >= 0 else "Exceeding Budget"
-
-                yearly_table.insert("", "end", values=(category, budget["amount"], spent, remaining, status))
-                total_yearly_budget += budget["amount"]
-                total_yearly_spent += spent
-
-            # Add Overall row for yearly
-            yearly_table.insert(
-                "", "end",
-                values=("Overall", total_yearly_budget, total_yearly_spent, total_yearly_budget - total_yearly_spent,
-                        "Within Budget" if total_yearly_budget - total_yearly_spent >= 0 else "Exceeding Budget"),
-            )
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load progress: {e}")
+        for values in progress["Monthly"]:
+            monthly_table.insert("", "end", values=values)
+        for values in progress["Yearly"]:
+            yearly_table.insert("", "end", values=values)
 
     # main Tab Frame
     tab_frame = ttk.Frame(notebook)
     tab_frame.pack(fill=tk.BOTH, expand=True)
+    categories_loader = LatestRequest()
+    progress_loader = LatestRequest(on_busy=busy_cursor(tab_frame))
     tk.Label(tab_frame, text="Budget Tool", font=("Arial", 16)).pack(pady=10)
 
     # frame for Adding Budget
@@ -148,12 +73,15 @@ def create_budget_tool_tab(notebook, user_id):
             messagebox.showerror("Error", "Frequency is required!")
             return
 
-        try:
-            insert_budget(user_id, category or None, budget_amount, frequency)
+        def on_added(_):
             messagebox.showinfo("Success", "Budget added successfully!")
             load_progress()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to add budget: {e}")
+
+        submit(
+            insert_budget, user_id, category or None, budget_amount, frequency,
+            on_success=on_added,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to add budget: {e}")
+        )
 
     ttk.Button(add_budget_frame, text="Add Budget", command=add_budget).grid(row=3, column=1, pady=10, sticky=tk.E)
 
@@ -175,16 +103,15 @@ def create_budget_tool_tab(notebook, user_id):
         item_values = table.item(selected_item, "values")
         category = item_values[0]  # Assuming the first column is the category
 
-        try:
-            if category == "All" or category == "Overall":
-                delete_budget(user_id)
-            else:
-                delete_budget(user_id, category)
-
+        def on_deleted(_):
             messagebox.showinfo("Success", f"Budget for '{category}' deleted successfully!")
             load_progress()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to delete budget: {e}")
+
+        submit(
+            delete_budget, user_id, None if category in ("All", "Overall") else category,
+            on_success=on_deleted,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to delete budget: {e}")
+        )
 
     ttk.Button(add_budget_frame, text="Delete Budget", command=delete_budget_action).grid(row=3, column=0, pady=10, sticky=tk.W)
 
@@ -1,16 +1,11 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from datetime import date
+from pages.common.cache import BUDGETS, EXPENSE_RECORDS, cached, invalidate
+from pages.common import budget_state
+from pages.common.budget_state import remove_budgets
+from pages.common.db_pool import get_db_connection
+from pages.common.periods import current_month_range, current_year_range
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_all_transactions():
     try:
@@ -29,6 +24,8 @@ def get_all_transactions():
         connection.close()
 
 def insert_budget(user_id, category, amount, frequency):
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -37,7 +34,12 @@ def insert_budget(user_id, category, amount, frequency):
             VALUES (%s, %s, %s, %s)
         """
         cursor.execute(query, (user_id, category, amount, frequency))
+        # A budget already exceeded when it is saved alerts now, not at the
+        # next expense
+        alerts = budget_state.resync(cursor, user_id)
         connection.commit()
+        invalidate(user_id, BUDGETS)
+        budget_state.publish(user_id, alerts)
     except Exception as e:
         raise Exception(f"Error adding budget: {e}")
     finally:
@@ -46,7 +48,10 @@ def insert_budget(user_id, category, amount, frequency):
         if connection:
             connection.close()
 
+@cached(BUDGETS)
 def get_budgets(user_id):
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
@@ -65,16 +70,19 @@ def get_budgets(user_id):
         if connection:
             connection.close()
 
+@cached(EXPENSE_RECORDS)
 def get_expense_stats_by_category(user_id):
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         query = """
             SELECT 
                 category, 
-                SUM(amount) AS total
-            FROM expenses_tracker
-            WHERE user_id = %s
+                SUM(total) AS total
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense'
             GROUP BY category
         """
         cursor.execute(query, (user_id,))
@@ -88,10 +96,13 @@ def get_expense_stats_by_category(user_id):
         if connection:
             connection.close()
 
+@cached(EXPENSE_RECORDS)
 def get_total_expenses(user_id):
     """
     Fetch the total amount of expenses for a user regardless of category.
     """
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -115,9 +126,12 @@ def delete_budget(user_id, category=None):
     """
     Deletes a budget for a user. If no category is specified, delete the overall budget.
     """
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
+        remove_budgets(cursor, user_id, category or None)
 
         # Determine the query based on whether a category is provided
         if category:
@@ -134,6 +148,7 @@ def delete_budget(user_id, category=None):
             cursor.execute(query, (user_id,))
 
         connection.commit()
+        invalidate(user_id, BUDGETS)
         print(f"Budget for {'category: ' + category if category else 'overall'} deleted successfully.")
     except Exception as e:
         raise Exception(f"Error deleting budget: {e}")
@@ -143,63 +158,85 @@ def delete_budget(user_id, category=None):
         if connection:
             connection.close()
 
-def load_progress():
-    """Reloads both monthly and yearly progress, including the Overall category."""
-    monthly_table.delete(*monthly_table.get_children())
-    yearly_table.delete(*yearly_table.get_children())
-    try:
-        budgets = get_budgets(user_id)
-        all_expenses = get_expenses_tracker(user_id)
 
-        # monthly Progress
-        monthly_stats = filter_expense_stats(all_expenses, is_current_month)
-        total_monthly_budget = 0
-        total_monthly_spent = 0
-
-        for budget in budgets:
-            if budget["frequency"] != "Monthly":
-                continue
+def progress_status(remaining):
+    return "Within Budget" if remaining >= 0 else "Exceeding Budget"
 
-            category = budget["category"] or "All"
-            spent = monthly_stats.get(category, {}).get("total", 0)
-            remaining = budget["amount"] - spent
-            status = "Within Budget" if remaining >= 0 else "Exceeding Budget"
 
-            monthly_table.insert("", "end", values=(category, budget["amount"], spent, remaining, status))
-            total_monthly_budget += budget["amount"]
-            total_monthly_spent += spent
+@cached(BUDGETS, EXPENSE_RECORDS)
+def get_budget_progress(user_id, today=None):
+    """
+    Spent-versus-budget rows for the current month and year, ready to render.
+
+    Returns {"Monthly": rows, "Yearly": rows}, each row being
+    (category, budget, spent, remaining, status) and ending with an Overall
+    row of all budgets against all spending in the period. Spending comes
+    from the monthly rollup in one grouped query, so the cost depends on
+    the number of budgets rather than on expense history.
+    A budget without a category covers every category and is shown as "All".
+    """
+    today = today or date.today()
+    month_start, month_end = current_month_range(today)
+    year_start, year_end = current_year_range(today)
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        query = """
+            SELECT b.id, b.category, b.amount, b.frequency, COALESCE(SUM(t.total), 0) AS spent
+            FROM budgets b
+            JOIN (
+                SELECT 'Monthly' AS frequency, %s AS period_start, %s AS period_end
+                UNION ALL
+                SELECT 'Yearly', %s, %s
+            ) p ON p.frequency = b.frequency
+            LEFT JOIN user_month_totals t
+                ON t.user_id = b.user_id AND t.kind = 'expense'
+                AND t.month >= p.period_start AND t.month < p.period_end
+                AND (b.category IS NULL OR t.category = b.category)
+            WHERE b.user_id = %s
+            GROUP BY b.id, b.category, b.amount, b.frequency
+            ORDER BY b.id
+        """
+        cursor.execute(query, (month_start, month_end, year_start, year_end, user_id))
+        budgets = cursor.fetchall()
 
-        # add overall row for monthly
-        monthly_table.insert(
-            "", "end",
-            values=("Overall", total_monthly_budget, total_monthly_spent, total_monthly_budget - total_monthly_spent,
-                    "Within Budget" if total_monthly_budget - total_monthly_spent >= 0 else "Exceeding Budget"),
+        # Overall is everything spent in the period. Summing the budgets would
+        # count an expense twice when both "All" and its category's budget
+        # cover it.
+        cursor.execute(
+            """
+            SELECT
+                COALESCE(SUM(CASE WHEN month >= %s AND month < %s THEN total END), 0) AS monthly,
+                COALESCE(SUM(total), 0) AS yearly
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense' AND month >= %s AND month < %s
+            """,
+            (month_start, month_end, user_id, year_start, year_end)
         )
+        totals = cursor.fetchone()
+    except Exception as e:
+        raise Exception(f"Error fetching budget progress: {e}")
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
-        # yearly Progress
-        yearly_stats = filter_expense_stats(all_expenses, is_current_year)
-        total_yearly_budget = 0
-        total_yearly_spent = 0
-
+    progress = {}
+    for frequency in ("Monthly", "Yearly"):
+        rows = []
+        total_budget = 0
+        total_spent = totals[frequency.lower()]
         for budget in budgets:
-            if budget["frequency"] != "Yearly":
+            if budget["frequency"] != frequency:
                 continue
-
-            category = budget["category"] or "All"
-            spent = yearly_stats.get(category, {}).get("total", 0)
-            remaining = budget["amount"] - spent
-            status = "Within Budget" if remaining >= 0 else "Exceeding Budget"
-
-            yearly_table.insert("", "end", values=(category, budget["amount"], spent, remaining, status))
-            total_yearly_budget += budget["amount"]
-            total_yearly_spent += spent
-
-        # add overall row for yearly
-        yearly_table.insert(
-            "", "end",
-            values=("Overall", total_yearly_budget, total_yearly_spent, total_yearly_budget - total_yearly_spent,
-                    "Within Budget" if total_yearly_budget - total_yearly_spent >= 0 else "Exceeding Budget"),
-        )
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load progress: {e}")
-
+            remaining = budget["amount"] - budget["spent"]
+            rows.append((budget["category"] or "All", budget["amount"], budget["spent"], remaining,
+                         progress_status(remaining)))
+            total_budget += budget["amount"]
+        rows.append(("Overall", total_budget, total_spent, total_budget - total_spent,
+                     progress_status(total_budget - total_spent)))
+        progress[frequency] = rows
+    return progress
@@ -0,0 +1,233 @@
+import os
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from dotenv import load_dotenv
+from pages.common import notifications
+from pages.common.cache import ALERTS, invalidate
+from pages.common.periods import month_range, year_range
+from pages.common.rollup import month_start
+
+load_dotenv()
+
+# Percentages of a budget that raise an alert, each at most once per period
+THRESHOLDS = sorted(int(pct) for pct in os.getenv("BUDGET_ALERT_THRESHOLDS", "50,80,100").split(","))
+
+# budget_state keeps the running amount spent against each budget for each
+# period it covers (a month or a year, by the budget's frequency), plus the
+# highest threshold already alerted in that period. Expense writes adjust it
+# by their amount delta, so an alert check touches a few rows instead of
+# re-summing every budget. A new period is a new row, so alerts fire again.
+# The table is created by migration 6.
+
+# Spending for budget b in the period [d.period_start, d.period_end), read
+# from the monthly rollup. A budget without a category covers all of them.
+_ROLLUP_SPENT = """
+    SELECT COALESCE(SUM(t.total), 0)
+    FROM user_month_totals t
+    WHERE t.user_id = b.user_id AND t.kind = 'expense'
+    AND t.month >= d.period_start AND t.month < d.period_end
+    AND (b.category IS NULL OR t.category = b.category)
+"""
+
+# Recompute spent for existing state rows from the rollup
+RECOMPUTE_SPENT = """
+    UPDATE budget_state s
+    JOIN budgets b ON b.id = s.budget_id
+    SET s.spent = (
+        SELECT COALESCE(SUM(t.total), 0)
+        FROM user_month_totals t
+        WHERE t.user_id = s.user_id AND t.kind = 'expense'
+        AND t.month >= s.period_start
+        AND t.month < CASE b.frequency
+            WHEN 'Monthly' THEN s.period_start + INTERVAL 1 MONTH
+            ELSE s.period_start + INTERVAL 1 YEAR END
+        AND (b.category IS NULL OR t.category = b.category)
+    )
+    {where}
+"""
+
+
+def _period(frequency, row_date):
+    if frequency == "Monthly":
+        return month_range(row_date.year, row_date.month)
+    return year_range(row_date.year)
+
+
+def _delta_rows(changes):
+    """Fold (category, date, delta) changes into one row per budget target:
+    (frequency, category or None, period_start, period_end, delta).
+    Each state row then matches exactly one delta row."""
+    deltas = defaultdict(Decimal)
+    for category, row_date, delta in changes:
+        row_date = month_start(row_date)
+        delta = Decimal(str(delta))
+        for frequency in ("Monthly", "Yearly"):
+            period = _period(frequency, row_date)
+            deltas[(frequency, category) + period] += delta
+            deltas[(frequency, None) + period] += delta
+    return [key + (delta,) for key, delta in deltas.items()]
+
+
+def _derived_table(rows):
+    select = "SELECT %s AS frequency, %s AS category, %s AS period_start, %s AS period_end, %s AS delta"
+    params = [value for row in rows for value in row]
+    return " UNION ALL ".join([select] * len(rows)), params
+
+
+def apply_expense_changes(cursor, user_id, changes, today=None):
+    """Adjust budget_state by expense changes and return new alert messages.
+
+    changes: iterable of (category, date, delta), negative for removed
+    amounts. Runs on the caller's cursor after the rollup has been updated,
+    so it commits with the expense write; pass the result to publish()
+    once committed."""
+    rows = _delta_rows(changes)
+    if not rows:
+        return []
+    derived, params = _derived_table(rows)
+
+    # Periods seen for the first time are seeded from the rollup minus this
+    # write, which the rollup already includes. Other threads write expenses
+    # too, so a period seeded meanwhile is left as it is rather than inserted
+    # twice; the update below then moves every period by the delta.
+    cursor.execute(
+        f"""
+        INSERT INTO budget_state (budget_id, period_start, user_id, spent)
+        SELECT b.id, d.period_start, b.user_id, ({_ROLLUP_SPENT}) - d.delta
+        FROM budgets b
+        JOIN ({derived}) d ON d.frequency = b.frequency AND d.category <=> b.category
+        WHERE b.user_id = %s
+        ON DUPLICATE KEY UPDATE budget_id = budget_id
+        """,
+        params + [user_id]
+    )
+    cursor.execute(
+        f"""
+        UPDATE budget_state s
+        JOIN budgets b ON b.id = s.budget_id
+        JOIN ({derived}) d
+            ON d.frequency = b.frequency AND d.category <=> b.category AND d.period_start = s.period_start
+        SET s.spent = s.spent + d.delta
+        WHERE s.user_id = %s
+        """,
+        params + [user_id]
+    )
+    return evaluate(cursor, user_id, today)
+
+
+def resync(cursor, user_id, today=None):
+    """Recompute the user's budget_state from the rollup, seeding the current
+    periods of every budget, and return new alert messages. For writes that
+    cannot express a delta cheaply, and to repair drift."""
+    today = today or date.today()
+    cursor.execute(RECOMPUTE_SPENT.format(where="WHERE s.user_id = %s"), (user_id,))
+    this_month, next_month = month_range(today.year, today.month)
+    this_year, next_year = year_range(today.year)
+    cursor.execute(
+        f"""
+        INSERT INTO budget_state (budget_id, period_start, user_id, spent)
+        SELECT b.id, d.period_start, b.user_id, ({_ROLLUP_SPENT})
+        FROM budgets b
+        JOIN (
+            SELECT 'Monthly' AS frequency, %s AS period_start, %s AS period_end
+            UNION ALL
+            SELECT 'Yearly', %s, %s
+        ) d ON d.frequency = b.frequency
+        WHERE b.user_id = %s
+        ON DUPLICATE KEY UPDATE budget_id = budget_id
+        """,
+        (this_month, next_month, this_year, next_year, user_id)
+    )
+    return evaluate(cursor, user_id, today)
+
+
+def alert_message(budget, pct):
+    if pct >= 100:
+        return (
+            f"Budget exceeded for category '{budget['category']}' "
+            f"({budget['frequency']} budget). "
+            f"Limit: {budget['amount']}, Spent: {budget['spent']}"
+        )
+    return (
+        f"Budget for category '{budget['category']}' has reached {pct}% "
+        f"({budget['frequency']} budget). "
+        f"Limit: {budget['amount']}, Spent: {budget['spent']}"
+    )
+
+
+def crossed_threshold(spent, amount):
+    """Highest threshold reached by spent, or 0. 100% means over the limit."""
+    reached = 0
+    for pct in THRESHOLDS:
+        if (spent > amount) if pct == 100 else (spent * 100 >= amount * pct):
+            reached = pct
+    return reached
+
+
+def evaluate(cursor, user_id, today=None):
+    """Log alerts for current periods that crossed a new threshold.
+
+    Spending that falls back below a threshold lowers the recorded level,
+    so crossing it again alerts again."""
+    today = today or date.today()
+    periods = (month_range(today.year, today.month)[0], year_range(today.year)[0])
+    cursor.execute(
+        """
+        SELECT s.budget_id, s.period_start, s.spent, s.notified_pct, b.category, b.amount, b.frequency
+        FROM budget_state s
+        JOIN budgets b ON b.id = s.budget_id
+        WHERE s.user_id = %s AND s.period_start IN (%s, %s)
+        """,
+        (user_id, *periods)
+    )
+    columns = [column[0] for column in cursor.description]
+    states = [row if isinstance(row, dict) else dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    alerts = []
+    levels = []
+    for state in states:
+        # Only the period matching the budget's frequency is current for it
+        if state["period_start"] != periods[0 if state["frequency"] == "Monthly" else 1]:
+            continue
+        reached = crossed_threshold(state["spent"], state["amount"])
+        if reached > state["notified_pct"]:
+            alerts.append((user_id, state["budget_id"], state["category"], alert_message(state, reached)))
+        if reached != state["notified_pct"]:
+            levels.append((reached, state["budget_id"], state["period_start"]))
+
+    if alerts:
+        cursor.executemany(
+            """
+            INSERT INTO alerts (user_id, budget_id, category, alert_message)
+            VALUES (%s, %s, %s, %s)
+            """,
+            alerts
+        )
+    if levels:
+        cursor.executemany(
+            "UPDATE budget_state SET notified_pct = %s WHERE budget_id = %s AND period_start = %s",
+            levels
+        )
+    return [alert[3] for alert in alerts]
+
+
+def remove_budgets(cursor, user_id, category):
+    """Drop the state of the user's budgets for category (None: the overall budget)"""
+    cursor.execute(
+        """
+        DELETE s FROM budget_state s
+        JOIN budgets b ON b.id = s.budget_id
+        WHERE b.user_id = %s AND b.category <=> %s
+        """,
+        (user_id, category)
+    )
+
+
+def publish(user_id, messages):
+    """Call after commit: refresh the alerts list and notify the UI"""
+    if not messages:
+        return
+    invalidate(user_id, ALERTS)
+    for message in messages:
+        notifications.post("Budget Alert", message)
@@ -0,0 +1,199 @@
+import copy
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Cache sizing can be tuned per deployment through the .env file
+CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "512"))
+CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+
+# Invalidation tags. Read functions declare the tags their result depends on
+# and write functions invalidate the tags they touch, always per user.
+EXPENSE_RECORDS = "expenses"
+CATEGORIES = "categories"
+INCOME_RECORDS = "income"
+INCOME_SOURCES = "income_sources"
+RECURRING_INCOME = "recurring_income"
+RECURRING = "recurring"
+BUDGETS = "budgets"
+ALERTS = "alerts"
+
+
+class QueryCache:
+    """In-process LRU cache with a TTL and per-user invalidation tags."""
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value, tags)
+        self._tagged = {}               # (user_id, tag) -> set of keys
+        # Bumped on every invalidation so a load that raced with a write is
+        # not stored afterwards (see get_or_load)
+        self._generations = {}          # (user_id, tag) -> int
+        self._epoch = 0
+        # Set by a loader that swallowed an error (see skip_store)
+        self._local = threading.local()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def _snapshot(self, tags):
+        return self._epoch, tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def get_or_load(self, key, tags, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return copy.deepcopy(entry[1])
+                self._drop(key)
+                self._expirations += 1
+            self._misses += 1
+            snapshot = self._snapshot(tags)
+
+        # Query outside the lock so a slow read does not block other users.
+        # The flag is saved around the load since cached reads can nest
+        outer = getattr(self._local, "skip", False)
+        self._local.skip = False
+        try:
+            value = loader()
+            skip = self._local.skip
+        finally:
+            self._local.skip = outer
+
+        with self._lock:
+            if not skip and self._snapshot(tags) == snapshot:
+                if key in self._entries:
+                    self._drop(key)
+                self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value), tags)
+                for tag in tags:
+                    self._tagged.setdefault(tag, set()).add(key)
+                while len(self._entries) > self.maxsize:
+                    self._drop(next(iter(self._entries)))
+                    self._evictions += 1
+        return value
+
+    def skip_store(self):
+        """Return the value being loaded without storing it"""
+        self._local.skip = True
+
+    def invalidate(self, user_id, *tags):
+        with self._lock:
+            for name in tags:
+                tag = (user_id, name)
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+                    self._invalidations += 1
+
+    def invalidate_all_users(self, *tags):
+        """For writes that do not know which user they touched"""
+        with self._lock:
+            self._epoch += 1
+            for tag in [tag for tag in self._tagged if tag[1] in tags]:
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+                    self._invalidations += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._epoch += 1
+            for tag in [tag for tag in self._tagged if tag[0] == user_id]:
+                for key in list(self._tagged.get(tag, ())):
+                    self._drop(key)
+                    self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def metrics(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+_cache = QueryCache()
+
+
+def get_cache():
+    return _cache
+
+
+def cached(*tags):
+    """Cache a read function per (user_id, function, arguments).
+
+    The wrapped function must take a user_id argument; its result is
+    dropped whenever one of the tags is invalidated for that user."""
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            user_id = arguments.pop("user_id")
+            key = (user_id, name, tuple(sorted(arguments.items())))
+            user_tags = tuple((user_id, tag) for tag in tags)
+            return _cache.get_or_load(key, user_tags, lambda: func(*args, **kwargs))
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def skip_store():
+    """Called by a cached read that returns a fallback after an error, so
+    the next call queries again instead of getting the fallback until the
+    TTL runs out"""
+    _cache.skip_store()
+
+
+def invalidate(user_id, *tags):
+    _cache.invalidate(user_id, *tags)
+
+
+def invalidate_all_users(*tags):
+    _cache.invalidate_all_users(*tags)
+
+
+def invalidate_user(user_id):
+    _cache.invalidate_user(user_id)
+
+
+def get_cache_metrics():
+    return _cache.metrics()
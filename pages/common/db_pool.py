@@ -0,0 +1,238 @@
+import mysql.connector
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Pool sizing can be tuned per deployment through the .env file
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Idle connections older than this are pinged before being handed out
+HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK", "30"))
+
+
+def _open_connection():
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME")
+    )
+
+
+class PooledConnection:
+    """Checked-out connection; close() hands it back to the pool instead of disconnecting."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def close(self):
+        if self.__dict__.get('_raw') is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def discard(self):
+        """Disconnect instead of returning to the pool, for a connection the
+        next borrower must not get, such as one with rows left unread"""
+        if self.__dict__.get('_raw') is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw, discard=True)
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get('_raw')
+        if raw is None:
+            raise mysql.connector.errors.OperationalError("Connection was returned to the pool")
+        return getattr(raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for callers that forget to close their connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with health checks and usage metrics."""
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._idle = []  # (raw connection, time it was returned)
+        self._created = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            'checkouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'reconnects': 0,
+        }
+
+    def acquire(self):
+        """Check out a healthy connection, waiting up to `timeout` seconds if the pool is exhausted"""
+        started = time.perf_counter()
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"No database connection available after {self.timeout}s"
+                    )
+                self._cond.wait(remaining)
+
+            if self._idle:
+                raw, returned_at = self._idle.pop()
+            else:
+                raw, returned_at = None, None
+                self._created += 1
+            self._in_use += 1
+
+            waited = time.perf_counter() - started
+            self._stats['checkouts'] += 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+
+        # Network work happens outside the lock so other threads are not blocked on it
+        try:
+            if raw is None:
+                raw = _open_connection()
+            elif time.monotonic() - returned_at > HEALTH_CHECK_INTERVAL:
+                raw = self._ensure_healthy(raw)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw)
+
+    def _ensure_healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return raw
+        except mysql.connector.Error:
+            with self._cond:
+                self._stats['reconnects'] += 1
+            try:
+                raw.close()
+            except mysql.connector.Error:
+                pass
+            return _open_connection()
+
+    def release(self, raw, discard=False):
+        """Return a connection to the pool, discarding any uncommitted work.
+        With discard, or when the rollback fails, it is disconnected instead."""
+        healthy = not discard
+        try:
+            if healthy and raw.in_transaction:
+                raw.rollback()
+        except mysql.connector.Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and len(self._idle) < self.size:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._created -= 1
+            self._cond.notify()
+
+        if not healthy:
+            try:
+                raw.close()
+            except mysql.connector.Error:
+                pass
+
+    def warm(self, count=None):
+        """Open connections ahead of time so the first queries skip the handshake"""
+        count = self.size if count is None else min(count, self.size)
+        opened = []
+        try:
+            for _ in range(count):
+                with self._cond:
+                    if self._created >= self.size or len(self._idle) + len(opened) >= count:
+                        break
+                    self._created += 1
+                try:
+                    opened.append(_open_connection())
+                except mysql.connector.Error:
+                    with self._cond:
+                        self._created -= 1
+                    raise
+        finally:
+            with self._cond:
+                now = time.monotonic()
+                self._idle.extend((raw, now) for raw in opened)
+                self._cond.notify_all()
+        return len(opened)
+
+    def metrics(self):
+        with self._cond:
+            checkouts = self._stats['checkouts']
+            return {
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'checkouts': checkouts,
+                'wait_time_total': self._stats['wait_time_total'],
+                'wait_time_avg': self._stats['wait_time_total'] / checkouts if checkouts else 0.0,
+                'wait_time_max': self._stats['wait_time_max'],
+                'timeouts': self._stats['timeouts'],
+                'reconnects': self._stats['reconnects'],
+            }
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for raw, _ in idle:
+            try:
+                raw.close()
+            except mysql.connector.Error:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_db_connection():
+    """Get a connection from the shared pool; close() returns it for reuse"""
+    return get_pool().acquire()
+
+
+def warm_pool(count=None):
+    """Pre-open pool connections, logging instead of raising so it is safe in a background thread"""
+    try:
+        opened = get_pool().warm(count)
+        print(f"Database pool warmed with {opened} connection(s)")
+        return opened
+    except mysql.connector.Error as err:
+        print(f"Error warming database pool: {err}")
+        return 0
+
+
+def get_pool_metrics():
+    return get_pool().metrics()
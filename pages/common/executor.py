@@ -0,0 +1,159 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from pages.common.db_pool import POOL_SIZE
+
+# How often the Tk thread picks up finished results
+POLL_INTERVAL_MS = 25
+
+
+class DbExecutor:
+    """Runs blocking database calls on worker threads and hands the results
+    back to the Tk thread, which polls for them with after()."""
+
+    def __init__(self, workers=POOL_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self._callbacks = queue.Queue()
+        self._root = None
+        self._ui_thread = None
+
+    def install(self, root):
+        """Start delivering results on root's event loop; call from the Tk thread"""
+        self._root = root
+        self._ui_thread = threading.current_thread()
+        self._drain()
+
+    def _drain(self):
+        while True:
+            try:
+                callback, args = self._callbacks.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
+        if self._root is not None:
+            try:
+                self._root.after(POLL_INTERVAL_MS, self._drain)
+            except tk.TclError:
+                # The window was destroyed
+                self._root = None
+
+    def call_in_ui(self, callback, *args):
+        """Run callback on the Tk thread; runs it inline when already there or when no UI is installed"""
+        if self._root is None or threading.current_thread() is self._ui_thread:
+            callback(*args)
+        else:
+            self._callbacks.put((callback, args))
+
+    def submit(self, fn, *args, on_success=None, on_error=None, **kwargs):
+        future = self._executor.submit(fn, *args, **kwargs)
+
+        def done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self.call_in_ui(on_error or report_error, error)
+            elif on_success is not None:
+                self.call_in_ui(on_success, future.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def shutdown(self):
+        self._root = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def report_error(error):
+    print(f"Error: {error}")
+
+
+_executor = DbExecutor()
+
+
+def get_executor():
+    return _executor
+
+
+def install(root):
+    _executor.install(root)
+
+
+def submit(fn, *args, on_success=None, on_error=None, **kwargs):
+    """Run fn(*args, **kwargs) in the background; callbacks run on the Tk thread"""
+    return _executor.submit(fn, *args, on_success=on_success, on_error=on_error, **kwargs)
+
+
+def call_in_ui(callback, *args):
+    _executor.call_in_ui(callback, *args)
+
+
+def shutdown():
+    _executor.shutdown()
+
+
+class LatestRequest:
+    """One background load slot for a view. Submitting again supersedes the
+    previous request, so a slow older result can never overwrite a newer one.
+
+    on_busy(True/False) is called on the Tk thread when the slot starts and
+    stops loading, for spinners, cursors or disabling buttons."""
+
+    def __init__(self, on_busy=None):
+        self.on_busy = on_busy
+        self._generation = 0
+        self._future = None
+
+    @property
+    def busy(self):
+        return self._future is not None
+
+    def _set_busy(self, busy):
+        if self.on_busy is not None:
+            self.on_busy(busy)
+
+    def submit(self, fn, *args, on_success=None, on_error=None, **kwargs):
+        if self._future is not None:
+            self._future.cancel()
+        self._generation += 1
+        generation = self._generation
+
+        def deliver(callback):
+            def run(value):
+                if generation != self._generation:
+                    return  # superseded by a newer request
+                self._future = None
+                self._set_busy(False)
+                if callback is not None:
+                    callback(value)
+            return run
+
+        self._set_busy(True)
+        self._future = submit(
+            fn, *args,
+            on_success=deliver(on_success),
+            on_error=deliver(on_error or report_error),
+            **kwargs
+        )
+        return self._future
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+            self._set_busy(False)
+        self._generation += 1
+
+
+def busy_cursor(widget):
+    """on_busy callback that shows a wait cursor over widget while loading"""
+    def on_busy(busy):
+        try:
+            widget.config(cursor="watch" if busy else "")
+        except tk.TclError:
+            pass
+    return on_busy
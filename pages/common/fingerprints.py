@@ -0,0 +1,28 @@
+import hashlib
+
+# An imported transaction is identified by a fingerprint: MD5 of its
+# normalized fields and of its occurrence number, i.e. how many identical
+# transactions came before it in the same file. Two coffees of the same price
+# on the same day are then two transactions, while importing a statement a
+# second time yields the same fingerprints and changes nothing. Income leaves
+# the source out, so re-importing a row under another source moves it.
+#
+# fingerprint() must agree with the SQL migration 10 used to fill in the
+# fingerprints of the rows already stored: trimmed, lower-cased text, the date
+# as YYYY-MM-DD and the amount with two decimals.
+
+
+def normalize(text):
+    """Text as LOWER(TRIM(text)) gives it; TRIM removes spaces only, so a
+    trailing tab or newline stays part of the text"""
+    return text.strip(" ").lower()
+
+
+def fingerprint(row_date, amount, description, occurrence, category=None):
+    """Fingerprint of one transaction; amount is a Decimal with two places,
+    and category is given for expenses only"""
+    fields = [row_date.isoformat(), str(amount), normalize(description)]
+    if category is not None:
+        fields.append(normalize(category))
+    fields.append(str(occurrence))
+    return hashlib.md5("|".join(fields).encode("utf-8")).digest()
@@ -0,0 +1,89 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+
+# Idle time before the tab after the one just opened is built in advance
+PREFETCH_DELAY_MS = 750
+
+
+class LazyNotebook:
+    """Registers notebook tabs as placeholders and builds each one the first
+    time it is selected.
+
+    A factory is the usual create_*_tab call. It adds its own frame to the
+    notebook, and that frame is then moved into the placeholder's position."""
+
+    def __init__(self, notebook, prefetch=True):
+        self.notebook = notebook
+        self.prefetch = prefetch
+        self._factories = {}    # placeholder widget name -> (title, factory)
+        self._building = False
+        self._prefetch_job = None
+        self.build_times = {}   # title -> seconds spent building
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def register(self, title, factory):
+        placeholder = ttk.Frame(self.notebook)
+        ttk.Label(placeholder, text=f"Loading {title}...").pack(pady=20)
+        self.notebook.add(placeholder, text=title)
+        self._factories[str(placeholder)] = (title, factory)
+        return placeholder
+
+    def build_current(self):
+        current = self.notebook.select()
+        if current:
+            self._build(current, select=True)
+
+    def _on_tab_changed(self, event):
+        if self._building:
+            return
+        self.build_current()
+
+    def _build(self, placeholder, select):
+        entry = self._factories.pop(str(placeholder), None)
+        if entry is None:
+            return
+        title, factory = entry
+        index = self.notebook.index(placeholder)
+
+        self._building = True
+        started = time.perf_counter()
+        try:
+            before = set(self.notebook.tabs())
+            factory()
+            added = [tab for tab in self.notebook.tabs() if tab not in before]
+            if added:
+                # Move the real tab into the placeholder's slot
+                self.notebook.insert(index, added[0])
+                if select:
+                    self.notebook.select(added[0])
+                self.notebook.forget(placeholder)
+                self.notebook.nametowidget(placeholder).destroy()
+        except Exception as e:
+            print(f"Error building tab '{title}': {e}")
+        finally:
+            self._building = False
+        self.build_times[title] = time.perf_counter() - started
+        print(f"Built tab '{title}' in {self.build_times[title] * 1000:.0f} ms")
+
+        # Only a tab the user opened predicts the next one
+        if select and self.prefetch:
+            self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        if self._prefetch_job is not None:
+            self.notebook.after_cancel(self._prefetch_job)
+        self._prefetch_job = self.notebook.after(PREFETCH_DELAY_MS, self._prefetch_next)
+
+    def _prefetch_next(self):
+        """Build the nearest unbuilt tab to the right of the current one"""
+        self._prefetch_job = None
+        try:
+            tabs = list(self.notebook.tabs())
+            current = tabs.index(self.notebook.select())
+        except (ValueError, tk.TclError):
+            return
+        for tab in tabs[current + 1:] + tabs[:current]:
+            if tab in self._factories:
+                self._build(tab, select=False)
+                return
@@ -0,0 +1,276 @@
+import argparse
+import mysql.connector
+from pages.common.db_pool import get_db_connection
+
+# Secondary indexes for the per-user hot paths. Every tab filters the tracker
+# tables by user_id plus a date range or a category, so user_id leads each key
+# and amount trails where the query only needs SUM(amount).
+EXPENSE_INDEXES = [
+    ("idx_expenses_user_date", "user_id, date, amount"),
+    ("idx_expenses_user_category_date", "user_id, category, date, amount"),
+]
+
+INCOME_INDEXES = [
+    ("idx_income_user_date", "user_id, date, amount"),
+    ("idx_income_user_source_date", "user_id, source_id, date, amount"),
+]
+
+
+def create_index(table, name, columns):
+    return f"CREATE INDEX {name} ON {table} ({columns})"
+
+
+# Ordered list of schema migrations: (version, description, statements).
+# Versions are applied in order and recorded in schema_migrations, so a
+# migration must never be edited once released - add a new one instead.
+# For the same reason statements are written out here rather than built from
+# the modules that use the tables, which are free to change.
+MIGRATIONS = [
+    (1, "Composite (user_id, date) indexes on the tracker tables", [
+        *(create_index("expenses_tracker", name, cols) for name, cols in EXPENSE_INDEXES),
+        *(create_index("income_tracker", name, cols) for name, cols in INCOME_INDEXES),
+    ]),
+    (2, "Due-date indexes on recurring_income", [
+        create_index("recurring_income", "idx_recurring_income_user_next", "user_id, next_date"),
+        create_index("recurring_income", "idx_recurring_income_next", "next_date"),
+    ]),
+    (3, "Lookup indexes on budgets and alerts", [
+        create_index("budgets", "idx_budgets_user_frequency", "user_id, frequency"),
+        create_index("alerts", "idx_alerts_user_budget", "user_id, budget_id"),
+        create_index("expenses_category", "idx_expenses_category_user_name", "user_id, name"),
+    ]),
+    (4, "Monthly rollup table user_month_totals, backfilled from the trackers", [
+        """
+        CREATE TABLE IF NOT EXISTS user_month_totals (
+            user_id INT NOT NULL,
+            month DATE NOT NULL,
+            kind ENUM('expense', 'income') NOT NULL,
+            category VARCHAR(50) NOT NULL DEFAULT '',
+            source_id INT NOT NULL DEFAULT 0,
+            total DECIMAL(14,2) NOT NULL DEFAULT 0,
+            txn_count INT NOT NULL DEFAULT 0,
+            min_amount DECIMAL(10,2),
+            max_amount DECIMAL(10,2),
+            PRIMARY KEY (user_id, kind, month, category, source_id)
+        )
+        """,
+        "DELETE FROM user_month_totals",
+        """
+        INSERT INTO user_month_totals
+            (user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount)
+        SELECT user_id, DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY) AS month, 'expense' AS kind,
+               category, 0 AS source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM expenses_tracker
+        GROUP BY user_id, month, category
+        """,
+        """
+        INSERT INTO user_month_totals
+            (user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount)
+        SELECT user_id, DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY) AS month, 'income' AS kind,
+               '' AS category, source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM income_tracker
+        GROUP BY user_id, month, source_id
+        """,
+    ]),
+    (5, "Keyset index for paging through expenses by (date, id)", [
+        create_index("expenses_tracker", "idx_expenses_user_date_id", "user_id, date, id"),
+    ]),
+    (6, "Running budget_state per budget and period for threshold alerts", [
+        """
+        CREATE TABLE IF NOT EXISTS budget_state (
+            budget_id INT NOT NULL,
+            period_start DATE NOT NULL,
+            user_id INT NOT NULL,
+            spent DECIMAL(14,2) NOT NULL DEFAULT 0,
+            notified_pct INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (budget_id, period_start),
+            KEY idx_budget_state_user_period (user_id, period_start)
+        )
+        """,
+    ]),
+    (7, "Leases on recurring_income and one income row per schedule occurrence", [
+        "ALTER TABLE recurring_income ADD COLUMN lease_owner VARCHAR(64) NULL",
+        "ALTER TABLE recurring_income ADD COLUMN lease_expires DATETIME NULL",
+        "ALTER TABLE income_tracker ADD COLUMN recurring_id INT NULL",
+        # NULL for manual income, which may repeat freely
+        "CREATE UNIQUE INDEX uq_income_recurring_date ON income_tracker (recurring_id, date)",
+    ]),
+    (8, "Back-reference from expenses to the recurring transaction that wrote them", [
+        "ALTER TABLE expenses_tracker ADD COLUMN recurring_id INT NULL",
+        "CREATE UNIQUE INDEX uq_expenses_recurring_date ON expenses_tracker (recurring_id, date)",
+    ]),
+    (9, "Project future recurring expenses instead of storing them", [
+        # Schedules from before next_due_date was filled in wrote every
+        # occurrence without a back-reference; keep them as they are
+        "UPDATE recurring_transactions SET next_due_date = end_date + INTERVAL 1 DAY "
+        "WHERE next_due_date < start_date",
+        # Stored future occurrences become due again and are projected meanwhile
+        """
+        UPDATE recurring_transactions r
+        JOIN (
+            SELECT recurring_id, MIN(date) AS first_future
+            FROM expenses_tracker
+            WHERE recurring_id IS NOT NULL AND date > CURDATE()
+            GROUP BY recurring_id
+        ) f ON f.recurring_id = r.recurring_id
+        SET r.next_due_date = f.first_future
+        """,
+        "DELETE FROM expenses_tracker WHERE recurring_id IS NOT NULL AND date > CURDATE()",
+        # Rebuild the rollup and budget spending without the deleted rows
+        "DELETE FROM user_month_totals",
+        """
+        INSERT INTO user_month_totals
+            (user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount)
+        SELECT user_id, DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY) AS month, 'expense' AS kind,
+               category, 0 AS source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM expenses_tracker
+        GROUP BY user_id, month, category
+        """,
+        """
+        INSERT INTO user_month_totals
+            (user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount)
+        SELECT user_id, DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY) AS month, 'income' AS kind,
+               '' AS category, source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM income_tracker
+        GROUP BY user_id, month, source_id
+        """,
+        """
+        UPDATE budget_state s
+        JOIN budgets b ON b.id = s.budget_id
+        SET s.spent = (
+            SELECT COALESCE(SUM(t.total), 0)
+            FROM user_month_totals t
+            WHERE t.user_id = s.user_id AND t.kind = 'expense'
+            AND t.month >= s.period_start
+            AND t.month < CASE b.frequency
+                WHEN 'Monthly' THEN s.period_start + INTERVAL 1 MONTH
+                ELSE s.period_start + INTERVAL 1 YEAR END
+            AND (b.category IS NULL OR t.category = b.category)
+        )
+        """,
+    ]),
+    (10, "Import fingerprints, unique per user, in place of the duplicate-row scan", [
+        "ALTER TABLE income_tracker ADD COLUMN fingerprint BINARY(16) NULL",
+        "ALTER TABLE expenses_tracker ADD COLUMN fingerprint BINARY(16) NULL",
+        # Existing rows are numbered as if imported in id order. Files imported
+        # before had their repeated rows merged into one, so re-importing such
+        # a file adds the repeats; rows added later without a fingerprint are
+        # matched by the import on their fields instead
+        # Same normalization as fingerprints.fingerprint()
+        """
+        UPDATE income_tracker t
+        JOIN (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id, date, amount, LOWER(TRIM(description)) ORDER BY id
+            ) - 1 AS o
+            FROM income_tracker
+        ) n ON n.id = t.id
+        SET t.fingerprint = UNHEX(MD5(CONCAT_WS('|', t.date, t.amount, LOWER(TRIM(t.description)), n.o)))
+        """,
+        """
+        UPDATE expenses_tracker t
+        JOIN (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY user_id, date, amount, LOWER(TRIM(description)), LOWER(TRIM(category)) ORDER BY id
+            ) - 1 AS o
+            FROM expenses_tracker
+        ) n ON n.id = t.id
+        SET t.fingerprint = UNHEX(MD5(CONCAT_WS(
+            '|', t.date, t.amount, LOWER(TRIM(t.description)), LOWER(TRIM(t.category)), n.o
+        )))
+        """,
+        "CREATE UNIQUE INDEX uq_income_user_fingerprint ON income_tracker (user_id, fingerprint)",
+        "CREATE UNIQUE INDEX uq_expenses_user_fingerprint ON expenses_tracker (user_id, fingerprint)",
+    ]),
+]
+
+# Errors meaning the statement's effect is already present (e.g. an index
+# created by hand before migrations existed), so it is safe to carry on.
+ALREADY_APPLIED_ERRORS = {
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+    1050,  # Table already exists
+}
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def plan_migrations():
+    """Return the migrations that have not been applied yet, in order"""
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        ensure_migrations_table(cursor)
+        applied = get_applied_versions(cursor)
+        return [m for m in sorted(MIGRATIONS, key=lambda m: m[0]) if m[0] not in applied]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def apply_migrations(dry_run=False):
+    """Apply pending migrations in order. With dry_run, only print the plan."""
+    pending = plan_migrations()
+    if not pending:
+        print("Schema is up to date")
+        return True, []
+
+    if dry_run:
+        for version, description, statements in pending:
+            print(f"[pending] {version:04d} {description}")
+            for statement in statements:
+                print(f"    {statement};")
+        return True, [m[0] for m in pending]
+
+    applied = []
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        for version, description, statements in pending:
+            # DDL commits implicitly in MySQL, so each statement is made
+            # idempotent instead of relying on a wrapping transaction
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                except mysql.connector.Error as err:
+                    if err.errno not in ALREADY_APPLIED_ERRORS:
+                        raise
+                    print(f"Migration {version:04d}: skipping, already present ({err.msg})")
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description)
+            )
+            connection.commit()
+            applied.append(version)
+            print(f"Applied migration {version:04d}: {description}")
+        return True, applied
+    except mysql.connector.Error as err:
+        print(f"Error applying migrations: {err}")
+        return False, applied
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without executing it")
+    args = parser.parse_args()
+    apply_migrations(dry_run=args.dry_run)
@@ -0,0 +1,38 @@
+import queue
+import tkinter as tk
+
+# How often the Tk thread shows notifications posted by the data layer
+POLL_INTERVAL_MS = 250
+
+_pending = queue.Queue()
+
+
+def post(title, message):
+    """Queue a notification for the user; safe to call from any thread"""
+    _pending.put((title, message))
+
+
+def drain():
+    """Remove and return every pending (title, message)"""
+    notifications = []
+    while True:
+        try:
+            notifications.append(_pending.get_nowait())
+        except queue.Empty:
+            return notifications
+
+
+def install(root, show):
+    """Poll the queue on root's event loop, passing each notification to show(title, message)"""
+    def poll():
+        for title, message in drain():
+            try:
+                show(title, message)
+            except Exception as e:
+                print(f"Error showing notification: {e}")
+        try:
+            root.after(POLL_INTERVAL_MS, poll)
+        except tk.TclError:
+            pass  # The window was destroyed
+
+    poll()
@@ -0,0 +1,36 @@
+from datetime import date, datetime
+
+# Half-open [start, end) date ranges for period filters. Comparing the raw
+# column against these (date >= start AND date < end) keeps the predicate
+# sargable, unlike MONTH(date) = ... which hides the column from any index.
+
+
+def as_date(value):
+    """A date from a date, a datetime or a 'YYYY-MM-DD' string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def month_range(year, month):
+    """First day of the month and first day of the following month"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def year_range(year):
+    """First day of the year and first day of the following year"""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def current_month_range(today=None):
+    today = today or date.today()
+    return month_range(today.year, today.month)
+
+
+def current_year_range(today=None):
+    today = today or date.today()
+    return year_range(today.year)
@@ -0,0 +1,140 @@
+import heapq
+import itertools
+import mysql.connector
+from pages.common.cache import RECURRING, cached, skip_store
+from pages.common.db_pool import get_db_connection
+from pages.common.periods import as_date
+from pages.common.recurrence import expand
+
+# Recurring expenses are rules, not rows: occurrences up to today are written
+# to expenses_tracker by the recurring transactions processor, and everything
+# from next_due_date on is generated here when a view asks for it. Projected
+# rows look like expense rows, with id = -recurring_id so that (date, id)
+# stays a unique sort key next to real rows (which all have positive ids).
+
+
+@cached(RECURRING)
+def get_scheduled_expenses(user_id):
+    """The user's recurring transactions that still have occurrences to come"""
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT recurring_id, name, amount, category, recurrence, start_date, end_date, next_due_date
+            FROM recurring_transactions
+            WHERE user_id = %s AND next_due_date <= end_date
+            """,
+            (user_id,)
+        )
+        return cursor.fetchall()
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+        skip_store()
+        return []
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def count_occurrences(anchors, frequencies, starts, ends):
+    """Number of occurrences of many schedules within their [start, end] windows"""
+    if not anchors:
+        return 0
+    indexes, _ = expand(anchors, frequencies, starts, ends)
+    return len(indexes)
+
+
+def _matches(schedule, category, min_amount, max_amount, description):
+    if category and schedule["category"] != category:
+        return False
+    if min_amount and schedule["amount"] < min_amount:
+        return False
+    if max_amount and schedule["amount"] > max_amount:
+        return False
+    # LIKE on the default collation ignores case
+    if description and description.casefold() not in (schedule["name"] or "").casefold():
+        return False
+    return True
+
+
+def project_expenses(user_id, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None,
+                     description=None, descending=False, before=None, after=None):
+    """Yield the user's future recurring expenses as expense rows, in (date, id)
+    order, for the same filters as the expense queries.
+
+    Occurrences of all matching schedules are generated in one pass and then
+    merged lazily, so a caller that stops after a page does not sort the rest.
+    before and after are (date, id) keyset cursors: only rows sorting before
+    or after them are yielded, for descending and ascending pages."""
+    schedules = [
+        schedule for schedule in get_scheduled_expenses(user_id)
+        if _matches(schedule, category, min_amount, max_amount, description)
+    ]
+    windows = []
+    for schedule in schedules:
+        start = schedule["next_due_date"]
+        end = schedule["end_date"]
+        if start_date:
+            start = max(start, as_date(start_date))
+        if end_date:
+            end = min(end, as_date(end_date))
+        if before is not None:
+            end = min(end, as_date(before[0]))
+        if after is not None:
+            start = max(start, as_date(after[0]))
+        windows.append((start, end))
+    if not schedules:
+        return
+
+    indexes, dates = expand(
+        [schedule["start_date"] for schedule in schedules],
+        [schedule["recurrence"] for schedule in schedules],
+        [start for start, _ in windows],
+        [end for _, end in windows],
+    )
+    indexes = indexes.tolist()
+    dates = dates.tolist()
+
+    # expand() groups occurrences by schedule, each run already in date order
+    streams = []
+    for index, run in itertools.groupby(range(len(indexes)), key=indexes.__getitem__):
+        schedule = schedules[index]
+        run_dates = [dates[position] for position in run]
+        if descending:
+            run_dates.reverse()
+        streams.append([
+            {
+                "id": -schedule["recurring_id"],
+                "description": schedule["name"],
+                "amount": schedule["amount"],
+                "category": schedule["category"],
+                "date": occurrence,
+                "recurring_id": schedule["recurring_id"],
+            }
+            for occurrence in run_dates
+        ])
+
+    rows = heapq.merge(*streams, key=sort_key, reverse=descending)
+    if before is not None:
+        before = (as_date(before[0]), before[1])
+        rows = (row for row in rows if sort_key(row) < before)
+    if after is not None:
+        after = (as_date(after[0]), after[1])
+        rows = (row for row in rows if sort_key(row) > after)
+    yield from rows
+
+
+def sort_key(row):
+    return row["date"], row["id"]
+
+
+def merge(*streams, descending=False):
+    """Merge sorted streams of expense rows lazily by (date, id)"""
+    return heapq.merge(*streams, key=sort_key, reverse=descending)
+
+
+def daily_totals(rows):
+    """Collapse date-ordered expense rows into (date, total) pairs, lazily"""
+    for day, group in itertools.groupby(rows, key=lambda row: row["date"]):
+        yield day, sum(row["amount"] for row in group)
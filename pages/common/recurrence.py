@@ -0,0 +1,126 @@
+# Frequency -> (count, unit). Month-based schedules keep the day of month of
+# their anchor (the schedule's start date) and clamp it to the last day of
+# shorter months, so a schedule starting Jan 31 runs Feb 28 (29), Mar 31, ...
+STEPS = {
+    "Daily": (1, "D"),
+    "Weekly": (7, "D"),
+    "Monthly": (1, "M"),
+    "Bi-monthly": (2, "M"),
+    "Quarterly": (3, "M"),
+    "Semi-annually": (6, "M"),
+    "Annually": (12, "M"),
+    # Recurring expenses call it Yearly
+    "Yearly": (12, "M"),
+}
+
+FREQUENCIES = ("Daily", "Weekly", "Monthly", "Bi-monthly", "Quarterly", "Semi-annually", "Annually")
+
+
+def step(frequency):
+    try:
+        return STEPS[frequency]
+    except KeyError:
+        raise ValueError(f"Unknown frequency: {frequency}")
+
+
+def max_gap_days(frequency):
+    """Upper bound on the days between two consecutive occurrences"""
+    count, unit = step(frequency)
+    return count if unit == "D" else 31 * count
+
+
+def _expand_group(np, anchors, starts, ends, count, unit):
+    """Occurrences k = 0, 1, ... of anchors falling in [starts, ends], for
+    schedules sharing one step. Returns (schedule positions, dates)."""
+    if unit == "D":
+        # First k on or after start, last k on or before end
+        first = np.maximum(0, -((anchors - starts).astype(np.int64) // count))
+        last = (ends - anchors).astype(np.int64) // count
+    else:
+        anchor_months = anchors.astype("datetime64[M]")
+        first = np.maximum(0, (starts.astype("datetime64[M]") - anchor_months).astype(np.int64) // count)
+        last = (ends.astype("datetime64[M]") - anchor_months).astype(np.int64) // count
+
+    counts = np.maximum(last - first + 1, 0)
+    positions = np.repeat(np.arange(len(anchors)), counts)
+    # k runs from first to last within each schedule
+    offsets = np.cumsum(counts) - counts
+    k = first[positions] + np.arange(counts.sum()) - offsets[positions]
+
+    if unit == "D":
+        dates = anchors[positions] + (k * count).astype("timedelta64[D]")
+    else:
+        months = anchor_months[positions] + (k * count).astype("timedelta64[M]")
+        month_starts = months.astype("datetime64[D]")
+        days_in_month = ((months + 1).astype("datetime64[D]") - month_starts).astype(np.int64)
+        anchor_days = (anchors - anchor_months.astype("datetime64[D]")).astype(np.int64)
+        day = np.minimum(anchor_days[positions], days_in_month - 1)
+        dates = month_starts + day.astype("timedelta64[D]")
+
+    # The first and last months may hold an occurrence outside the window
+    keep = (dates >= starts[positions]) & (dates <= ends[positions])
+    return positions[keep], dates[keep]
+
+
+def expand(anchors, frequencies, starts, ends):
+    """Every occurrence of many schedules at once.
+
+    Schedule i recurs by frequencies[i] from anchors[i]; its occurrences
+    within [starts[i], ends[i]] (dates, inclusive) are returned as two
+    aligned numpy arrays (schedule index, datetime64[D] date), ordered by
+    schedule and then date."""
+    import numpy as np
+
+    anchors = np.asarray(anchors, dtype="datetime64[D]")
+    starts = np.asarray(starts, dtype="datetime64[D]")
+    ends = np.asarray(ends, dtype="datetime64[D]")
+    frequencies = np.asarray(frequencies, dtype=object)
+
+    groups = []
+    counts = np.zeros(len(anchors), dtype=np.int64)
+    for frequency in set(frequencies.tolist()):
+        count, unit = step(frequency)
+        members = np.flatnonzero(frequencies == frequency)
+        positions, dates = _expand_group(
+            np, anchors[members], starts[members], ends[members], count, unit
+        )
+        group_counts = np.bincount(positions, minlength=len(members))
+        counts[members] = group_counts
+        groups.append((members, positions, dates, group_counts))
+
+    # Each group is already ordered by schedule and date, so its rows are
+    # scattered into place instead of sorting the whole result
+    offsets = np.cumsum(counts) - counts
+    indexes = np.repeat(np.arange(len(anchors)), counts)
+    result = np.empty(counts.sum(), dtype="datetime64[D]")
+    for members, positions, dates, group_counts in groups:
+        group_offsets = np.cumsum(group_counts) - group_counts
+        rank = np.arange(len(positions)) - group_offsets[positions]
+        result[offsets[members[positions]] + rank] = dates
+    return indexes, result
+
+
+def next_occurrences(anchors, frequencies, afters):
+    """The first occurrence after afters[i] of each schedule, as a list of dates"""
+    import numpy as np
+
+    afters = np.asarray(afters, dtype="datetime64[D]")
+    starts = afters + np.timedelta64(1, "D")
+    gaps = np.array([max_gap_days(frequency) for frequency in frequencies], dtype="timedelta64[D]")
+    # Before its anchor, a schedule's next occurrence is the anchor itself
+    starts = np.maximum(starts, np.asarray(anchors, dtype="datetime64[D]"))
+    indexes, dates = expand(anchors, frequencies, starts, starts + gaps)
+    _, first = np.unique(indexes, return_index=True)
+    return dates[first].tolist()
+
+
+def occurrence_dates(anchor, frequency, start, end):
+    """Occurrences of one schedule within [start, end], as a list of dates"""
+    _, dates = expand([anchor], [frequency], [start], [end])
+    return dates.tolist()
+
+
+def next_occurrence(anchor, frequency, after):
+    """The first occurrence of one schedule after the date after"""
+    return next_occurrences([anchor], [frequency], [after])[0]
+
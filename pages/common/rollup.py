@@ -0,0 +1,185 @@
+import argparse
+import mysql.connector
+from decimal import Decimal
+from pages.common.db_pool import get_db_connection
+from pages.common.periods import as_date, month_range
+
+# user_month_totals keeps per-user, per-month sums of the tracker tables so the
+# summary views read a handful of rows instead of re-SUMming raw history.
+# Expense rows are keyed by category, income rows by source_id; the unused key
+# column holds its default so both kinds share one primary key. The table is
+# created and backfilled by migration 4.
+EXPENSE = "expense"
+INCOME = "income"
+
+_MONTH_OF_DATE = "DATE_SUB(date, INTERVAL DAYOFMONTH(date) - 1 DAY)"
+
+_AGGREGATE = {
+    EXPENSE: f"""
+        SELECT user_id, {_MONTH_OF_DATE} AS month, 'expense' AS kind, category, 0 AS source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM expenses_tracker
+        {{where}}
+        GROUP BY user_id, month, category
+    """,
+    INCOME: f"""
+        SELECT user_id, {_MONTH_OF_DATE} AS month, 'income' AS kind, '' AS category, source_id,
+               SUM(amount) AS total, COUNT(*) AS txn_count, MIN(amount) AS min_amount, MAX(amount) AS max_amount
+        FROM income_tracker
+        {{where}}
+        GROUP BY user_id, month, source_id
+    """,
+}
+
+_KEY_COLUMN = {EXPENSE: "category", INCOME: "source_id"}
+
+_INSERT_COLUMNS = "(user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount)"
+
+_UPSERT = f"""
+    INSERT INTO user_month_totals {_INSERT_COLUMNS}
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total = total + VALUES(total),
+        txn_count = txn_count + VALUES(txn_count),
+        min_amount = LEAST(COALESCE(min_amount, VALUES(min_amount)), VALUES(min_amount)),
+        max_amount = GREATEST(COALESCE(max_amount, VALUES(max_amount)), VALUES(max_amount))
+"""
+
+
+def month_start(value):
+    value = as_date(value)
+    return value.replace(day=1)
+
+
+def _key_values(kind, key):
+    return (key, 0) if kind == EXPENSE else ("", key)
+
+
+def add_to_rollup(cursor, user_id, kind, rows):
+    """Fold newly inserted rows into the rollup. rows: iterable of (key, date, amount)
+    where key is the category for expenses and the source_id for income.
+    Runs on the caller's cursor so it commits together with the insert."""
+    buckets = {}
+    for key, row_date, amount in rows:
+        bucket_key = (key, month_start(row_date))
+        amount = Decimal(str(amount))
+        total, count, low, high = buckets.get(bucket_key, (Decimal("0"), 0, amount, amount))
+        buckets[bucket_key] = (total + amount, count + 1, min(low, amount), max(high, amount))
+
+    params = [
+        (user_id, month, kind, *_key_values(kind, key), total, count, low, high)
+        for (key, month), (total, count, low, high) in buckets.items()
+    ]
+    if params:
+        cursor.executemany(_UPSERT, params)
+
+
+def refresh_buckets(cursor, user_id, kind, buckets):
+    """Recompute rollup rows from the base table after an update or delete.
+    buckets: iterable of (key, date) identifying the affected months."""
+    key_column = _KEY_COLUMN[kind]
+    for key, month in {(key, month_start(row_date)) for key, row_date in buckets}:
+        start, end = month_range(month.year, month.month)
+        category, source_id = _key_values(kind, key)
+        cursor.execute(
+            """DELETE FROM user_month_totals
+               WHERE user_id = %s AND kind = %s AND month = %s AND category = %s AND source_id = %s""",
+            (user_id, kind, month, category, source_id)
+        )
+        where = f"WHERE user_id = %s AND {key_column} = %s AND date >= %s AND date < %s"
+        cursor.execute(
+            f"INSERT INTO user_month_totals {_INSERT_COLUMNS} " + _AGGREGATE[kind].format(where=where),
+            (user_id, key, start, end)
+        )
+
+
+def remove_category(cursor, user_id, category):
+    cursor.execute(
+        "DELETE FROM user_month_totals WHERE user_id = %s AND kind = 'expense' AND category = %s",
+        (user_id, category)
+    )
+
+
+def rebuild_statements(user_id=None):
+    """Statements that recompute the rollup from scratch, for one user or everyone"""
+    if user_id is None:
+        return [
+            ("DELETE FROM user_month_totals", ()),
+            (f"INSERT INTO user_month_totals {_INSERT_COLUMNS} " + _AGGREGATE[EXPENSE].format(where=""), ()),
+            (f"INSERT INTO user_month_totals {_INSERT_COLUMNS} " + _AGGREGATE[INCOME].format(where=""), ()),
+        ]
+    where = "WHERE user_id = %s"
+    return [
+        ("DELETE FROM user_month_totals WHERE user_id = %s", (user_id,)),
+        (f"INSERT INTO user_month_totals {_INSERT_COLUMNS} " + _AGGREGATE[EXPENSE].format(where=where), (user_id,)),
+        (f"INSERT INTO user_month_totals {_INSERT_COLUMNS} " + _AGGREGATE[INCOME].format(where=where), (user_id,)),
+    ]
+
+
+def rebuild_rollup(user_id=None):
+    """Recompute user_month_totals from the tracker tables in one transaction"""
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        for statement, params in rebuild_statements(user_id):
+            cursor.execute(statement, params)
+        connection.commit()
+        return True, "Rollup rebuilt successfully"
+    except mysql.connector.Error as err:
+        if connection:
+            connection.rollback()
+        return False, f"Error rebuilding rollup: {err}"
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
+
+
+def verify_rollup(user_id=None):
+    """Compare the rollup with a fresh aggregate; returns a list of mismatched buckets"""
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        where = "WHERE user_id = %s" if user_id is not None else ""
+        params = (user_id,) if user_id is not None else ()
+
+        expected = {}
+        for kind in (EXPENSE, INCOME):
+            cursor.execute(_AGGREGATE[kind].format(where=where), params)
+            for row in cursor.fetchall():
+                expected[tuple(row[:5])] = tuple(row[5:])
+
+        cursor.execute(
+            f"SELECT user_id, month, kind, category, source_id, total, txn_count, min_amount, max_amount "
+            f"FROM user_month_totals {where}",
+            params
+        )
+        actual = {tuple(row[:5]): tuple(row[5:]) for row in cursor.fetchall()}
+
+        mismatches = []
+        for bucket in expected.keys() | actual.keys():
+            if expected.get(bucket) != actual.get(bucket):
+                mismatches.append((bucket, expected.get(bucket), actual.get(bucket)))
+        return mismatches
+    finally:
+        cursor.close()
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the user_month_totals rollup")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--user", type=int, default=None, help="limit to one user_id")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        success, message = rebuild_rollup(args.user)
+        print(message)
+    else:
+        mismatches = verify_rollup(args.user)
+        for bucket, expected, actual in mismatches:
+            print(f"Mismatch {bucket}: expected {expected}, rollup has {actual}")
+        print(f"{len(mismatches)} mismatched bucket(s)")
@@ -0,0 +1,146 @@
+import heapq
+import threading
+import time as clock
+from datetime import date, datetime, time
+
+# Longest single sleep, so clock changes and day rollovers are noticed
+MAX_SLEEP_SECONDS = 3600
+# How often due dates are reloaded anyway, to pick up schedules changed by
+# another process (the standalone service or a second client)
+RESYNC_SECONDS = 3600
+# Back-off after a failed or stalled run
+RETRY_SECONDS = 60
+
+_lock = threading.Lock()
+_running = {}   # topic -> set of running schedulers
+
+
+def notify(topic, due_date=None):
+    """Wake this process's schedulers for topic after a schedule was added,
+    edited or removed. With due_date, it is queued without a reload."""
+    with _lock:
+        schedulers = list(_running.get(topic, ()))
+    for scheduler in schedulers:
+        scheduler.wake(due_date)
+
+
+def log(message):
+    print(f"[{datetime.now()}] {message}")
+
+
+class DueDateScheduler:
+    """Runs process() when the earliest due date arrives, instead of polling.
+
+    load() returns the due dates of all active schedules, which are kept in
+    a min-heap; the thread sleeps until midnight of the earliest one or until
+    notify() wakes it. process() handles everything due and returns
+    (success, message)."""
+
+    def __init__(self, topic, load, process):
+        self.topic = topic
+        self.load = load
+        self.process = process
+        self._heap = []
+        self._pushed = []       # dates queued by wake() since the last load began
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._reload = True
+        # Set by wake() so a wake between computing a sleep and starting it
+        # is not lost
+        self._woken = False
+        self._loaded_at = None
+        self._thread = None
+
+    def start(self):
+        """Run in a daemon thread; stop() ends it"""
+        with _lock:
+            _running.setdefault(self.topic, set()).add(self)
+        self._thread = threading.Thread(target=self.run, name=f"{self.topic}-scheduler", daemon=True)
+        self._thread.start()
+        log(f"{self.topic} scheduler started")
+
+    def stop(self, timeout=5):
+        with _lock:
+            _running.get(self.topic, set()).discard(self)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        log(f"{self.topic} scheduler stopped")
+
+    def wake(self, due_date=None):
+        with self._condition:
+            if due_date is None:
+                self._reload = True
+            else:
+                heapq.heappush(self._heap, due_date)
+                self._pushed.append(due_date)
+            self._woken = True
+            self._condition.notify_all()
+
+    def _refresh(self):
+        """Reload the heap when asked to or when the last load is stale"""
+        with self._condition:
+            stale = self._loaded_at is None or clock.monotonic() - self._loaded_at >= RESYNC_SECONDS
+            if not (self._reload or stale):
+                return True
+            self._reload = False
+            self._pushed = []
+        try:
+            due_dates = list(self.load())
+        except Exception as e:
+            log(f"Error loading {self.topic} due dates: {e}")
+            return False
+        with self._condition:
+            # Dates queued while load() ran may be missing from its result
+            due_dates.extend(self._pushed)
+            heapq.heapify(due_dates)
+            self._heap = due_dates
+            self._loaded_at = clock.monotonic()
+        return True
+
+    def _earliest(self):
+        with self._condition:
+            return self._heap[0] if self._heap else None
+
+    def _sleep(self, seconds):
+        with self._condition:
+            if not (self._stopping or self._reload or self._woken):
+                self._condition.wait(max(seconds, 0))
+            self._woken = False
+
+    def _seconds_until_due(self):
+        earliest = self._earliest()
+        seconds = MAX_SLEEP_SECONDS
+        if earliest is not None:
+            seconds = (datetime.combine(earliest, time.min) - datetime.now()).total_seconds()
+        if self._loaded_at is not None:
+            seconds = min(seconds, RESYNC_SECONDS - (clock.monotonic() - self._loaded_at))
+        return min(seconds, MAX_SLEEP_SECONDS)
+
+    def run(self):
+        """Scheduler loop; call directly to run in the foreground"""
+        while not self._stopping:
+            if not self._refresh():
+                self._sleep(RETRY_SECONDS)
+                continue
+
+            earliest = self._earliest()
+            if earliest is None or earliest > date.today():
+                self._sleep(self._seconds_until_due())
+                continue
+
+            try:
+                success, message = self.process()
+                log(message if success else f"Warning: {message}")
+            except Exception as e:
+                success = False
+                log(f"Error processing {self.topic}: {e}")
+
+            with self._condition:
+                self._reload = True
+            self._refresh()
+            # Nothing moved past the date that was due: do not spin on it
+            if not success or self._earliest() == earliest:
+                self._sleep(RETRY_SECONDS)
@@ -1,4 +1,3 @@
-import requests
 from datetime import datetime
 from .constants import EXCHANGE_RATE_API_URL
 
@@ -9,6 +8,8 @@ class CurrencyExchangeAPI:
         
     def get_exchange_rate(self, from_currency, to_currency):
         """Get exchange rate between two currencies"""
+        import requests
+
         try:
             # Check cache first
             current_time = datetime.now()
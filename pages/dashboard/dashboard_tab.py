@@ -1,56 +1,15 @@
-import mysql.connector
-import os
-from dotenv import load_dotenv
 import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime
-import matplotlib.pyplot as plt
 from io import BytesIO
-from PIL import Image, ImageTk
-
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
-
-def get_expenses_and_categories(user_id):
-    try:
-        connection = get_db_connection()
-        cursor = connection.cursor(dictionary=True)
-
-        # Fetch expenses grouped by category
-        query = """
-            SELECT category, SUM(amount) AS total_expense
-            FROM expenses_tracker
-            WHERE user_id = %s
-            GROUP BY category
-        """
-        cursor.execute(query, (user_id,))
-        expenses = cursor.fetchall()
-
-        # Fetch all categories
-        query = """
-            SELECT name
-            FROM expenses_category
-            WHERE user_id = %s
-        """
-        cursor.execute(query, (user_id,))
-        categories = cursor.fetchall()
-
-        return expenses, categories
-    except mysql.connector.Error as err:
-        print(f"Error fetching expenses and categories: {err}")
-        return [], []
-    finally:
-        cursor.close()
-        connection.close()
+from pages.common.executor import LatestRequest
+from .database import get_monthly_data
+
 
 def create_chart(income, expenses):
+    # Imported on first draw rather than with the module; pyplot is slow to load
+    import matplotlib.pyplot as plt
+
     # Extract categories for expenses and sources for income
     expense_categories = [item['category'] for item in expenses]
     income_sources = [item['source_name'] for item in income]
@@ -84,47 +43,12 @@ def create_chart(income, expenses):
     buffer.seek(0)
     return buffer
 
-def get_monthly_data(user_id):
-    try:
-        connection = get_db_connection()
-        cursor = connection.cursor(dictionary=True)
-
-        # Fetch monthly expenses grouped by category
-        query_expenses = """
-            SELECT category, SUM(amount) AS total_expense
-            FROM expenses_tracker
-            WHERE user_id = %s AND MONTH(date) = MONTH(CURRENT_DATE())
-            AND YEAR(date) = YEAR(CURRENT_DATE())
-            GROUP BY category
-        """
-        cursor.execute(query_expenses, (user_id,))
-        expenses = cursor.fetchall()
-
-        # Fetch monthly income grouped by source and map source_id to source_name
-        query_income = """
-            SELECT s.name AS source_name, SUM(i.amount) AS total_income
-            FROM income_tracker i
-            JOIN income_sources s ON i.source_id = s.id
-            WHERE i.user_id = %s AND MONTH(i.date) = MONTH(CURRENT_DATE())
-            AND YEAR(i.date) = YEAR(CURRENT_DATE())
-            GROUP BY i.source_id
-        """
-        cursor.execute(query_income, (user_id,))
-        income = cursor.fetchall()
-
-        return income, expenses
-    except mysql.connector.Error as err:
-        print(f"Error fetching monthly data: {err}")
-        return [], []
-    finally:
-        cursor.close()
-        connection.close()
-
 def create_dashboard_tab(notebook, user_id):
     # Create a new tab frame for the dashboard
     tab_frame = ttk.Frame(notebook)
+    loader = LatestRequest()
 
-    def refresh_dashboard():
+    def clear_tab():
         # Clear the current contents of the tab frame
         for widget in tab_frame.winfo_children():
             widget.destroy()
@@ -132,8 +56,21 @@ def create_dashboard_tab(notebook, user_id):
         # Add a title
         tk.Label(tab_frame, text="Dashboard", font=("Arial", 16)).pack(pady=10)
 
-        # Fetch monthly data
-        income, expenses = get_monthly_data(user_id)
+    def refresh_dashboard():
+        clear_tab()
+        tk.Label(tab_frame, text="Loading...", font=("Arial", 12)).pack(pady=10)
+
+        # Fetch monthly data in the background
+        loader.submit(get_monthly_data, user_id, on_success=show_dashboard, on_error=show_error)
+
+    def show_error(error):
+        clear_tab()
+        tk.Label(tab_frame, text=f"Failed to load dashboard: {error}", fg="red").pack(pady=10)
+        tk.Button(tab_frame, text="Reload Dashboard", command=refresh_dashboard, bg="blue", fg="white").pack(pady=10)
+
+    def show_dashboard(data):
+        clear_tab()
+        income, expenses = data
         print("Income Data:", income)
         print("Expenses Data:", expenses)
 
@@ -148,6 +85,7 @@ def create_dashboard_tab(notebook, user_id):
         tk.Label(tab_frame, text=f"Net Savings: ${net_savings:.2f}", font=("Arial", 12)).pack(anchor="w", padx=20)
 
         # Generate the chart
+        from PIL import Image, ImageTk
         buffer = create_chart(income, expenses)
         chart_image = Image.open(buffer)
         chart_photo = ImageTk.PhotoImage(chart_image)
@@ -1,16 +1,7 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from pages.common.db_pool import get_db_connection
+from pages.common.periods import current_month_range
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_all_transactions():
     try:
@@ -26,4 +17,70 @@ def get_all_transactions():
         return []
     finally:
         cursor.close()
-        connection.close()
\ No newline at end of file
+        connection.close()
+
+def get_expenses_and_categories(user_id):
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+
+        # Fetch expenses grouped by category
+        query = """
+            SELECT category, SUM(amount) AS total_expense
+            FROM expenses_tracker
+            WHERE user_id = %s
+            GROUP BY category
+        """
+        cursor.execute(query, (user_id,))
+        expenses = cursor.fetchall()
+
+        # Fetch all categories
+        query = """
+            SELECT name
+            FROM expenses_category
+            WHERE user_id = %s
+        """
+        cursor.execute(query, (user_id,))
+        categories = cursor.fetchall()
+
+        return expenses, categories
+    except mysql.connector.Error as err:
+        print(f"Error fetching expenses and categories: {err}")
+        return [], []
+    finally:
+        cursor.close()
+        connection.close()
+
+def get_monthly_data(user_id):
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+
+        month_start, _ = current_month_range()
+
+        # Fetch monthly expenses grouped by category
+        query_expenses = """
+            SELECT category, total AS total_expense
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense' AND month = %s
+        """
+        cursor.execute(query_expenses, (user_id, month_start))
+        expenses = cursor.fetchall()
+
+        # Fetch monthly income grouped by source and map source_id to source_name
+        query_income = """
+            SELECT s.name AS source_name, t.total AS total_income
+            FROM user_month_totals t
+            JOIN income_sources s ON t.source_id = s.id
+            WHERE t.user_id = %s AND t.kind = 'income' AND t.month = %s
+        """
+        cursor.execute(query_income, (user_id, month_start))
+        income = cursor.fetchall()
+
+        return income, expenses
+    except mysql.connector.Error as err:
+        print(f"Error fetching monthly data: {err}")
+        return [], []
+    finally:
+        cursor.close()
+        connection.close()
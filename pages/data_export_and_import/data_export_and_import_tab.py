@@ -3,19 +3,21 @@ from tkinter import ttk, filedialog, messagebox
 from datetime import datetime
 from tkcalendar import DateEntry
 import csv
-import pandas as pd
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+import threading
 from .database import (
     get_income_records,
     get_expense_records,
+    count_income_records,
+    count_expense_records,
+    stream_income_records,
+    stream_expense_records,
     import_income_records,
     import_expense_records,
 )
-import openpyxl
+from .journal import ImportJournal, list_journals
+from .streaming import IMPORT_BATCH_SIZE, run_export, run_import
+from .validation import ImportValidator, reject_report_path
+from pages.common.executor import call_in_ui, submit
 
 def create_data_export_and_import_tab(notebook, user_id):
     tab_frame = ttk.Frame(notebook)
@@ -27,7 +29,16 @@ def create_data_export_and_import_tab(notebook, user_id):
     import_frame = ttk.LabelFrame(tab_frame, text="Import Data", padding="10")
     import_frame.pack(fill="x", padx=10, pady=5)
     
+    # pandas, reportlab and openpyxl are imported where they are used; they are
+    # slow to load and most sessions never export or import anything
+
     def create_pdf(filename, data, data_type):
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+
         doc = SimpleDocTemplate(filename, pagesize=letter)
         elements = []
         
@@ -124,27 +135,60 @@ def create_data_export_and_import_tab(notebook, user_id):
             initialfile=f"{data_type.lower()}_{current_date}{default_ext}"
         )
         
-        if filename:
-            try:
+        def show_progress(rows, fraction):
+            if fraction is None:
+                export_progress.config(mode="indeterminate")
+                export_progress.step(5)
+            else:
+                export_progress.config(mode="determinate", value=fraction * 100)
+            export_status.config(text=f"Exported {rows:,} rows...")
+
+        def write_export():
+            """Runs on a worker thread; returns False when there was nothing to export"""
+            if file_format == "PDF":
+                # The PDF table is laid out in one go, so it needs every row
                 if data_type == "Income":
                     data = get_income_records(user_id, start_date, end_date)
                 elif data_type == "Expenses":
                     data = get_expense_records(user_id, start_date, end_date)
-                    
                 if not data:
-                    messagebox.showinfo("Info", "No data to export for the selected date range")
-                    return
-                    
-                if file_format == "CSV":
-                    pd.DataFrame(data).to_csv(filename, index=False)
-                elif file_format == "Excel":
-                    pd.DataFrame(data).to_excel(filename, index=False)
-                elif file_format == "PDF":
-                    create_pdf(filename, data, data_type)
-                    
+                    return False
+                create_pdf(filename, data, data_type)
+                return True
+
+            # CSV and Excel are written batch by batch as rows arrive
+            if data_type == "Income":
+                total = count_income_records(user_id, start_date, end_date)
+                batches = stream_income_records(user_id, start_date, end_date)
+            elif data_type == "Expenses":
+                total = count_expense_records(user_id, start_date, end_date)
+                batches = stream_expense_records(user_id, start_date, end_date)
+            written = run_export(
+                filename, file_format, batches, total,
+                on_progress=lambda rows, fraction: call_in_ui(show_progress, rows, fraction)
+            )
+            return written > 0
+
+        def finish():
+            export_button.config(state="normal")
+            export_progress.config(mode="determinate", value=0)
+            export_status.config(text="")
+
+        def on_exported(exported):
+            finish()
+            if exported:
                 messagebox.showinfo("Success", "Data exported successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+            else:
+                messagebox.showinfo("Info", "No data to export for the selected date range")
+
+        def on_failed(e):
+            finish()
+            messagebox.showerror("Error", f"Failed to export data: {str(e)}")
+
+        if filename:
+            export_button.config(state="disabled")
+            export_status.config(text="Exporting...")
+            submit(write_export, on_success=on_exported, on_error=on_failed)
     
     # Export Options
     export_options = ttk.Frame(export_frame)
@@ -188,7 +232,13 @@ def create_data_export_and_import_tab(notebook, user_id):
     button_frame = ttk.Frame(export_options)
     button_frame.pack(fill="x", pady=5)
     
-    ttk.Button(button_frame, text="Export", command=export_data).pack(side="left", padx=5)
+    export_button = ttk.Button(button_frame, text="Export", command=export_data)
+    export_button.pack(side="left", padx=5)
+
+    export_progress = ttk.Progressbar(button_frame, mode="determinate", maximum=100)
+    export_progress.pack(side="left", fill="x", expand=True, padx=5)
+    export_status = ttk.Label(button_frame, text="")
+    export_status.pack(side="left", padx=5)
     
     # Import Section
     def import_data():
@@ -204,40 +254,78 @@ def create_data_export_and_import_tab(notebook, user_id):
         if not file_path:
             return
             
-        try:
-            # Read the file
-            if file_path.endswith('.csv'):
-                df = pd.read_csv(file_path)
+        cancel_event = threading.Event()
+
+        def show_progress(rows, fraction):
+            if fraction is None:
+                import_progress.config(mode="indeterminate")
+                import_progress.step(5)
             else:
-                df = pd.read_excel(file_path)
-            
-            # Convert date column to datetime and then to string in YYYY-MM-DD format
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-            
-            # Convert data to list of dictionaries
-            records = df.to_dict('records')
-            
-            result = {'success': False, 'message': 'No data type selected'}
-            
+                import_progress.config(mode="determinate", value=fraction * 100)
+            import_status.config(text=f"Imported {rows:,} rows...")
+
+        def read_and_import():
+            """Runs on a worker thread: stream the file and write it batch by batch"""
             if data_type == "Income":
-                result = import_income_records(user_id, records)
+                import_batch = lambda records: import_income_records(user_id, records)
             elif data_type == "Expenses":
-                result = import_expense_records(user_id, records)
-                
-            if result['success']:
+                import_batch = lambda records: import_expense_records(user_id, records)
+            else:
+                return {'success': False, 'message': 'No data type selected'}
+
+            # Picks up after the last committed batch if this file was
+            # imported before and did not finish
+            journal = ImportJournal.open(user_id, data_type, file_path, IMPORT_BATCH_SIZE)
+            if journal.rows_committed:
+                call_in_ui(import_status.config, {"text": f"Resuming after row {journal.rows_committed:,}..."})
+            validator = ImportValidator(data_type, reject_report_path(file_path))
+            return run_import(
+                file_path, import_batch, validator, cancel_event,
+                on_progress=lambda rows, fraction: call_in_ui(show_progress, rows, fraction),
+                journal=journal
+            )
+
+        def finish():
+            import_button.config(state="normal")
+            cancel_button.config(state="disabled", command=lambda: None)
+            import_progress.config(mode="determinate", value=0)
+            import_status.config(text="")
+
+        def on_imported(result):
+            finish()
+            counts = (
+                f"Added: {result.get('added', 0)}\n"
+                f"Updated: {result.get('updated', 0)}\n"
+                f"Skipped: {result.get('skipped', 0)}"
+            )
+            if result.get('rejects'):
+                counts += f"\n\nRejected rows and the reasons were written to:\n{result['rejects']}"
+            if not result['success']:
+                messagebox.showerror("Error", f"{result['message']}\n\nBatches imported before the error:\n{counts}")
+            elif result.get('cancelled'):
+                messagebox.showinfo("Import Cancelled", f"Import cancelled after {result['rows']:,} rows:\n{counts}")
+            else:
+                resumed = f"Resumed after row {result['resumed_from']:,}.\n" if result.get('resumed_from') else ""
                 messagebox.showinfo("Success", 
                     f"Import completed:\n"
-                    f"Added: {result['added']}\n"
-                    f"Updated: {result['updated']}\n"
-                    f"Skipped: {result['skipped']}\n\n"
+                    f"{resumed}"
+                    f"{counts}\n\n"
                     f"Please go to the Income Tracking tab to see your updated data."
                 )
-            else:
-                messagebox.showerror("Error", result['message'])
-                
-        except Exception as e:
+
+        def on_failed(e):
+            finish()
             messagebox.showerror("Error", f"Failed to import data: {str(e)}")
+
+        def cancel_import():
+            cancel_event.set()
+            cancel_button.config(state="disabled")
+            import_status.config(text="Cancelling after the current batch...")
+
+        import_button.config(state="disabled")
+        cancel_button.config(state="normal", command=cancel_import)
+        import_status.config(text="Reading file...")
+        submit(read_and_import, on_success=on_imported, on_error=on_failed)
     
     # Import Options
     import_options = ttk.Frame(import_frame)
@@ -269,6 +357,9 @@ def create_data_export_and_import_tab(notebook, user_id):
         
         if filename:
             try:
+                import pandas as pd
+                import openpyxl.styles
+
                 # Create template based on data type
                 if data_type == "Income":
                     template_data = {
@@ -323,7 +414,41 @@ def create_data_export_and_import_tab(notebook, user_id):
                 messagebox.showerror("Error", f"Failed to download template: {str(e)}")
     
     ttk.Button(import_options, text="Download Template", command=download_template).pack(side="left", padx=5)
-    ttk.Button(import_options, text="Import", command=import_data).pack(side="left", padx=5)
+    import_button = ttk.Button(import_options, text="Import", command=import_data)
+    import_button.pack(side="left", padx=5)
+    cancel_button = ttk.Button(import_options, text="Cancel", state="disabled")
+    cancel_button.pack(side="left", padx=5)
+
+    def show_import_history():
+        """List this user's import journals: what each import got through"""
+        window = tk.Toplevel(tab_frame)
+        window.title("Import History")
+        columns = ("file", "type", "status", "rows", "added", "updated", "skipped", "updated_at")
+        headings = ("File", "Type", "Status", "Rows Committed", "Added", "Updated", "Skipped", "Last Update")
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=12)
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=300 if column == "file" else 100)
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        for entry in list_journals(user_id):
+            tree.insert("", "end", values=(
+                entry['file'], entry['data_type'], entry['status'], entry['rows_committed'],
+                entry['added'], entry['updated'], entry['skipped'], entry.get('updated_at', ''),
+            ))
+        ttk.Label(
+            window,
+            text="Importing a file again resumes it after its last committed batch unless it completed."
+        ).pack(padx=10, pady=(0, 10))
+
+    ttk.Button(import_options, text="Import History", command=show_import_history).pack(side="left", padx=5)
+
+    progress_frame = ttk.Frame(import_frame)
+    progress_frame.pack(fill="x", padx=5, pady=5)
+    import_progress = ttk.Progressbar(progress_frame, mode="determinate", maximum=100)
+    import_progress.pack(side="left", fill="x", expand=True, padx=5)
+    import_status = ttk.Label(progress_frame, text="", width=30)
+    import_status.pack(side="left", padx=5)
     
     # Add help text
     help_frame = ttk.LabelFrame(tab_frame, text="Help", padding="10")
@@ -340,7 +465,12 @@ def create_data_export_and_import_tab(notebook, user_id):
     2. Download the template using 'Download Template' button
     3. Fill in your data following the template format
     4. Click 'Import' and select your filled template file
+    5. An interrupted import resumes where it stopped when you import the
+       same file again; 'Import History' shows how far each import got
     
+    Rows that cannot be imported are listed with the reason in a
+    <file>.rejects.csv next to the imported file.
+
     Note: For importing, your file must match the template format exactly.
     The date format should be YYYY-MM-DD (e.g., 2024-01-31)
     """
@@ -1,17 +1,14 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from collections import defaultdict
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from pages.common import budget_state
+from pages.common.cache import CATEGORIES, EXPENSE_RECORDS, INCOME_RECORDS, INCOME_SOURCES, invalidate
+from pages.common.db_pool import get_db_connection
+from pages.common.fingerprints import fingerprint, normalize
+from pages.common.periods import as_date, current_month_range
+from pages.common.rollup import EXPENSE, INCOME, add_to_rollup, refresh_buckets
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_all_transactions():
     try:
@@ -29,30 +26,56 @@ def get_all_transactions():
         cursor.close()
         connection.close()
 
+# Rows fetched from the server at a time when streaming an export
+EXPORT_BATCH_SIZE = 5000
+
+_INCOME_COLUMNS = "i.id, i.amount, i.description, i.date, s.name as source"
+_EXPENSE_COLUMNS = "id, description, amount, category, date"
+
+
+def _income_records_query(user_id, start_date, end_date):
+    """FROM and WHERE of a user's income records within a date range"""
+    query = """
+            FROM income_tracker i
+            JOIN income_sources s ON i.source_id = s.id
+            WHERE i.user_id = %s
+        """
+    params = [user_id]
+
+    if start_date:
+        query += " AND i.date >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND i.date <= %s"
+        params.append(end_date)
+    return query, tuple(params)
+
+
+def _expense_records_query(user_id, start_date, end_date):
+    """FROM and WHERE of a user's expense records within a date range"""
+    query = """
+            FROM expenses_tracker
+            WHERE user_id = %s
+        """
+    params = [user_id]
+
+    if start_date:
+        query += " AND date >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= %s"
+        params.append(end_date)
+    return query, tuple(params)
+
+
 def get_income_records(user_id, start_date=None, end_date=None):
     """Get all income records for a user within date range"""
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        query = """
-            SELECT i.id, i.amount, i.description, i.date, s.name as source
-            FROM income_tracker i
-            JOIN income_sources s ON i.source_id = s.id
-            WHERE i.user_id = %s
-        """
-        params = [user_id]
-        
-        if start_date:
-            query += " AND i.date >= %s"
-            params.append(start_date)
-        if end_date:
-            query += " AND i.date <= %s"
-            params.append(end_date)
-            
-        query += " ORDER BY i.date DESC"
-        
-        cursor.execute(query, tuple(params))
+        query, params = _income_records_query(user_id, start_date, end_date)
+        cursor.execute(f"SELECT {_INCOME_COLUMNS} {query} ORDER BY i.date DESC", params)
         records = cursor.fetchall()
         return records
     except Exception as e:
@@ -68,23 +91,8 @@ def get_expense_records(user_id, start_date=None, end_date=None):
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        query = """
-            SELECT id, description, amount, category, date
-            FROM expenses_tracker
-            WHERE user_id = %s
-        """
-        params = [user_id]
-        
-        if start_date:
-            query += " AND date >= %s"
-            params.append(start_date)
-        if end_date:
-            query += " AND date <= %s"
-            params.append(end_date)
-            
-        query += " ORDER BY date DESC"
-        
-        cursor.execute(query, tuple(params))
+        query, params = _expense_records_query(user_id, start_date, end_date)
+        cursor.execute(f"SELECT {_EXPENSE_COLUMNS} {query} ORDER BY date DESC", params)
         records = cursor.fetchall()
         return records
     except Exception as e:
@@ -94,12 +102,73 @@ def get_expense_records(user_id, start_date=None, end_date=None):
         cursor.close()
         connection.close()
 
+
+def _count(query, params):
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT COUNT(*) {query}", params)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def _stream(query, params, batch_size):
+    """Yield (column names, rows) batch_size rows at a time.
+
+    The cursor is unbuffered, so the server sends rows as they are fetched
+    and only one batch is held here. A stream abandoned part way still has
+    rows in flight, so its connection is disconnected rather than returned
+    to the pool; reading them out would load the rest of the result."""
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    finished = False
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield cursor.column_names, rows
+        finished = True
+    finally:
+        if finished:
+            cursor.close()
+            connection.close()
+        else:
+            connection.discard()
+
+
+def count_income_records(user_id, start_date=None, end_date=None):
+    """How many income records stream_income_records will yield"""
+    return _count(*_income_records_query(user_id, start_date, end_date))
+
+
+def stream_income_records(user_id, start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """get_income_records as (column names, rows) batches, for exports"""
+    query, params = _income_records_query(user_id, start_date, end_date)
+    return _stream(f"SELECT {_INCOME_COLUMNS} {query} ORDER BY i.date DESC", params, batch_size)
+
+
+def count_expense_records(user_id, start_date=None, end_date=None):
+    """How many expense records stream_expense_records will yield"""
+    return _count(*_expense_records_query(user_id, start_date, end_date))
+
+
+def stream_expense_records(user_id, start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """get_expense_records as (column names, rows) batches, for exports"""
+    query, params = _expense_records_query(user_id, start_date, end_date)
+    return _stream(f"SELECT {_EXPENSE_COLUMNS} {query} ORDER BY date DESC", params, batch_size)
+
 def get_budget_data(user_id):
     """Get budget data for a user"""
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
+        month_start, month_end = current_month_range()
+
         # Get expense categories and their budgets
         query = """
             SELECT ec.name as category, et.amount as spent,
@@ -108,12 +177,12 @@ def get_budget_data(user_id):
             LEFT JOIN expenses_tracker et 
                 ON ec.name = et.category 
                 AND et.user_id = ec.user_id
-                AND MONTH(et.date) = MONTH(CURRENT_DATE())
-                AND YEAR(et.date) = YEAR(CURRENT_DATE())
+                AND et.date >= %s
+                AND et.date < %s
             WHERE ec.user_id = %s
             GROUP BY ec.name
         """
-        cursor.execute(query, (user_id,))
+        cursor.execute(query, (month_start, month_end, user_id))
         records = cursor.fetchall()
         return records
     except Exception as e:
@@ -123,68 +192,213 @@ def get_budget_data(user_id):
         cursor.close()
         connection.close()
 
+# Rows per executemany or IN (...) list when importing
+IMPORT_CHUNK_SIZE = 1000
+
+
+def _chunks(rows, size=IMPORT_CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _name_key(name):
+    """Match names the way the default MySQL collation compares them:
+    case-insensitive and ignoring trailing spaces"""
+    return name.rstrip().casefold()
+
+
+def _parse_record(record, name_field):
+    """(date, amount, description, name, occurrence) from an imported record,
+    or ValueError for a row that cannot be stored. occurrence is None when
+    the record does not say."""
+    try:
+        row_date = as_date(record['date'])
+        amount = Decimal(str(record['amount'])).quantize(Decimal("0.01"))
+        description = record['description']
+        name = record[name_field]
+        occurrence = record.get('occurrence')
+        if occurrence is not None:
+            occurrence = int(occurrence)
+    except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+        raise ValueError(f"invalid record {record!r}: {e}")
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount in {record!r}")
+    for field, value in (('description', description), (name_field, name)):
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"missing {field} in {record!r}")
+    return row_date, amount, description, name, occurrence
+
+
+def _parse_records(data, name_field):
+    """Split records into (fingerprint, row) pairs and a count of rows to skip.
+
+    Records without an occurrence number are numbered here, among the
+    identical records of this call."""
+    parsed = []
+    skipped = 0
+    seen = {}
+    for record in data:
+        try:
+            row_date, amount, description, name, occurrence = _parse_record(record, name_field)
+        except ValueError as e:
+            print(f"Error processing record: {e}")
+            skipped += 1
+            continue
+        category = name if name_field == 'category' else None
+        if occurrence is None:
+            key = (row_date, amount, normalize(description), category and normalize(category))
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+        parsed.append((
+            fingerprint(row_date, amount, description, occurrence, category),
+            (row_date, amount, description, name),
+        ))
+    return parsed, skipped
+
+
+def _find_fingerprints(cursor, table, columns, user_id, fingerprints):
+    """Rows of the user's table with any of the fingerprints, by fingerprint"""
+    found = {}
+    for chunk in _chunks(list(fingerprints)):
+        cursor.execute(
+            f"""SELECT fingerprint, {columns} FROM {table}
+                WHERE user_id = %s AND fingerprint IN ({', '.join(['%s'] * len(chunk))})""",
+            (user_id, *chunk)
+        )
+        for row in cursor.fetchall():
+            found[row[0]] = row[1:]
+    return found
+
+
+def _match_unfingerprinted(cursor, table, name_column, user_id, pending):
+    """Rows without a fingerprint (entered by hand, posted by a schedule)
+    that records no fingerprint matched stand for, by fingerprint.
+
+    They are matched the way imports matched every row before fingerprints:
+    same date, amount and description, and for expenses category, compared
+    case-insensitively. Each row stands for one record. pending is a dict
+    of fingerprint -> (date, amount, description, name); the result maps a
+    fingerprint to (id, name column) of its row."""
+    if not pending:
+        return {}
+    name_in_key = name_column == "category"
+
+    def match_key(row_date, amount, description, name):
+        key = (row_date, amount, (description or "").strip().lower())
+        return key + ((name or "").strip().lower(),) if name_in_key else key
+
+    dates = [row[0] for row in pending.values()]
+    cursor.execute(
+        f"""SELECT id, date, amount, description, {name_column} FROM {table}
+            WHERE user_id = %s AND fingerprint IS NULL AND date >= %s AND date <= %s
+            ORDER BY id""",
+        (user_id, min(dates), max(dates))
+    )
+    candidates = defaultdict(list)
+    for row_id, row_date, amount, description, name in cursor.fetchall():
+        candidates[match_key(row_date, amount, description, name)].append((row_id, name))
+
+    matched = {}
+    for key, row in pending.items():
+        rows = candidates.get(match_key(*row))
+        if rows:
+            matched[key] = rows.pop(0)
+    return matched
+
+
+def _load_income_sources(cursor, user_id):
+    cursor.execute("SELECT id, name FROM income_sources WHERE user_id = %s", (user_id,))
+    return {_name_key(name): source_id for source_id, name in cursor.fetchall()}
+
+
 def import_income_records(user_id, data):
-    """Import income records for a user"""
+    """Import income records for a user.
+
+    Each record is identified by its fingerprint, and the rows it matches
+    are looked up through the (user_id, fingerprint) index. Records are
+    written with chunked INSERT ... ON DUPLICATE KEY UPDATE, so importing
+    a file again adds nothing. Rows without a fingerprint, such as income
+    entered by hand, are matched on their fields instead. A record matching
+    an existing row counts as updated and moves the row to the record's
+    source. Records that cannot be parsed are skipped."""
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
         
+        parsed, skipped = _parse_records(data, 'source')
         added = 0
         updated = 0
-        skipped = 0
-        
-        for record in data:
-            try:
-                # Get source_id from source name
-                cursor.execute(
-                    "SELECT id FROM income_sources WHERE name = %s AND user_id = %s",
-                    (record['source'], user_id)
-                )
-                source_result = cursor.fetchone()
-                
-                if not source_result:
-                    # Create new source if it doesn't exist
-                    cursor.execute(
-                        "INSERT INTO income_sources (name, user_id) VALUES (%s, %s)",
-                        (record['source'], user_id)
-                    )
-                    source_id = cursor.lastrowid
-                else:
-                    source_id = source_result[0]
-                
-                # Check if record already exists
-                cursor.execute(
-                    """SELECT id FROM income_tracker 
-                       WHERE user_id = %s AND date = %s AND amount = %s AND description = %s""",
-                    (user_id, record['date'], record['amount'], record['description'])
-                )
-                existing = cursor.fetchone()
-                
-                if existing:
-                    # Update existing record
-                    cursor.execute(
-                        """UPDATE income_tracker 
-                           SET source_id = %s
-                           WHERE id = %s""",
-                        (source_id, existing[0])
-                    )
-                    updated += 1
-                else:
-                    # Insert new record
-                    cursor.execute(
-                        """INSERT INTO income_tracker 
-                           (user_id, amount, description, date, source_id)
-                           VALUES (%s, %s, %s, %s, %s)""",
-                        (user_id, record['amount'], record['description'], 
-                         record['date'], source_id)
-                    )
-                    added += 1
-                    
-            except Exception as e:
-                print(f"Error processing record: {e}")
-                skipped += 1
-                
+        if not parsed:
+            return {'success': True, 'added': 0, 'updated': 0, 'skipped': skipped}
+
+        # Sources named in the file that the user does not have yet
+        sources = _load_income_sources(cursor, user_id)
+        missing = {}
+        for _, (_, _, _, name) in parsed:
+            missing.setdefault(_name_key(name), name)
+        missing = [(name, user_id) for key, name in missing.items() if key not in sources]
+        for chunk in _chunks(missing):
+            cursor.executemany("INSERT INTO income_sources (name, user_id) VALUES (%s, %s)", chunk)
+        if missing:
+            sources = _load_income_sources(cursor, user_id)
+
+        existing = _find_fingerprints(
+            cursor, "income_tracker", "source_id", user_id, {key for key, _ in parsed}
+        )
+
+        adopted = _match_unfingerprinted(cursor, "income_tracker", "source_id", user_id, {
+            key: row for key, row in parsed if key not in existing
+        })
+
+        writes = {}      # fingerprint -> row to insert, or to move to another source
+        for key, (row_date, amount, description, name) in parsed:
+            if key in existing or key in adopted or key in writes:
+                updated += 1
+            else:
+                added += 1
+            writes[key] = (user_id, amount, description, row_date, sources[_name_key(name)], key)
+
+        inserted = [row for key, row in writes.items() if key not in existing and key not in adopted]
+        moved = [row for key, row in writes.items() if key in existing and existing[key][0] != row[4]]
+
+        # Matched rows take the record's fingerprint, so the next import of
+        # the file finds them through the index
+        for chunk in _chunks([(key, writes[key][4], row_id) for key, (row_id, _) in adopted.items()]):
+            cursor.executemany(
+                "UPDATE income_tracker SET fingerprint = %s, source_id = %s WHERE id = %s AND fingerprint IS NULL",
+                chunk
+            )
+            if cursor.rowcount != len(chunk):
+                raise RuntimeError("Income changed while importing; import the file again")
+
+        # One row affected per insert and two per moved row; anything else
+        # means another import wrote these fingerprints meanwhile
+        affected = 0
+        for chunk in _chunks(inserted + moved):
+            cursor.executemany(
+                """INSERT INTO income_tracker 
+                   (user_id, amount, description, date, source_id, fingerprint)
+                   VALUES (%s, %s, %s, %s, %s, %s)
+                   ON DUPLICATE KEY UPDATE source_id = VALUES(source_id)""",
+                chunk
+            )
+            affected += cursor.rowcount
+        if affected != len(inserted) + 2 * len(moved):
+            raise RuntimeError("Income changed while importing; import the file again")
+
+        add_to_rollup(cursor, user_id, INCOME, [(source_id, row_date, amount)
+                                                for _, amount, _, row_date, source_id, _ in inserted])
+        refresh_buckets(cursor, user_id, INCOME, [
+            bucket for _, _, _, row_date, source_id, key in moved
+            for bucket in ((existing[key][0], row_date), (source_id, row_date))
+        ] + [
+            bucket for key, (_, old_source_id) in adopted.items() if old_source_id != writes[key][4]
+            for bucket in ((old_source_id, writes[key][3]), (writes[key][4], writes[key][3]))
+        ])
         connection.commit()
+        invalidate(user_id, INCOME_RECORDS, INCOME_SOURCES)
         return {
             'success': True,
             'added': added,
@@ -192,66 +406,94 @@ def import_income_records(user_id, data):
             'skipped': skipped
         }
     except Exception as e:
+        if connection:
+            connection.rollback()
         return {
             'success': False,
             'message': str(e)
         }
     finally:
-        cursor.close()
-        connection.close()
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
 def import_expense_records(user_id, data):
-    """Import expense records for a user"""
+    """Import expense records for a user.
+
+    Each record is identified by its fingerprint, and the rows it matches
+    are looked up through the (user_id, fingerprint) index. New rows are
+    written with chunked INSERT ... ON DUPLICATE KEY UPDATE, so importing
+    a file again adds nothing. Rows without a fingerprint, such as expenses
+    entered by hand, are matched on their fields instead. A record matching
+    an existing row counts as updated and leaves the row as it is. Records
+    that cannot be parsed are skipped."""
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
         
+        parsed, skipped = _parse_records(data, 'category')
         added = 0
         updated = 0
-        skipped = 0
-        
-        for record in data:
-            try:
-                # Check if category exists
-                cursor.execute(
-                    "SELECT name FROM expenses_category WHERE name = %s AND user_id = %s",
-                    (record['category'], user_id)
-                )
-                if not cursor.fetchone():
-                    # Create new category
-                    cursor.execute(
-                        "INSERT INTO expenses_category (name, user_id) VALUES (%s, %s)",
-                        (record['category'], user_id)
-                    )
-                
-                # Check if record already exists
-                cursor.execute(
-                    """SELECT id FROM expenses_tracker 
-                       WHERE user_id = %s AND date = %s AND amount = %s 
-                       AND description = %s AND category = %s""",
-                    (user_id, record['date'], record['amount'], 
-                     record['description'], record['category'])
-                )
-                existing = cursor.fetchone()
-                
-                if existing:
-                    updated += 1
-                else:
-                    # Insert new record
-                    cursor.execute(
-                        """INSERT INTO expenses_tracker 
-                           (user_id, description, amount, category, date)
-                           VALUES (%s, %s, %s, %s, %s)""",
-                        (user_id, record['description'], record['amount'],
-                         record['category'], record['date'])
-                    )
-                    added += 1
-                    
-            except Exception as e:
-                print(f"Error processing record: {e}")
-                skipped += 1
+        if not parsed:
+            return {'success': True, 'added': 0, 'updated': 0, 'skipped': skipped}
+
+        cursor.execute("SELECT name FROM expenses_category WHERE user_id = %s", (user_id,))
+        categories = {_name_key(name) for (name,) in cursor.fetchall()}
+        missing = {}
+        for _, (_, _, _, category) in parsed:
+            if _name_key(category) not in categories:
+                missing.setdefault(_name_key(category), category)
+        for chunk in _chunks([(name, user_id) for name in missing.values()]):
+            cursor.executemany("INSERT INTO expenses_category (name, user_id) VALUES (%s, %s)", chunk)
+
+        seen = set(_find_fingerprints(cursor, "expenses_tracker", "id", user_id, {key for key, _ in parsed}))
+        adopted = _match_unfingerprinted(cursor, "expenses_tracker", "category", user_id, {
+            key: row for key, row in parsed if key not in seen
+        })
+        # Matched rows take the record's fingerprint, so the next import of
+        # the file finds them through the index
+        for chunk in _chunks([(key, row_id) for key, (row_id, _) in adopted.items()]):
+            cursor.executemany(
+                "UPDATE expenses_tracker SET fingerprint = %s WHERE id = %s AND fingerprint IS NULL", chunk
+            )
+            if cursor.rowcount != len(chunk):
+                raise RuntimeError("Expenses changed while importing; import the file again")
+        seen.update(adopted)
+
+        inserted_rows = []
+        inserts = []
+        for key, (row_date, amount, description, category) in parsed:
+            if key in seen:
+                updated += 1
+                continue
+            seen.add(key)
+            inserts.append((user_id, description, amount, category, row_date, key))
+            inserted_rows.append((category, row_date, amount))
+            added += 1
+
+        # An existing fingerprint affects no row, which only happens when
+        # another import wrote it meanwhile
+        affected = 0
+        for chunk in _chunks(inserts):
+            cursor.executemany(
+                """INSERT INTO expenses_tracker 
+                   (user_id, description, amount, category, date, fingerprint)
+                   VALUES (%s, %s, %s, %s, %s, %s)
+                   ON DUPLICATE KEY UPDATE id = id""",
+                chunk
+            )
+            affected += cursor.rowcount
+        if affected != len(inserts):
+            raise RuntimeError("Expenses changed while importing; import the file again")
                 
+        add_to_rollup(cursor, user_id, EXPENSE, inserted_rows)
+        alerts = budget_state.apply_expense_changes(cursor, user_id, inserted_rows)
         connection.commit()
+        invalidate(user_id, EXPENSE_RECORDS, CATEGORIES)
+        budget_state.publish(user_id, alerts)
         return {
             'success': True,
             'added': added,
@@ -259,13 +501,17 @@ def import_expense_records(user_id, data):
             'skipped': skipped
         }
     except Exception as e:
+        if connection:
+            connection.rollback()
         return {
             'success': False,
             'message': str(e)
         }
     finally:
-        cursor.close()
-        connection.close()
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
 def import_budget_data(user_id, data):
     """Import budget categories for a user"""
@@ -299,6 +545,7 @@ def import_budget_data(user_id, data):
                 skipped += 1
                 
         connection.commit()
+        invalidate(user_id, CATEGORIES)
         return {
             'success': True,
             'added': added,
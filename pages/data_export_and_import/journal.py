@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# One JSON file per import, kept on this machine. It records which batches
+# of a file have been committed so an interrupted import can pick up after
+# the last of them instead of starting over.
+JOURNAL_DIR = os.getenv(
+    "IMPORT_JOURNAL_DIR", os.path.join(os.path.expanduser("~"), ".finance_import_journal")
+)
+
+IN_PROGRESS = "in progress"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+def fingerprint(path, block_size=1 << 20):
+    """sha256 of the file's contents, so a renamed copy still resumes and an
+    edited file starts over"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class ImportJournal:
+    """Checkpoints for one import of one file by one user"""
+
+    def __init__(self, path, entry):
+        self.path = path
+        self.entry = entry
+
+    @classmethod
+    def open(cls, user_id, data_type, file_path, batch_size):
+        """The unfinished journal for this file, or a new one"""
+        file_hash = fingerprint(file_path)
+        path = os.path.join(JOURNAL_DIR, f"{user_id}-{data_type.lower()}-{file_hash[:16]}.json")
+        entry = _load(path)
+        if entry is None or entry['status'] == COMPLETED or entry['batch_size'] != batch_size:
+            entry = {
+                'user_id': user_id,
+                'data_type': data_type,
+                'file': os.path.abspath(file_path),
+                'fingerprint': file_hash,
+                'file_size': os.path.getsize(file_path),
+                'batch_size': batch_size,
+                'status': IN_PROGRESS,
+                'rows_committed': 0,
+                'added': 0,
+                'updated': 0,
+                'skipped': 0,
+                'batches': [],
+                'started_at': _now(),
+            }
+        entry['resumed_from'] = entry['rows_committed']
+        entry['status'] = IN_PROGRESS
+        journal = cls(path, entry)
+        journal._write()
+        return journal
+
+    @property
+    def rows_committed(self):
+        return self.entry['rows_committed']
+
+    def begin_batch(self, index, rows):
+        """Note a batch as started. If it is still pending on resume it may or
+        may not have committed; import fingerprints make replaying it safe."""
+        self.entry['batches'] = [b for b in self.entry['batches'] if b['batch'] != index]
+        self.entry['batches'].append({'batch': index, 'rows': rows, 'status': 'pending'})
+        self._write()
+
+    def commit_batch(self, index, rows, result):
+        """Record a batch whose transaction has committed"""
+        batch = next(b for b in self.entry['batches'] if b['batch'] == index)
+        batch.update(status='committed', committed_at=_now(),
+                     **{key: result[key] for key in ('added', 'updated', 'skipped')})
+        self.entry['rows_committed'] += rows
+        for key in ('added', 'updated', 'skipped'):
+            self.entry[key] += result[key]
+        self._write()
+
+    def finish(self, status, message=None):
+        self.entry['status'] = status
+        if message:
+            self.entry['message'] = message
+        self._write()
+
+    def _write(self):
+        self.entry['updated_at'] = _now()
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        # Write then rename, so a crash never leaves half a journal
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as handle:
+            json.dump(self.entry, handle, indent=2)
+        os.replace(temp_path, self.path)
+
+
+def _load(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def list_journals(user_id):
+    """Every journal of the user, most recently updated first"""
+    if not os.path.isdir(JOURNAL_DIR):
+        return []
+    entries = []
+    for name in os.listdir(JOURNAL_DIR):
+        if name.startswith(f"{user_id}-") and name.endswith('.json'):
+            entry = _load(os.path.join(JOURNAL_DIR, name))
+            if entry is not None and entry.get('user_id') == user_id:
+                entries.append(entry)
+    return sorted(entries, key=lambda entry: entry.get('updated_at', ''), reverse=True)
@@ -0,0 +1,222 @@
+import csv
+import os
+from .journal import CANCELLED, COMPLETED, FAILED
+
+# Rows handed to an import function at a time; memory stays bounded by this
+# rather than by the size of the file
+IMPORT_BATCH_SIZE = 5000
+
+# Batches are indexed by row number in the file, counting the header as row 1
+FIRST_ROW = 2
+
+
+def _csv_batches(path, batch_size):
+    import pandas as pd
+
+    size = os.path.getsize(path) or 1
+    # A binary handle lets tell() report how far pandas has read. Cells are
+    # kept as the text in the file so rejected rows are reported as written.
+    with open(path, 'rb') as handle:
+        for chunk in pd.read_csv(handle, chunksize=batch_size, dtype=str, keep_default_na=False):
+            chunk.index = chunk.index + FIRST_ROW
+            yield chunk, min(handle.tell() / size, 1.0)
+
+
+def _xlsx_batches(path, batch_size):
+    import openpyxl
+    import pandas as pd
+
+    # read_only streams the sheet XML instead of building every cell
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"column_{i}" for i, name in enumerate(header)]
+        total = (sheet.max_row or 0) - 1
+        done = 0
+        batch = []
+        numbers = []
+        for number, row in enumerate(rows, start=FIRST_ROW):
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            numbers.append(number)
+            if len(batch) >= batch_size:
+                done += len(batch)
+                yield pd.DataFrame(batch, columns=columns, index=numbers), done / total if total > 0 else None
+                batch = []
+                numbers = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, index=numbers), 1.0
+    finally:
+        workbook.close()
+
+
+def _records(frame):
+    """frame.to_dict('records'), a column at a time"""
+    columns = list(frame.columns)
+    values = [frame[column].tolist() for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def read_batches(path, batch_size=IMPORT_BATCH_SIZE):
+    """Yield (batch, progress) for a CSV or XLSX file, batch_size rows at a
+    time, each batch a DataFrame indexed by row number. progress is the
+    fraction of the file read so far, or None when the sheet does not say
+    how many rows it has."""
+    if path.lower().endswith('.csv'):
+        return _csv_batches(path, batch_size)
+    return _xlsx_batches(path, batch_size)
+
+
+def run_import(path, import_batch, validator, cancel_event=None, on_progress=None,
+               batch_size=IMPORT_BATCH_SIZE, journal=None):
+    """Feed a file to import_batch (import_income_records or
+    import_expense_records with the user bound) one batch at a time.
+
+    Every batch goes through validator (an ImportValidator) first, so only
+    clean rows reach the database; rejected rows count as skipped and are
+    listed in the validator's reject report. Each batch is committed by
+    import_batch, so a cancelled or failed import keeps the batches before
+    it. With a journal, every batch is checkpointed and the rows it already
+    committed are read past without importing them again. on_progress(rows,
+    fraction) is called after every batch. Returns the summed counts, with
+    'cancelled' set when cancel_event stopped the import early and
+    'rejects' naming the reject report when there is one."""
+    resume_at = journal.rows_committed if journal is not None else 0
+    totals = {'success': True, 'added': 0, 'updated': 0, 'skipped': 0, 'rows': 0, 'cancelled': False,
+              'resumed_from': resume_at, 'rejects': None}
+    if journal is not None:
+        for key in ('added', 'updated', 'skipped'):
+            totals[key] = journal.entry[key]
+
+    try:
+        for index, (batch, progress) in enumerate(read_batches(path, batch_size)):
+            # Committed rows are validated again all the same, so the reject
+            # report covers the whole file and later duplicates are still seen
+            clean, valid = validator.validate(batch)
+            skip = min(max(resume_at - totals['rows'], 0), len(batch))
+            if skip == len(batch):
+                totals['rows'] += len(batch)
+                continue
+            if cancel_event is not None and cancel_event.is_set():
+                totals['cancelled'] = True
+                break
+
+            rows = len(batch) - skip
+            records = _records(clean[skip:][valid[skip:]])
+            if journal is not None:
+                journal.begin_batch(index, rows)
+            if records:
+                result = import_batch(records)
+            else:
+                result = {'success': True, 'added': 0, 'updated': 0, 'skipped': 0}
+            if not result['success']:
+                totals['success'] = False
+                totals['message'] = result['message']
+                break
+            result = dict(result, skipped=result['skipped'] + rows - len(records))
+            if journal is not None:
+                journal.commit_batch(index, rows, result)
+
+            for key in ('added', 'updated', 'skipped'):
+                totals[key] += result[key]
+            totals['rows'] += rows
+            if on_progress is not None:
+                on_progress(totals['rows'], progress)
+    except Exception as e:
+        if journal is not None:
+            journal.finish(FAILED, str(e))
+        raise
+    finally:
+        validator.close()
+
+    if validator.rejected:
+        totals['rejects'] = validator.reject_path
+    if journal is not None:
+        if not totals['success']:
+            journal.finish(FAILED, totals['message'])
+        else:
+            journal.finish(CANCELLED if totals['cancelled'] else COMPLETED)
+    return totals
+
+
+def _write_csv(path, batches, on_batch):
+    """Rows as pandas' to_csv(index=False) writes them: the csv module with
+    minimal quoting, str() of every value and '' for NULL"""
+    handle = None
+    try:
+        for columns, rows in batches:
+            if handle is None:
+                handle = open(path, 'w', newline='', encoding='utf-8')
+                writer = csv.writer(handle, lineterminator=os.linesep)
+                writer.writerow(columns)
+            writer.writerows(rows)
+            on_batch(len(rows))
+    finally:
+        if handle is not None:
+            handle.close()
+    return handle is not None
+
+
+def _write_xlsx(path, batches, on_batch):
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    # write_only streams rows to the file instead of keeping every cell
+    workbook = None
+    for columns, rows in batches:
+        if workbook is None:
+            workbook = openpyxl.Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            header = []
+            for column in columns:
+                cell = WriteOnlyCell(sheet, value=column)
+                cell.font = Font(bold=True)
+                header.append(cell)
+            sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+        on_batch(len(rows))
+    if workbook is None:
+        return False
+    workbook.save(path)
+    return True
+
+
+def run_export(path, file_format, batches, total=None, on_progress=None):
+    """Write (column names, rows) batches, as stream_income_records and
+    stream_expense_records yield them, to a CSV or Excel file.
+
+    Only one batch is in memory at a time. The file is written under a
+    temporary name and renamed when complete, so a failed export leaves no
+    partial file. on_progress(rows, fraction) is called after every batch,
+    with fraction None when total is not known. Returns the number of rows
+    written; when there are none no file is created."""
+    written = 0
+
+    def on_batch(rows):
+        nonlocal written
+        written += rows
+        if on_progress is not None:
+            on_progress(written, min(written / total, 1.0) if total else None)
+
+    temp_path = path + '.part'
+    try:
+        if file_format == "CSV":
+            created = _write_csv(temp_path, batches, on_batch)
+        else:
+            created = _write_xlsx(temp_path, batches, on_batch)
+        if created:
+            os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    finally:
+        batches.close()
+    return written
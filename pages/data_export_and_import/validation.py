@@ -0,0 +1,162 @@
+import os
+
+# Columns an import file must have, after trimming and lower-casing headers
+REQUIRED_COLUMNS = {
+    "Income": ("date", "amount", "description", "source"),
+    "Expenses": ("date", "amount", "description", "category"),
+}
+
+# amount is DECIMAL(10, 2) and description VARCHAR(255)
+MAX_AMOUNT = 10 ** 8
+MAX_DESCRIPTION = 255
+
+
+def reject_report_path(path):
+    """Where the rejected rows of an import file are written"""
+    return f"{os.path.splitext(path)[0]}.rejects.csv"
+
+
+class ImportValidator:
+    """Checks and normalizes import batches column-wise before they reach
+    the database.
+
+    Rows that cannot be imported go to a reject report (row number, reason,
+    then the row as it was read). Rows that repeat an earlier row of the
+    file are numbered by occurrence; names are trimmed and every spelling of
+    a name takes the first one seen in the file."""
+
+    def __init__(self, data_type, reject_path):
+        self.columns = REQUIRED_COLUMNS[data_type]
+        self.name_field = self.columns[-1]
+        self.reject_path = reject_path
+        self.rejected = 0
+        self._report = None
+        self._names = {}    # casefolded name -> first spelling in the file
+        self._seen = {}     # row hash -> times the row has been seen
+        # An income row's source can change on import without making it a
+        # different transaction, so only expenses count the name
+        self.name_in_key = self.name_field == "category"
+
+    def validate(self, batch):
+        """Normalize one batch, a DataFrame indexed by row number.
+
+        Returns (clean, valid): the batch as date, amount, description, name
+        and occurrence columns, and a boolean array of the rows that passed.
+        Raises ValueError when the file lacks a required column."""
+        import numpy as np
+        import pandas as pd
+
+        data = batch.set_axis([str(column).strip().lower() for column in batch.columns], axis=1)
+        missing = [column for column in self.columns if column not in data.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+        rows = batch.index.to_series()
+        reasons = pd.Series("", index=batch.index, dtype=object)
+
+        def reject(mask, reason):
+            nonlocal reasons
+            if mask.any():
+                reasons = reasons.where(~mask, reasons + "; " + reason)
+
+        text = {column: _text(data[column]) for column in self.columns}
+
+        # Dates: ISO first, then whatever the rest of the batch looks like
+        dates = pd.to_datetime(data["date"], format="%Y-%m-%d", errors="coerce")
+        retry = dates.isna() & (text["date"] != "")
+        if retry.any():
+            dates[retry] = pd.to_datetime(text["date"][retry], errors="coerce")
+        reject(text["date"] == "", "missing date")
+        reject(dates.isna() & (text["date"] != ""), "invalid date")
+
+        if pd.api.types.is_numeric_dtype(data["amount"]):
+            amounts = data["amount"].astype(float)
+        else:
+            amounts = pd.to_numeric(text["amount"], errors="coerce")
+            # Thousands separators and currency signs are common in exports
+            retry = amounts.isna() & (text["amount"] != "")
+            if retry.any():
+                amounts[retry] = pd.to_numeric(
+                    text["amount"][retry].str.replace(r"[,\s$]", "", regex=True), errors="coerce"
+                )
+        amounts = amounts.round(2)
+        reject(text["amount"] == "", "missing amount")
+        reject(~np.isfinite(amounts) & (text["amount"] != ""), "invalid amount")
+        reject(np.isfinite(amounts) & (amounts.abs() >= MAX_AMOUNT), "amount out of range")
+
+        # Only spaces are trimmed, as MySQL's TRIM does, so a description
+        # keeps the fingerprint it was stored under (see common.fingerprints)
+        descriptions = _text(data["description"], " ")
+        reject(text["description"] == "", "missing description")
+        reject(descriptions.str.len() > MAX_DESCRIPTION, f"description longer than {MAX_DESCRIPTION} characters")
+
+        # Names repeat a lot, so they are normalized once per distinct value
+        codes, distinct = pd.factorize(text[self.name_field])
+        distinct = [" ".join(name.split()) for name in distinct]
+        for name in distinct:
+            if name:
+                self._names.setdefault(name.casefold(), name)
+        names = pd.Series(
+            [self._names.get(name.casefold(), name) for name in distinct], dtype=object
+        ).take(codes)
+        names.index = batch.index
+        reject(names == "", f"missing {self.name_field}")
+
+        clean = pd.DataFrame({
+            "date": dates.dt.strftime("%Y-%m-%d"),
+            "amount": amounts,
+            "description": descriptions,
+            self.name_field: names,
+        })
+
+        # A row repeating an earlier one in the file is a separate transaction
+        # (two coffees on one day) and gets the next occurrence number, which
+        # keeps its import fingerprint apart from the first one's
+        valid = (reasons == "").to_numpy()
+        occurrences = np.zeros(len(batch), dtype=np.int64)
+        if valid.any():
+            key = {
+                "date": clean["date"][valid],
+                "cents": (amounts[valid] * 100).round().astype(np.int64),
+                "description": descriptions[valid].str.lower(),
+            }
+            if self.name_in_key:
+                key["name"] = names[valid].str.lower()
+            hashes = pd.util.hash_pandas_object(pd.DataFrame(key), index=False)
+            # A dict lookup per row; Series.map would copy the whole dict each batch
+            earlier = np.fromiter((self._seen.get(h, 0) for h in hashes.tolist()), np.int64, len(hashes))
+            occurrences[valid] = earlier + hashes.groupby(hashes.to_numpy()).cumcount().to_numpy()
+            unique, counts = np.unique(hashes.to_numpy(), return_counts=True)
+            for h, count in zip(unique.tolist(), counts.tolist()):
+                self._seen[h] = self._seen.get(h, 0) + count
+        clean["occurrence"] = occurrences
+
+        if not valid.all():
+            self._write_rejects(batch[~valid], reasons[~valid].str.slice(2), rows[~valid])
+        return clean, valid
+
+    def _write_rejects(self, rows, reasons, numbers):
+        report = rows.copy()
+        report.insert(0, "reason", reasons, allow_duplicates=True)
+        report.insert(0, "row", numbers, allow_duplicates=True)
+        if self._report is None:
+            self._report = open(self.reject_path, "w", newline="", encoding="utf-8")
+            report.to_csv(self._report, index=False)
+        else:
+            report.to_csv(self._report, index=False, header=False)
+        self.rejected += len(report)
+
+    def close(self):
+        """Finish the reject report; a report left over from an earlier run
+        of a file that now has no rejects is removed"""
+        if self._report is not None:
+            self._report.close()
+        elif os.path.exists(self.reject_path):
+            os.remove(self.reject_path)
+
+
+def _text(column, chars=None):
+    """A column as stripped strings, with blanks and missing values as ''"""
+    if column.hasnans:
+        column = column.astype(object).where(column.notna(), "")
+    return column.astype(str).str.strip(chars)
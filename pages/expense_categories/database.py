@@ -1,16 +1,6 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from pages.common.db_pool import get_db_connection
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_all_transactions():
     try:
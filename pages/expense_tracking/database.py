@@ -1,18 +1,11 @@
+import itertools
 import mysql.connector
-import os
-from dotenv import load_dotenv
 from datetime import datetime, date
-from pages.alerts_and_reminder.database import check_budget_exceeded
+from pages.common import budget_state, projection
+from pages.common.cache import CATEGORIES, EXPENSE_RECORDS, cached, invalidate
+from pages.common.db_pool import get_db_connection
+from pages.common.rollup import EXPENSE, add_to_rollup, refresh_buckets, remove_category
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 # Function to add daily expense
 def add_expenses_tracker(description, amount, category, date, user_id):
@@ -24,10 +17,11 @@ def add_expenses_tracker(description, amount, category, date, user_id):
                     VALUES (%s, %s, %s, %s, %s)
                 """
                 cursor.execute(query, (description, amount, category, date, user_id))
+                add_to_rollup(cursor, user_id, EXPENSE, [(category, date, amount)])
+                alerts = budget_state.apply_expense_changes(cursor, user_id, [(category, date, amount)])
                 connection.commit()
-
-        # Use a new connection for checking budget exceedance
-        check_budget_exceeded(user_id)
+        invalidate(user_id, EXPENSE_RECORDS)
+        budget_state.publish(user_id, alerts)
 
     except Exception as e:
         raise Exception(f"Error saving expense: {e}")
@@ -35,6 +29,7 @@ def add_expenses_tracker(description, amount, category, date, user_id):
 
 # Function to fetch all daily expenses for a user
 def get_expenses_tracker(user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
@@ -50,50 +45,163 @@ def get_expenses_tracker(user_id):
         return expenses
     except Exception as e:
         raise Exception(f"Error fetching expenses: {e}")
-    
+    finally:
+        if connection:
+            connection.close()
+
+# Rows per page in the View Expenses list
+EXPENSE_PAGE_SIZE = 200
+
+
+def _expense_filters(user_id, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None, description=None):
+    """WHERE clause and parameters shared by the filtered expense queries"""
+    query = "WHERE user_id = %s"
+    params = [user_id]
+
+    if start_date:
+        query += " AND date >= %s"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= %s"
+        params.append(end_date)
+    if category:
+        query += " AND category = %s"
+        params.append(category)
+    if min_amount:
+        query += " AND amount >= %s"
+        params.append(min_amount)
+    if max_amount:
+        query += " AND amount <= %s"
+        params.append(max_amount)
+    if description:
+        query += " AND description LIKE %s"
+        params.append(f"%{description}%")
+    return query, params
+
+
 # Function to fetch filtered daily expenses for a user with various filters
 def get_filtered_expenses(user_id, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None, description=None):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
-        
-        query = """
+
+        where, params = _expense_filters(user_id, start_date, end_date, category, min_amount, max_amount, description)
+        query = f"""
             SELECT id, description, amount, category, date
             FROM expenses_tracker
-            WHERE user_id = %s
+            {where}
+            ORDER BY date DESC
         """
-        params = [user_id]
-        
-        if start_date:
-            query += " AND date >= %s"
-            params.append(start_date)
-        if end_date:
-            query += " AND date <= %s"
-            params.append(end_date)
-        if category:
-            query += " AND category = %s"
-            params.append(category)
-        if min_amount:
-            query += " AND amount >= %s"
-            params.append(min_amount)
-        if max_amount:
-            query += " AND amount <= %s"
-            params.append(max_amount)
-        if description:
-            query += " AND description LIKE %s"
-            params.append(f"%{description}%")
-        
-        query += " ORDER BY date DESC"
-        
+
         cursor.execute(query, tuple(params))
         expenses = cursor.fetchall()
         cursor.close()
         return expenses
     except Exception as e:
         raise Exception(f"Error fetching filtered expenses: {e}")
+    finally:
+        if connection:
+            connection.close()
+
+
+def get_expenses_page(user_id, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None,
+                      description=None, after=None, before=None, limit=EXPENSE_PAGE_SIZE):
+    """Fetch one page of filtered expenses, newest first, including scheduled
+    occurrences of recurring expenses (negative id, see common.projection).
+
+    Pages are keyed on (date, id) instead of OFFSET, so every page is a short
+    range scan of idx_expenses_user_date_id however far the user has scrolled.
+    after pages towards older expenses and before towards newer ones. Returns
+    (expenses, cursor); pass cursor back the same way for the page after that.
+    cursor is None once there is nothing more in that direction."""
+    connection = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+
+        where, params = _expense_filters(user_id, start_date, end_date, category, min_amount, max_amount, description)
+        # Newer pages walk the index the other way and are flipped afterwards
+        descending = before is None
+        if after is not None:
+            # (date, id) < (%s, %s) spelled out: MySQL often cannot turn the
+            # row constructor into a range on the index, but can this
+            after_date, after_id = after
+            where += " AND date <= %s AND (date < %s OR (date = %s AND id < %s))"
+            params.extend([after_date, after_date, after_date, after_id])
+        if before is not None:
+            before_date, before_id = before
+            where += " AND date >= %s AND (date > %s OR (date = %s AND id > %s))"
+            params.extend([before_date, before_date, before_date, before_id])
+        order = "DESC" if descending else "ASC"
+
+        # One extra row tells whether another page follows
+        query = f"""
+            SELECT id, description, amount, category, date
+            FROM expenses_tracker
+            {where}
+            ORDER BY date {order}, id {order}
+            LIMIT %s
+        """
+        params.append(limit + 1)
+
+        cursor.execute(query, tuple(params))
+        expenses = cursor.fetchall()
+        cursor.close()
+
+        # Future recurring expenses are not stored; merge their projection in.
+        # Any stored row past the fetched ones sorts after all of them, so the
+        # first limit + 1 merged rows are exact.
+        scheduled = projection.project_expenses(
+            user_id, start_date, end_date, category, min_amount, max_amount, description,
+            descending=descending, before=after, after=before
+        )
+        expenses = list(itertools.islice(projection.merge(expenses, scheduled, descending=descending), limit + 1))
+
+        next_cursor = None
+        if len(expenses) > limit:
+            expenses = expenses[:limit]
+            next_cursor = (expenses[-1]["date"], expenses[-1]["id"])
+        if not descending:
+            expenses.reverse()
+        return expenses, next_cursor
+    except Exception as e:
+        raise Exception(f"Error fetching expenses: {e}")
+    finally:
+        if connection:
+            connection.close()
+
+
+@cached(EXPENSE_RECORDS)
+def get_expenses_summary(user_id, start_date=None, end_date=None, category=None, min_amount=None, max_amount=None, description=None):
+    """Row count and total amount of the stored expenses for the same filters as
+    get_expenses_page. Scheduled occurrences are not money spent yet."""
+    connection = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+
+        where, params = _expense_filters(user_id, start_date, end_date, category, min_amount, max_amount, description)
+        query = f"""
+            SELECT COUNT(*) AS count, COALESCE(SUM(amount), 0) AS total
+            FROM expenses_tracker
+            {where}
+        """
+
+        cursor.execute(query, tuple(params))
+        summary = cursor.fetchone()
+        cursor.close()
+        return summary
+    except Exception as e:
+        raise Exception(f"Error fetching expense totals: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 # Function to get all expense categories for a specific user
+@cached(CATEGORIES)
 def get_expenses_categories(user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
@@ -110,9 +218,13 @@ def get_expenses_categories(user_id):
         return category_names
     except Exception as e:
         raise Exception(f"Error fetching expense categories: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 # Function to add a new expense category for a specific user
 def add_expense_category(name, user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -123,39 +235,63 @@ def add_expense_category(name, user_id):
         cursor.execute(query, (name, user_id))
         connection.commit()
         cursor.close()
+        invalidate(user_id, CATEGORIES)
     except Exception as e:
         raise Exception(f"Error adding expense category: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 # Function to delete an expense by ID
 def delete_expense_by_id(expense_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
+        cursor.execute("SELECT user_id, category, date, amount FROM expenses_tracker WHERE id = %s", (expense_id,))
+        existing = cursor.fetchone()
+        alerts = []
         query = """
             DELETE FROM expenses_tracker
             WHERE id = %s
         """
         cursor.execute(query, (expense_id,))
+        if existing:
+            refresh_buckets(cursor, existing[0], EXPENSE, [(existing[1], existing[2])])
+            alerts = budget_state.apply_expense_changes(cursor, existing[0], [(existing[1], existing[2], -existing[3])])
         connection.commit()
         cursor.close()
+        if existing:
+            invalidate(existing[0], EXPENSE_RECORDS)
+            budget_state.publish(existing[0], alerts)
     except Exception as e:
         raise Exception(f"Error deleting expense: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 # Function to update an expense by ID
 def update_expense_by_id(expense_id, description, amount, category, date, user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
+        cursor.execute("SELECT category, date, amount FROM expenses_tracker WHERE id = %s", (expense_id,))
+        previous = cursor.fetchone()
         query = """
             UPDATE expenses_tracker
             SET description = %s, amount = %s, category = %s, date = %s
             WHERE id = %s
         """
         cursor.execute(query, (description, amount, category, date, expense_id))
+        affected = [(category, date)] + ([(previous[0], previous[1])] if previous else [])
+        refresh_buckets(cursor, user_id, EXPENSE, affected)
+        changes = [(category, date, amount)] + ([(previous[0], previous[1], -previous[2])] if previous else [])
+        alerts = budget_state.apply_expense_changes(cursor, user_id, changes)
         connection.commit()
         cursor.close()
-
-        check_budget_exceeded(user_id)
+        invalidate(user_id, EXPENSE_RECORDS)
+        budget_state.publish(user_id, alerts)
     except Exception as e:
         raise Exception(f"Error updating expense: {e}")
     finally:
@@ -164,6 +300,7 @@ def update_expense_by_id(expense_id, description, amount, category, date, user_i
 
 # Function to delete an expense category by name
 def delete_expense_category_by_name(name, user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -174,24 +311,31 @@ def delete_expense_category_by_name(name, user_id):
         cursor.execute(query, (name, user_id))
         connection.commit()
         cursor.close()
+        invalidate(user_id, CATEGORIES)
     except Exception as e:
         raise Exception(f"Error deleting expense category: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 
+@cached(EXPENSE_RECORDS)
 def get_expense_stats_by_category(user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
+        # Served from the monthly rollup rather than the raw expense rows
         query = """
             SELECT 
                 category, 
-                COUNT(*) as count, 
-                SUM(amount) as total, 
-                MIN(amount) as min, 
-                MAX(amount) as max, 
-                AVG(amount) as avg
-            FROM expenses_tracker
-            WHERE user_id = %s
+                SUM(txn_count) as count, 
+                SUM(total) as total, 
+                MIN(min_amount) as min, 
+                MAX(max_amount) as max, 
+                SUM(total) / SUM(txn_count) as avg
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense'
             GROUP BY category
         """
         cursor.execute(query, (user_id,))
@@ -206,12 +350,16 @@ def get_expense_stats_by_category(user_id):
         } for item in stats}
     except Exception as e:
         raise Exception(f"Error fetching expense stats: {e}")
+    finally:
+        if connection:
+            connection.close()
 
 
 
 
 # Delete all expenses linked to the category
 def delete_category_and_expenses(category_name, user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
@@ -224,8 +372,15 @@ def delete_category_and_expenses(category_name, user_id):
         cursor.execute("""
             DELETE FROM expenses_category WHERE name = %s AND user_id = %s
         """, (category_name, user_id))
+        remove_category(cursor, user_id, category_name)
+        alerts = budget_state.resync(cursor, user_id)
 
         connection.commit()
         cursor.close()
+        invalidate(user_id, EXPENSE_RECORDS, CATEGORIES)
+        budget_state.publish(user_id, alerts)
     except Exception as e:
-        raise Exception(f"Error deleting category and its linked expenses: {e}")
\ No newline at end of file
+        raise Exception(f"Error deleting category and its linked expenses: {e}")
+    finally:
+        if connection:
+            connection.close()
\ No newline at end of file
@@ -4,8 +4,18 @@ from tkcalendar import DateEntry
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from pages.expense_tracking.database import *
+from pages.common.executor import LatestRequest, busy_cursor, submit
 from datetime import datetime
 
+# Fetch the next page of expenses once the list is scrolled this far down,
+# or the previous one once it is scrolled this close to the top
+LOAD_MORE_AT = 0.9
+# Pages kept in the list; scrolling past them drops the page at the far end
+WINDOW_PAGES = 3
+
+# Shown in the ID column for projected occurrences of recurring expenses
+SCHEDULED = "Scheduled"
+
 
 def create_expense_tracking_tab(notebook, user_id):
     main_tab_frame = ttk.Frame(notebook)
@@ -65,23 +75,35 @@ def create_add_expense_subtab(sub_tab_frame, user_id):
             messagebox.showerror("Input Error", "Amount must be a valid number.")
             return
 
-        try:
-            add_expenses_tracker(description, amount, category, expense_date, user_id)
+        def on_saved(_):
+            submit_button.config(state="normal")
             messagebox.showinfo("Success", "Expense added successfully!")
             description_entry.delete(0, tk.END)
             amount_entry.delete(0, tk.END)
             category_combobox.set("")
             date_picker.set_date(date.today())
-        except Exception as e:
+
+        def on_failed(e):
+            submit_button.config(state="normal")
             messagebox.showerror("Database Error", f"Error saving expense: {e}")
 
+        # Disabled until the save finishes so a double click cannot insert twice
+        submit_button.config(state="disabled")
+        submit(add_expenses_tracker, description, amount, category, expense_date, user_id,
+               on_success=on_saved, on_error=on_failed)
+
     def load_categories():
-        try:
-            categories = get_expenses_categories(user_id)
+        def show_categories(categories):
             categories.sort()
             category_combobox['values'] = categories
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error loading categories: {e}")
+
+        categories_loader.submit(
+            get_expenses_categories, user_id,
+            on_success=show_categories,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading categories: {e}")
+        )
+
+    categories_loader = LatestRequest()
 
     form_frame = ttk.LabelFrame(sub_tab_frame, text="Add Expense", padding="10", width=50)
     form_frame.place(relx=0.5, rely=0.5, anchor="center")
@@ -124,23 +146,88 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
             messagebox.showerror("Input Error", "Amount filters must be valid numbers.")
             return
 
-        try:
-            expenses = get_filtered_expenses(user_id, start_date, end_date, category, min_amount, max_amount, description)
-            update_expenses_table(expenses)
-            update_total_amount(expenses)
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error fetching expenses: {e}")
+        page_state["filters"] = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "category": category,
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "description": description,
+        }
+        reset_pages()
+        load_page()
+
+        summary_loader.submit(
+            get_expenses_summary, user_id, **page_state["filters"],
+            on_success=update_total_amount,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error fetching expense totals: {e}")
+        )
 
-    def update_expenses_table(expenses):
-        for row in expenses_tree.get_children():
-            expenses_tree.delete(row)
-        
-        for expense in expenses:
-            expenses_tree.insert("", "end", values=(expense["id"], expense["description"], expense["amount"], expense["category"], expense["date"]))
+    def reset_pages():
+        page_state["pages"] = []
+        page_state["older"] = None
+        page_state["newer"] = None
+        expenses_tree.delete(*expenses_tree.get_children())
+
+    def load_page(after=None, before=None):
+        """Add the page after the window (or the first page), or with before
+        the page in front of it, and drop the page at the other end once the
+        window is full"""
+        def show_page(result):
+            expenses, cursor = result
+            pages = page_state["pages"]
+            if before is None:
+                page_state["older"] = cursor
+            else:
+                page_state["newer"] = cursor
+            if not expenses:
+                return
+
+            rows = []
+            for expense in expenses:
+                expense_id = expense["id"] if expense["id"] > 0 else SCHEDULED
+                rows.append((expense_id, expense["description"], expense["amount"], expense["category"], expense["date"]))
+            page = {
+                "first": (expenses[0]["date"], expenses[0]["id"]),
+                "last": (expenses[-1]["date"], expenses[-1]["id"]),
+            }
+
+            if before is None:
+                page["items"] = [expenses_tree.insert("", "end", values=row) for row in rows]
+                pages.append(page)
+                if len(pages) > WINDOW_PAGES:
+                    dropped = pages.pop(0)
+                    expenses_tree.delete(*dropped["items"])
+                    # Keep the rows in view where they were
+                    expenses_tree.yview_scroll(-len(dropped["items"]), "units")
+                    page_state["newer"] = pages[0]["first"]
+            else:
+                page["items"] = [expenses_tree.insert("", index, values=row) for index, row in enumerate(rows)]
+                pages.insert(0, page)
+                expenses_tree.yview_scroll(len(page["items"]), "units")
+                if len(pages) > WINDOW_PAGES:
+                    dropped = pages.pop()
+                    expenses_tree.delete(*dropped["items"])
+                    page_state["older"] = pages[-1]["last"]
+
+        expenses_loader.submit(
+            get_expenses_page, user_id, after=after, before=before, **page_state["filters"],
+            on_success=show_page,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error fetching expenses: {e}")
+        )
 
-    def update_total_amount(expenses):
-        total = sum(expense["amount"] for expense in expenses)
-        total_label.config(text=f"Total Amount: ${total:.2f}")
+    def on_tree_scroll(first, last):
+        expenses_scrollbar.set(first, last)
+        # Rows are only fetched as they are about to come into view
+        if expenses_loader.busy:
+            return
+        if float(last) >= LOAD_MORE_AT and page_state["older"] is not None:
+            load_page(after=page_state["older"])
+        elif float(first) <= 1 - LOAD_MORE_AT and page_state["newer"] is not None:
+            load_page(before=page_state["newer"])
+
+    def update_total_amount(summary):
+        total_label.config(text=f"Total Amount: ${summary['total']:.2f} ({summary['count']} expenses)")
 
     def clear_filters():
         start_date_picker.set_date(date.today())
@@ -149,17 +236,22 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
         min_amount_entry.delete(0, tk.END)
         max_amount_entry.delete(0, tk.END)
         description_search_entry.delete(0, tk.END)
-        expenses_tree.delete(*expenses_tree.get_children())
+        expenses_loader.cancel()
+        summary_loader.cancel()
+        reset_pages()
         total_label.config(text="Total Amount: $0.00")
 
     def load_categories():
-        try:
-            categories = get_expenses_categories(user_id)
+        def show_categories(categories):
             categories.sort()
             category_filter_combobox['values'] = [""] + categories
             category_update_combobox['values'] = categories
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error loading categories: {e}")
+
+        categories_loader.submit(
+            get_expenses_categories, user_id,
+            on_success=show_categories,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading categories: {e}")
+        )
 
     def set_this_month():
         today = date.today()
@@ -191,15 +283,23 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
             return
 
         expense_id = expenses_tree.item(selected_item, "values")[0]
-        try:
-            delete_expense_by_id(expense_id)
-            expenses_tree.delete(selected_item)
+
+        if expense_id == SCHEDULED:
+            messagebox.showinfo("Scheduled Expense", "This is an upcoming occurrence of a recurring expense. "
+                                "It is recorded when it falls due; manage it under Recurring Expenses.")
+            return
+
+        def on_deleted(_):
+            if expenses_tree.exists(selected_item[0]):
+                expenses_tree.delete(selected_item)
             messagebox.showinfo("Success", "Expense deleted successfully.")
             view_expenses()
 
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Error deleting expense: {e}")
+        submit(
+            delete_expense_by_id, expense_id,
+            on_success=on_deleted,
+            on_error=lambda e: messagebox.showerror("Error", f"Error deleting expense: {e}")
+        )
 
     def update_expense():
         selected_item = expenses_tree.selection()
@@ -208,6 +308,11 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
             return
 
         expense_id = expenses_tree.item(selected_item, "values")[0]
+
+        if expense_id == SCHEDULED:
+            messagebox.showinfo("Scheduled Expense", "This is an upcoming occurrence of a recurring expense. "
+                                "It is recorded when it falls due; manage it under Recurring Expenses.")
+            return
         description = description_update_entry.get().strip()
         amount = amount_update_entry.get().strip()
         category = category_update_combobox.get()
@@ -223,13 +328,15 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
             messagebox.showerror("Input Error", "Amount must be a valid number.")
             return
 
-        try:
-            update_expense_by_id(expense_id, description, amount, category, expense_date, user_id)
+        def on_updated(_):
             messagebox.showinfo("Success", "Expense updated successfully!")
             view_expenses()
 
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error updating expense: {e}")
+        submit(
+            update_expense_by_id, expense_id, description, amount, category, expense_date, user_id,
+            on_success=on_updated,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error updating expense: {e}")
+        )
 
     def on_row_select(event):
         selected_item = expenses_tree.selection()
@@ -248,6 +355,12 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
 
     frame = ttk.Frame(sub_tab_frame)
     frame.pack(fill="both", expand=True, padx=20, pady=10)
+    categories_loader = LatestRequest()
+    expenses_loader = LatestRequest(on_busy=busy_cursor(frame))
+    summary_loader = LatestRequest()
+    # Filters of the current search, the pages in the list (newest first) and
+    # the keyset cursors of the pages just outside them, None at either end
+    page_state = {"filters": {}, "pages": [], "older": None, "newer": None}
 
     filter_update_frame = ttk.Frame(frame)
     filter_update_frame.pack(fill="both", expand=True)
@@ -332,7 +445,10 @@ def create_view_expenses_subtab(sub_tab_frame, user_id):
     expenses_tree.column("Amount", anchor="center", width=100)
     expenses_tree.column("Category", anchor="center", width=100)
     expenses_tree.column("Date", anchor="center", width=100)
-    
+
+    expenses_scrollbar = ttk.Scrollbar(expenses_tree_frame, orient="vertical", command=expenses_tree.yview)
+    expenses_tree.configure(yscrollcommand=on_tree_scroll)
+    expenses_scrollbar.pack(side="right", fill="y")
     expenses_tree.pack(fill="both", expand=True)
 
     expenses_tree.bind("<<TreeviewSelect>>", on_row_select)
@@ -351,18 +467,30 @@ def create_manage_category_subtab(sub_tab_frame, user_id):
             messagebox.showerror("Input Error", "Category name is required.")
             return
         
-        try:
-            add_expense_category(category_name, user_id)
+        def on_added(_):
             messagebox.showinfo("Success", "Category added successfully!")
             category_entry.delete(0, tk.END)
             load_categories()
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error adding category: {e}")
+
+        submit(
+            add_expense_category, category_name, user_id,
+            on_success=on_added,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error adding category: {e}")
+        )
+
+    def fetch_categories():
+        return get_expenses_categories(user_id), get_expense_stats_by_category(user_id)
 
     def load_categories():
+        categories_loader.submit(
+            fetch_categories,
+            on_success=show_categories,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading categories: {e}")
+        )
+
+    def show_categories(data):
         try:
-            categories = get_expenses_categories(user_id)
-            expense_stats = get_expense_stats_by_category(user_id)
+            categories, expense_stats = data
 
             for row in categories_tree.get_children():
                 categories_tree.delete(row)
@@ -389,16 +517,19 @@ def create_manage_category_subtab(sub_tab_frame, user_id):
             f"Are you sure you want to delete the category '{category_name}' and all its linked expenses?"
         )
         if confirm:
-            try:
-                delete_category_and_expenses(category_name, user_id)
-                
+            def on_deleted(_):
                 messagebox.showinfo("Success", f"Category '{category_name}' and all linked expenses deleted successfully!")
                 load_categories()
-            except Exception as e:
-                messagebox.showerror("Database Error", f"Error deleting category and expenses: {e}")
+
+            submit(
+                delete_category_and_expenses, category_name, user_id,
+                on_success=on_deleted,
+                on_error=lambda e: messagebox.showerror("Database Error", f"Error deleting category and expenses: {e}")
+            )
 
     frame = ttk.Frame(sub_tab_frame)
     frame.pack(fill="both", expand=True, padx=20, pady=10)
+    categories_loader = LatestRequest(on_busy=busy_cursor(frame))
     
     add_frame = ttk.LabelFrame(frame, text="Add Category", padding="10")
     add_frame.pack(fill="x", padx=10, pady=10)
@@ -1,26 +1,21 @@
+import heapq
+import itertools
 import mysql.connector
-import os
-from dotenv import load_dotenv
+from pages.common import projection
+from pages.common.cache import BUDGETS, EXPENSE_RECORDS, INCOME_RECORDS, INCOME_SOURCES, cached, skip_store
+from pages.common.db_pool import get_db_connection
 
-load_dotenv()
-
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
+@cached(EXPENSE_RECORDS)
 def get_total_expenses_by_category(user_id):
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
 
         query = """
-            SELECT category, SUM(amount) AS total_amount
-            FROM expenses_tracker
-            WHERE user_id = %s
+            SELECT category, SUM(total) AS total_amount
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense'
             GROUP BY category
             ORDER BY total_amount DESC
         """
@@ -29,21 +24,23 @@ def get_total_expenses_by_category(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
         connection.close()
         
+@cached(INCOME_RECORDS, INCOME_SOURCES)
 def get_income_by_source(user_id):
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
 
         query = """
-            SELECT i.name, SUM(t.amount) AS total_income
-            FROM income_tracker t
+            SELECT i.name, SUM(t.total) AS total_income
+            FROM user_month_totals t
             JOIN income_sources i ON t.source_id = i.id
-            WHERE t.user_id = %s
+            WHERE t.user_id = %s AND t.kind = 'income'
             GROUP BY i.name
             ORDER BY total_income DESC
         """
@@ -52,6 +49,7 @@ def get_income_by_source(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -79,6 +77,7 @@ def get_recurring_transactions_by_category(user_id):
         cursor.close()
         connection.close()
         
+@cached(BUDGETS, EXPENSE_RECORDS)
 def get_budget_utilization(user_id):
     try:
         connection = get_db_connection()
@@ -86,11 +85,11 @@ def get_budget_utilization(user_id):
 
         query = """
             SELECT b.category, b.amount AS budgeted_amount, 
-                COALESCE(SUM(e.amount), 0) AS spent_amount, 
-                b.amount - COALESCE(SUM(e.amount), 0) AS remaining_amount
+                COALESCE(SUM(t.total), 0) AS spent_amount, 
+                b.amount - COALESCE(SUM(t.total), 0) AS remaining_amount
             FROM budgets b
-            LEFT JOIN expenses_tracker e 
-            ON b.category = e.category AND b.user_id = e.user_id
+            LEFT JOIN user_month_totals t 
+            ON b.category = t.category AND b.user_id = t.user_id AND t.kind = 'expense'
             WHERE b.user_id = %s
             GROUP BY b.category, b.amount
         """
@@ -99,20 +98,22 @@ def get_budget_utilization(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
         connection.close()
         
+@cached(EXPENSE_RECORDS)
 def get_top_expense_categories(user_id):
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
 
         query = """
-            SELECT category, SUM(amount) AS total_amount
-            FROM expenses_tracker
-            WHERE user_id = %s
+            SELECT category, SUM(total) AS total_amount
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense'
             GROUP BY category
             ORDER BY total_amount DESC
             LIMIT 5
@@ -122,21 +123,23 @@ def get_top_expense_categories(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
         connection.close()
 
 
+@cached(EXPENSE_RECORDS)
 def get_top_expense_categories(user_id):
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
 
         query = """
-            SELECT category, SUM(amount) AS total_amount
-            FROM expenses_tracker
-            WHERE user_id = %s
+            SELECT category, SUM(total) AS total_amount
+            FROM user_month_totals
+            WHERE user_id = %s AND kind = 'expense'
             GROUP BY category
             ORDER BY total_amount DESC
             LIMIT 5
@@ -146,6 +149,7 @@ def get_top_expense_categories(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -165,7 +169,14 @@ def get_daily_expense_trends(user_id, start_date, end_date):
         """
         cursor.execute(query, (user_id, start_date, end_date))
         rows = cursor.fetchall()
-        return rows
+
+        # Days ahead show what recurring expenses are scheduled to cost
+        scheduled = projection.daily_totals(projection.project_expenses(user_id, start_date, end_date))
+        merged = heapq.merge(rows, scheduled, key=lambda row: row[0])
+        return [
+            (day, sum(total for _, total in group))
+            for day, group in itertools.groupby(merged, key=lambda row: row[0])
+        ]
     except mysql.connector.Error as err:
         print(f"Error: {err}")
         return []
@@ -193,16 +204,17 @@ def get_income_vs_expenses(user_id, start_date, end_date):
         cursor.close()
         connection.close()
 
+@cached(INCOME_RECORDS, INCOME_SOURCES)
 def get_income_breakdown_by_year(user_id):
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
 
         query = """
-            SELECT YEAR(date) AS year, i.name AS source, SUM(t.amount) AS total_income
-            FROM income_tracker t
+            SELECT YEAR(t.month) AS year, i.name AS source, SUM(t.total) AS total_income
+            FROM user_month_totals t
             JOIN income_sources i ON t.source_id = i.id
-            WHERE t.user_id = %s
+            WHERE t.user_id = %s AND t.kind = 'income'
             GROUP BY year, i.name
             ORDER BY year ASC, total_income DESC
         """
@@ -211,6 +223,7 @@ def get_income_breakdown_by_year(user_id):
         return rows
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
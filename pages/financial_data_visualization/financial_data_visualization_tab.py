@@ -13,6 +13,21 @@ from pages.financial_data_visualization.database import (
     get_income_vs_expenses,
     get_income_breakdown_by_year,
 )
+from pages.common.executor import LatestRequest, submit
+
+def load_into(sub_tab_frame, fetch, user_id, draw):
+    """Show a placeholder, run the query in the background, then draw the chart"""
+    loading = tk.Label(sub_tab_frame, text="Loading...")
+    loading.pack()
+
+    def show(data):
+        loading.destroy()
+        draw(sub_tab_frame, data)
+
+    def show_error(error):
+        loading.config(text=f"Failed to load chart: {error}")
+
+    submit(fetch, user_id, on_success=show, on_error=show_error)
 
 def create_financial_data_visualization_tab(notebook, user_id):
     main_tab_frame = ttk.Frame(notebook)
@@ -52,8 +67,9 @@ def create_financial_data_visualization_tab(notebook, user_id):
     notebook.add(main_tab_frame, text="Financial Data Visualization")
 
 def create_transaction_summary_subtab(sub_tab_frame, user_id):
-    transactions = get_total_expenses_by_category(user_id)
+    load_into(sub_tab_frame, get_total_expenses_by_category, user_id, draw_transaction_summary)
 
+def draw_transaction_summary(sub_tab_frame, transactions):
     if transactions:
         categories, amounts = zip(*transactions)
 
@@ -71,8 +87,9 @@ def create_transaction_summary_subtab(sub_tab_frame, user_id):
         tk.Label(sub_tab_frame, text="No data available for Transaction Summary").pack()
 
 def create_income_distribution_subtab(sub_tab_frame, user_id):
-    income_sources = get_income_by_source(user_id)
+    load_into(sub_tab_frame, get_income_by_source, user_id, draw_income_distribution)
 
+def draw_income_distribution(sub_tab_frame, income_sources):
     if income_sources:
         sources, amounts = zip(*income_sources)
 
@@ -88,8 +105,9 @@ def create_income_distribution_subtab(sub_tab_frame, user_id):
         tk.Label(sub_tab_frame, text="No data available for Income Distribution").pack()
 
 def create_budget_utilization_subtab(sub_tab_frame, user_id):
-    budgets = get_budget_utilization(user_id)
+    load_into(sub_tab_frame, get_budget_utilization, user_id, draw_budget_utilization)
 
+def draw_budget_utilization(sub_tab_frame, budgets):
     if budgets:
         categories, budgeted_amounts, spent_amounts, remaining_amounts = zip(*budgets)
 
@@ -114,8 +132,9 @@ def create_budget_utilization_subtab(sub_tab_frame, user_id):
         tk.Label(sub_tab_frame, text="No data available for Budget Utilization").pack()
         
 def create_top_expense_categories_subtab(sub_tab_frame, user_id):
-    expenses = get_top_expense_categories(user_id)
+    load_into(sub_tab_frame, get_top_expense_categories, user_id, draw_top_expense_categories)
 
+def draw_top_expense_categories(sub_tab_frame, expenses):
     if expenses:
         categories, amounts = zip(*expenses)
 
@@ -146,6 +165,7 @@ def create_daily_expense_trends_subtab(sub_tab_frame, user_id):
 
     chart_frame = ttk.Frame(sub_tab_frame)
     chart_frame.pack(fill="both", expand=True, pady=10)
+    loader = LatestRequest()
 
     def fetch_and_plot():
         start_date = start_date_entry.get()
@@ -155,8 +175,9 @@ def create_daily_expense_trends_subtab(sub_tab_frame, user_id):
             messagebox.showwarning("Input Error", "Please select both start and end dates.")
             return
 
-        trends = get_daily_expense_trends(user_id, start_date, end_date)
+        loader.submit(get_daily_expense_trends, user_id, start_date, end_date, on_success=plot)
 
+    def plot(trends):
         for widget in chart_frame.winfo_children():
             widget.destroy()
 
@@ -194,6 +215,7 @@ def create_income_vs_expenses_subtab(sub_tab_frame, user_id):
 
     chart_frame = ttk.Frame(sub_tab_frame)
     chart_frame.pack(fill="both", expand=True, pady=10)
+    loader = LatestRequest()
 
     def fetch_and_plot():
         start_date = start_date_entry.get()
@@ -203,8 +225,9 @@ def create_income_vs_expenses_subtab(sub_tab_frame, user_id):
             messagebox.showwarning("Input Error", "Please select both start and end dates.")
             return
 
-        data = get_income_vs_expenses(user_id, start_date, end_date)
+        loader.submit(get_income_vs_expenses, user_id, start_date, end_date, on_success=plot)
 
+    def plot(data):
         for widget in chart_frame.winfo_children():
             widget.destroy()
 
@@ -229,8 +252,9 @@ def create_income_vs_expenses_subtab(sub_tab_frame, user_id):
     ttk.Button(input_frame, text="View Chart", command=fetch_and_plot).grid(row=0, column=4, padx=10, pady=5)
 
 def create_income_breakdown_by_year_subtab(sub_tab_frame, user_id):
-    income_breakdown = get_income_breakdown_by_year(user_id)
+    load_into(sub_tab_frame, get_income_breakdown_by_year, user_id, draw_income_breakdown_by_year)
 
+def draw_income_breakdown_by_year(sub_tab_frame, income_breakdown):
     if income_breakdown:
         years = list(set(row[0] for row in income_breakdown))
         sources = list(set(row[1] for row in income_breakdown))
@@ -1,18 +1,12 @@
 import mysql.connector
-import os
-from datetime import datetime, date
-from dotenv import load_dotenv
+from datetime import datetime, date, timedelta
 import hashlib
+from pages.common import projection
+from pages.common.db_pool import get_db_connection
 
-load_dotenv()
+# How far ahead the home page counts upcoming recurring transactions
+UPCOMING_DAYS = 30
 
-def get_db_connection():
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_monthly_summary(user_id):
     """Get total income and expenses for the current month"""
@@ -20,27 +14,21 @@ def get_monthly_summary(user_id):
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        # Get current month's first and last day
+        # Get current month's first day
         today = date.today()
         first_day = date(today.year, today.month, 1)
         
-        # Get monthly income
-        income_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_income 
-            FROM income_tracker 
-            WHERE user_id = %s AND date >= %s AND date <= %s
-        """
-        cursor.execute(income_query, (user_id, first_day, today))
-        monthly_income = cursor.fetchone()['total_income']
-        
-        # Get monthly expenses
-        expense_query = """
-            SELECT COALESCE(SUM(amount), 0) as total_expenses 
-            FROM expenses_tracker 
-            WHERE user_id = %s AND date >= %s AND date <= %s
+        # Both totals come from the monthly rollup in a single lookup
+        query = """
+            SELECT COALESCE(SUM(CASE WHEN kind = 'income' THEN total END), 0) as total_income,
+                   COALESCE(SUM(CASE WHEN kind = 'expense' THEN total END), 0) as total_expenses
+            FROM user_month_totals 
+            WHERE user_id = %s AND month = %s
         """
-        cursor.execute(expense_query, (user_id, first_day, today))
-        monthly_expenses = cursor.fetchone()['total_expenses']
+        cursor.execute(query, (user_id, first_day))
+        totals = cursor.fetchone()
+        monthly_income = totals['total_income']
+        monthly_expenses = totals['total_expenses']
         
         return {
             'income': float(monthly_income),
@@ -60,22 +48,23 @@ def get_budget_status(user_id):
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        # Get current month's first and last day
+        # Get current month's first day
         today = date.today()
         first_day = date(today.year, today.month, 1)
         
-        # Get monthly budgets and actual expenses
+        # Get monthly budgets and actual expenses from the monthly rollup
         query = """
             SELECT b.category, b.amount as budget,
-                   COALESCE(SUM(e.amount), 0) as spent
+                   COALESCE(SUM(t.total), 0) as spent
             FROM budgets b
-            LEFT JOIN expenses_tracker e ON b.category = e.category 
-                AND e.user_id = b.user_id 
-                AND e.date >= %s AND e.date <= %s
+            LEFT JOIN user_month_totals t ON b.category = t.category 
+                AND t.user_id = b.user_id 
+                AND t.kind = 'expense'
+                AND t.month = %s
             WHERE b.user_id = %s AND b.frequency = 'Monthly'
             GROUP BY b.category, b.amount
         """
-        cursor.execute(query, (first_day, today, user_id))
+        cursor.execute(query, (first_day, user_id))
         results = cursor.fetchall()
         
         within_budget = 0
@@ -98,30 +87,38 @@ def get_budget_status(user_id):
         connection.close()
 
 def get_upcoming_transactions(user_id):
-    """Get count of upcoming recurring transactions"""
+    """Count recurring occurrences due within the next UPCOMING_DAYS days"""
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
         today = date.today()
+        horizon = today + timedelta(days=UPCOMING_DAYS)
         
-        # Get upcoming recurring income count
+        # Upcoming recurring income, projected from each schedule
         income_query = """
-            SELECT COUNT(*) as count 
+            SELECT start_date, frequency, next_date, end_date
             FROM recurring_income 
-            WHERE user_id = %s AND next_date >= %s
-        """
-        cursor.execute(income_query, (user_id, today))
-        recurring_income = cursor.fetchone()['count']
-        
-        # Get upcoming recurring expenses count
-        expense_query = """
-            SELECT COUNT(*) as count 
-            FROM recurring_transactions 
-            WHERE user_id = %s AND next_date >= %s
+            WHERE user_id = %s AND next_date <= %s
+            AND (end_date IS NULL OR end_date >= next_date)
         """
-        cursor.execute(expense_query, (user_id, today))
-        recurring_expenses = cursor.fetchone()['count']
+        cursor.execute(income_query, (user_id, horizon))
+        schedules = cursor.fetchall()
+        recurring_income = projection.count_occurrences(
+            [s['start_date'] or s['next_date'] for s in schedules],
+            [s['frequency'] for s in schedules],
+            [max(s['next_date'], today) for s in schedules],
+            [min(s['end_date'], horizon) if s['end_date'] else horizon for s in schedules],
+        )
+        
+        # Upcoming recurring expenses, projected the same way
+        schedules = projection.get_scheduled_expenses(user_id)
+        recurring_expenses = projection.count_occurrences(
+            [s['start_date'] for s in schedules],
+            [s['recurrence'] for s in schedules],
+            [max(s['next_due_date'], today) for s in schedules],
+            [min(s['end_date'], horizon) for s in schedules],
+        )
         
         return {
             'recurring_income': recurring_income,
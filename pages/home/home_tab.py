@@ -3,10 +3,12 @@ from tkinter import ttk, messagebox
 from datetime import datetime
 from pages.home.database import change_password
 from pages.auth.auth_window import AuthWindow
+from pages.common.executor import LatestRequest, busy_cursor, submit
 from .database import (
     get_monthly_summary,
     get_budget_status,
     get_upcoming_transactions,
+    UPCOMING_DAYS,
     get_user_info,
     update_user_profile
 )
@@ -15,12 +17,14 @@ class HomeTab:
     def __init__(self, parent, user_id):
         self.parent = parent
         self.user_id = user_id
+        self.loader = None
         self.setup_ui()
         
     def setup_ui(self):
         # Create main frame
         self.frame = ttk.Frame(self.parent)
         self.frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.loader = LatestRequest(on_busy=self.set_loading)
         
         # Welcome section
         self.setup_welcome_section()
@@ -42,12 +46,12 @@ class HomeTab:
         button_frame.pack(pady=10)
         
         # Refresh button
-        refresh_btn = ttk.Button(
+        self.refresh_btn = ttk.Button(
             button_frame, 
             text="Refresh Dashboard",
             command=self.refresh_all
         )
-        refresh_btn.pack(side=tk.LEFT, padx=5)
+        self.refresh_btn.pack(side=tk.LEFT, padx=5)
         
         # Logout button
         logout_btn = ttk.Button(
@@ -107,13 +111,13 @@ class HomeTab:
         
         self.recurring_income_label = ttk.Label(
             upcoming_frame,
-            text="Upcoming Recurring Income: 0"
+            text=f"Upcoming Recurring Income (next {UPCOMING_DAYS} days): 0"
         )
         self.recurring_income_label.pack(pady=5)
         
         self.recurring_expenses_label = ttk.Label(
             upcoming_frame,
-            text="Upcoming Recurring Expenses: 0"
+            text=f"Upcoming Recurring Expenses (next {UPCOMING_DAYS} days): 0"
         )
         self.recurring_expenses_label.pack(pady=5)
         
@@ -199,17 +203,21 @@ class HomeTab:
                 messagebox.showerror("Error", "Password must be at least 6 characters long!")
                 return
                 
-            success, message = change_password(
+            def on_changed(result):
+                success, message = result
+                if success:
+                    messagebox.showinfo("Success", message)
+                    dialog.destroy()
+                else:
+                    messagebox.showerror("Error", message)
+
+            submit(
+                change_password,
                 self.user_id,
                 current_pwd.get(),
-                new_pwd.get()
+                new_pwd.get(),
+                on_success=on_changed
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                dialog.destroy()
-            else:
-                messagebox.showerror("Error", message)
         
         # Button frame
         button_frame = ttk.Frame(main_frame)
@@ -229,10 +237,31 @@ class HomeTab:
         ).pack(side=tk.LEFT, padx=5)
         current_pwd.focus()
         
+    def set_loading(self, loading):
+        busy_cursor(self.frame)(loading)
+        self.refresh_btn.config(text="Loading..." if loading else "Refresh Dashboard")
+
+    def fetch_all(self):
+        """Runs on a worker thread: every query the home tab needs"""
+        return (
+            get_user_info(self.user_id),
+            get_monthly_summary(self.user_id),
+            get_budget_status(self.user_id),
+            get_upcoming_transactions(self.user_id),
+        )
+
     def refresh_all(self):
         """Refresh all sections of the dashboard"""
+        self.loader.submit(
+            self.fetch_all,
+            on_success=self.render_all,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load dashboard: {e}")
+        )
+
+    def render_all(self, data):
+        user_info, summary, budget, upcoming = data
+
         # Update welcome message with username
-        user_info = get_user_info(self.user_id)
         if user_info:
             self.welcome_label.config(
                 text=f"Welcome back, {user_info['username']}!"
@@ -241,7 +270,6 @@ class HomeTab:
             self.email_var.set(user_info['email'])
             
         # Update financial overview
-        summary = get_monthly_summary(self.user_id)
         self.income_label.config(
             text=f"Monthly Income: ${summary['income']:,.2f}"
         )
@@ -253,7 +281,6 @@ class HomeTab:
         )
         
         # Update budget status
-        budget = get_budget_status(self.user_id)
         self.within_budget_label.config(
             text=f"Categories Within Budget: {budget['within_budget']}"
         )
@@ -262,27 +289,30 @@ class HomeTab:
         )
         
         # Update upcoming transactions
-        upcoming = get_upcoming_transactions(self.user_id)
         self.recurring_income_label.config(
-            text=f"Upcoming Recurring Income: {upcoming['recurring_income']}"
+            text=f"Upcoming Recurring Income (next {UPCOMING_DAYS} days): {upcoming['recurring_income']}"
         )
         self.recurring_expenses_label.config(
-            text=f"Upcoming Recurring Expenses: {upcoming['recurring_expenses']}"
+            text=f"Upcoming Recurring Expenses (next {UPCOMING_DAYS} days): {upcoming['recurring_expenses']}"
         )
         
     def save_profile(self):
         """Save updated profile information"""
-        success, message = update_user_profile(
+        def on_saved(result):
+            success, message = result
+            if success:
+                messagebox.showinfo("Success", message)
+                self.refresh_all()
+            else:
+                messagebox.showerror("Error", message)
+
+        submit(
+            update_user_profile,
             self.user_id,
             username=self.username_var.get(),
-            email=self.email_var.get()
+            email=self.email_var.get(),
+            on_success=on_saved
         )
-        
-        if success:
-            messagebox.showinfo("Success", message)
-            self.refresh_all()
-        else:
-            messagebox.showerror("Error", message)
 
     def logout(self):
         """Handle logout"""
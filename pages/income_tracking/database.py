@@ -1,10 +1,16 @@
 import mysql.connector
 import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from ..auth.database import get_db_connection
+import socket
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from pages.common import recurrence, scheduler
+from pages.common.cache import INCOME_RECORDS, INCOME_SOURCES, RECURRING_INCOME, cached, invalidate, skip_store
+from pages.common.db_pool import get_db_connection
+from pages.common.periods import month_range
+from pages.common.rollup import INCOME, add_to_rollup, refresh_buckets
 
-load_dotenv()
 
 def get_all_transactions():
     try:
@@ -40,7 +46,9 @@ def add_income(user_id, amount, description, date, source_id):
         # Debug print
         print(f"Rows affected: {cursor.rowcount}")
         
+        add_to_rollup(cursor, user_id, INCOME, [(source_id, date, amount)])
         connection.commit()
+        invalidate(user_id, INCOME_RECORDS)
         return True, "Income added successfully"
     except mysql.connector.Error as err:
         print(f"Error adding income: {err}")
@@ -87,21 +95,111 @@ def get_income(user_id, start_date=None, end_date=None):
         cursor.close()
         connection.close()
 
+# Sortable columns of the income list; the id tiebreak keeps the order stable
+INCOME_SORT_COLUMNS = {
+    "date": "i.date",
+    "description": "i.description",
+    "amount": "i.amount",
+    "source": "s.name",
+}
+
+
+def build_income_query(user_id, start_date=None, end_date=None, source_id=None, min_amount=None,
+                       max_amount=None, search=None, order_by="date", descending=True):
+    """Build the filtered income list query and its matching total.
+
+    Returns (list_query, total_query, params). Both queries share the WHERE
+    clause, so the user_id + date and user_id + source_id indexes apply to
+    the list and the total alike."""
+    if order_by not in INCOME_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort income by {order_by!r}")
+
+    where = "WHERE i.user_id = %s"
+    params = [user_id]
+
+    if start_date:
+        where += " AND i.date >= %s"
+        params.append(start_date)
+    if end_date:
+        where += " AND i.date <= %s"
+        params.append(end_date)
+    if source_id:
+        where += " AND i.source_id = %s"
+        params.append(source_id)
+    if min_amount is not None:
+        where += " AND i.amount >= %s"
+        params.append(min_amount)
+    if max_amount is not None:
+        where += " AND i.amount <= %s"
+        params.append(max_amount)
+    if search:
+        where += " AND i.description LIKE %s"
+        params.append(f"%{search}%")
+
+    direction = "DESC" if descending else "ASC"
+    list_query = f"""
+        SELECT i.id, i.amount, i.description, i.date, s.name as source_name, s.id as source_id
+        FROM income_tracker i
+        JOIN income_sources s ON i.source_id = s.id
+        {where}
+        ORDER BY {INCOME_SORT_COLUMNS[order_by]} {direction}, i.id {direction}
+    """
+    total_query = f"""
+        SELECT COALESCE(SUM(i.amount), 0) as total
+        FROM income_tracker i
+        {where}
+    """
+    return list_query, total_query, params
+
+
+def search_income(user_id, start_date=None, end_date=None, source_id=None, min_amount=None,
+                  max_amount=None, search=None, order_by="date", descending=True):
+    """Get the income records matching the filters, sorted, and their total"""
+    list_query, total_query, params = build_income_query(
+        user_id, start_date, end_date, source_id, min_amount, max_amount, search, order_by, descending
+    )
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+
+        cursor.execute(list_query, params)
+        records = cursor.fetchall()
+
+        cursor.execute(total_query, params)
+        total = cursor.fetchone()["total"]
+        return records, total
+    except mysql.connector.Error as err:
+        print(f"Error: {err}")
+        return [], 0
+    finally:
+        cursor.close()
+        connection.close()
+
 def update_income(income_id, user_id, amount, description, date, source_id):
     """Update an income record"""
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
         
+        cursor.execute(
+            "SELECT source_id, date FROM income_tracker WHERE id = %s AND user_id = %s",
+            (income_id, user_id)
+        )
+        previous = cursor.fetchone()
+        
         query = """
             UPDATE income_tracker
             SET amount = %s, description = %s, date = %s, source_id = %s
             WHERE id = %s AND user_id = %s
         """
         cursor.execute(query, (amount, description, date, source_id, income_id, user_id))
+        updated = cursor.rowcount
+        if previous:
+            refresh_buckets(cursor, user_id, INCOME, [(source_id, date), tuple(previous)])
         connection.commit()
+        invalidate(user_id, INCOME_RECORDS)
         
-        if cursor.rowcount > 0:
+        if updated > 0:
             return True, "Income updated successfully"
         return False, "Income record not found or unauthorized"
     except mysql.connector.Error as err:
@@ -116,14 +214,24 @@ def delete_income(income_id, user_id):
         connection = get_db_connection()
         cursor = connection.cursor()
         
+        cursor.execute(
+            "SELECT source_id, date FROM income_tracker WHERE id = %s AND user_id = %s",
+            (income_id, user_id)
+        )
+        previous = cursor.fetchone()
+        
         query = """
             DELETE FROM income_tracker
             WHERE id = %s AND user_id = %s
         """
         cursor.execute(query, (income_id, user_id))
+        deleted = cursor.rowcount
+        if previous:
+            refresh_buckets(cursor, user_id, INCOME, [tuple(previous)])
         connection.commit()
+        invalidate(user_id, INCOME_RECORDS)
         
-        if cursor.rowcount > 0:
+        if deleted > 0:
             return True, "Income deleted successfully"
         return False, "Income record not found or unauthorized"
     except mysql.connector.Error as err:
@@ -138,19 +246,21 @@ def get_monthly_income(user_id, month, year):
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
+        month_start, month_end = month_range(int(year), int(month))
+        
         query = """
             SELECT SUM(i.amount) as total_income, 
                    COUNT(*) as transaction_count,
                    s.name as source_name,
-                   DATE_FORMAT(i.date, '%Y-%m') as month
+                   %s as month
             FROM income_tracker i
             JOIN income_sources s ON i.source_id = s.id
             WHERE i.user_id = %s 
-            AND MONTH(i.date) = %s
-            AND YEAR(i.date) = %s
-            GROUP BY s.name, DATE_FORMAT(i.date, '%Y-%m')
+            AND i.date >= %s
+            AND i.date < %s
+            GROUP BY s.name
         """
-        cursor.execute(query, (user_id, month, year))
+        cursor.execute(query, (month_start.strftime("%Y-%m"), user_id, month_start, month_end))
         return cursor.fetchall()
     except mysql.connector.Error as err:
         print(f"Error: {err}")
@@ -215,22 +325,32 @@ def get_total_income(user_id, start_date=None, end_date=None):
         cursor.close()
         connection.close()
 
-def get_income_sources(user_id):
+SOURCE_SORT_COLUMNS = {
+    "name": "name",
+    "description": "description",
+}
+
+@cached(INCOME_SOURCES)
+def get_income_sources(user_id, order_by="name", descending=False):
     """Get all income sources for a user"""
+    if order_by not in SOURCE_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort income sources by {order_by!r}")
+    direction = "DESC" if descending else "ASC"
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        query = """
+        query = f"""
             SELECT id, name, description
             FROM income_sources
             WHERE user_id = %s
-            ORDER BY name
+            ORDER BY {SOURCE_SORT_COLUMNS[order_by]} {direction}, id {direction}
         """
         cursor.execute(query, (user_id,))
         return cursor.fetchall()
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -248,6 +368,7 @@ def add_income_source(user_id, name, description=""):
         """
         cursor.execute(query, (name, description, user_id))
         connection.commit()
+        invalidate(user_id, INCOME_SOURCES)
         return True, "Income source added successfully"
     except mysql.connector.Error as err:
         if err.errno == 1062:  # Duplicate entry error
@@ -270,6 +391,7 @@ def update_income_source(source_id, user_id, name, description=""):
         """
         cursor.execute(query, (name, description, source_id, user_id))
         connection.commit()
+        invalidate(user_id, INCOME_SOURCES)
         
         if cursor.rowcount > 0:
             return True, "Income source updated successfully"
@@ -304,6 +426,7 @@ def delete_income_source(source_id, user_id):
         """
         cursor.execute(query, (source_id, user_id))
         connection.commit()
+        invalidate(user_id, INCOME_SOURCES)
         
         if cursor.rowcount > 0:
             return True, "Income source deleted successfully"
@@ -325,9 +448,9 @@ def add_recurring_income(user_id, amount, description, source_id, frequency, sta
         
         current_date = datetime.now().date()
         
-        # Add to recurring_income table with next_date
-        # If start_date is in the past, set next_date to tomorrow to avoid duplicate entries
-        next_date = max(start_date, current_date + timedelta(days=1))
+        # Occurrences up to today are posted now, so next_date is the first
+        # one after today
+        next_date = recurrence.next_occurrence(start_date, frequency, current_date)
         
         query = """
             INSERT INTO recurring_income 
@@ -340,50 +463,24 @@ def add_recurring_income(user_id, amount, description, source_id, frequency, sta
         print(f"Created recurring income record with ID: {recurring_id}")
         
         # If start_date is in the past, create all past records immediately
-        if start_date < current_date:
-            current = start_date
-            while current <= current_date:
-                # Skip if we've passed the end date
-                if end_date and current > end_date:
-                    break
-                    
-                # Add income record for this date
-                add_query = """
-                    INSERT INTO income_tracker 
-                    (user_id, amount, description, date, source_id)
-                    VALUES (%s, %s, %s, %s, %s)
-                """
-                cursor.execute(add_query, (
-                    user_id, amount, description, current, source_id
-                ))
-                
-                # Move to next date based on frequency
-                if frequency == "Daily":
-                    current = current + timedelta(days=1)
-                elif frequency == "Monthly":
-                    if current.month == 12:
-                        current = current.replace(year=current.year + 1, month=1)
-                    else:
-                        current = current.replace(month=current.month + 1)
-                elif frequency == "Bi-monthly":
-                    if current.month >= 11:
-                        current = current.replace(year=current.year + 1, month=(current.month + 2) % 12)
-                    else:
-                        current = current.replace(month=current.month + 2)
-                elif frequency == "Quarterly":
-                    if current.month > 9:
-                        current = current.replace(year=current.year + 1, month=(current.month + 3) % 12)
-                    else:
-                        current = current.replace(month=current.month + 3)
-                elif frequency == "Semi-annually":
-                    if current.month > 6:
-                        current = current.replace(year=current.year + 1, month=(current.month + 6) % 12)
-                    else:
-                        current = current.replace(month=current.month + 6)
-                elif frequency == "Annually":
-                    current = current.replace(year=current.year + 1)
+        last = min(current_date, end_date) if end_date else current_date
+        occurrences = recurrence.occurrence_dates(start_date, frequency, start_date, last)
+        if occurrences:
+            add_query = """
+                INSERT INTO income_tracker 
+                (user_id, amount, description, date, source_id, recurring_id)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """
+            cursor.executemany(add_query, [
+                (user_id, amount, description, occurrence, source_id, recurring_id)
+                for occurrence in occurrences
+            ])
+        created = [(source_id, occurrence, amount) for occurrence in occurrences]
         
+        add_to_rollup(cursor, user_id, INCOME, created)
         connection.commit()
+        invalidate(user_id, INCOME_RECORDS, RECURRING_INCOME)
+        scheduler.notify(SCHEDULE_TOPIC, next_date)
         return True, "Recurring income schedule added successfully"
     except mysql.connector.Error as err:
         print(f"Error in add_recurring_income: {err}")
@@ -392,79 +489,221 @@ def add_recurring_income(user_id, amount, description, source_id, frequency, sta
         cursor.close()
         connection.close()
 
-def process_recurring_income():
-    """Process all recurring income schedules and create transactions for due dates"""
+# Scheduler topic woken whenever a recurring income schedule changes
+SCHEDULE_TOPIC = "recurring_income"
+
+# Schedules claimed per batch, and how long a claim is honoured. A worker
+# that dies mid-batch leaves a lease that simply runs out.
+CLAIM_BATCH_SIZE = 500
+LEASE_SECONDS = 300
+
+# MySQL error for a duplicate (recurring_id, date) occurrence
+DUPLICATE_ENTRY = 1062
+
+
+def shard_filter(shard):
+    """SQL and params restricting to one (index, count) shard of users, so
+    several workers can split the schedules by user_id. None means all."""
+    if shard is None:
+        return "", []
+    index, count = shard
+    return " AND MOD(user_id, %s) = %s", [count, index]
+
+
+def frequency_filter():
+    """SQL and params restricting to schedules with a frequency recurrence
+    knows. Any other value would make the batch it is claimed in fail on
+    every run, so such schedules are left unclaimed instead."""
+    frequencies = list(recurrence.STEPS)
+    return f" AND frequency IN ({', '.join(['%s'] * len(frequencies))})", frequencies
+
+
+def get_recurring_due_dates(shard=None):
+    """next_date of every schedule process_recurring_income may still post"""
+    shard_sql, shard_params = shard_filter(shard)
+    frequency_sql, frequency_params = frequency_filter()
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT next_date FROM recurring_income WHERE (end_date IS NULL OR end_date >= next_date)"
+            + frequency_sql + shard_sql,
+            frequency_params + shard_params
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        connection.close()
+
+# Occurrences per executemany batch when catching up
+CATCH_UP_CHUNK_SIZE = 1000
+
+
+def claim_due_schedules(cursor, token, current_date, shard=None):
+    """Lease up to CLAIM_BATCH_SIZE due schedules to token and return their ids.
+
+    Rows another worker is claiming right now are skipped rather than waited
+    on, and rows under someone else's unexpired lease are left alone. The
+    caller commits to publish the claim."""
+    shard_sql, shard_params = shard_filter(shard)
+    frequency_sql, frequency_params = frequency_filter()
+    cursor.execute(
+        f"""
+        SELECT id FROM recurring_income
+        WHERE next_date <= %s
+        AND (end_date IS NULL OR end_date >= next_date)
+        AND (lease_expires IS NULL OR lease_expires < NOW()){frequency_sql}{shard_sql}
+        ORDER BY next_date
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+        """,
+        [current_date] + frequency_params + shard_params + [CLAIM_BATCH_SIZE]
+    )
+    ids = [row['id'] for row in cursor.fetchall()]
+    if ids:
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"""
+            UPDATE recurring_income
+            SET lease_owner = %s, lease_expires = NOW() + INTERVAL %s SECOND
+            WHERE id IN ({placeholders})
+            """,
+            [token, LEASE_SECONDS] + ids
+        )
+    return ids
+
+
+def post_claimed_schedules(cursor, token, current_date, ids):
+    """Post the missed occurrences of the schedules ids leased to token, advance
+    their next_date and release the lease. Returns (schedules, occurrences),
+    or None when the lease was lost to another worker and the caller must
+    roll back.
+
+    Occurrences already in income_tracker (posted by a worker whose lease
+    ran out) are skipped, and the (recurring_id, date) unique key rejects
+    any that race past that check."""
+    # Locked through the primary key: lease_owner is not indexed, and
+    # filtering on it alone would scan and lock the whole table
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"""
+        SELECT id, user_id, amount, description, source_id, frequency,
+               start_date, end_date, next_date
+        FROM recurring_income
+        WHERE id IN ({placeholders}) AND lease_owner = %s
+        FOR UPDATE
+        """,
+        ids + [token]
+    )
+    due_incomes = cursor.fetchall()
+    if len(due_incomes) != len(ids):
+        return None
+
+    ids = [income['id'] for income in due_incomes]
+    cursor.execute(
+        f"""
+        SELECT recurring_id, date FROM income_tracker
+        WHERE recurring_id IN ({placeholders}) AND date >= %s
+        """,
+        ids + [min(income['next_date'] for income in due_incomes)]
+    )
+    posted = {(row['recurring_id'], row['date']) for row in cursor.fetchall()}
+
+    # Occurrences from next_date up to today, or up to end_date for
+    # schedules that ended while nothing was running, in one pass
+    anchors = [income['start_date'] or income['next_date'] for income in due_incomes]
+    frequencies = [income['frequency'] for income in due_incomes]
+    lasts = [min(current_date, income['end_date']) if income['end_date'] else current_date
+             for income in due_incomes]
+    indexes, dates = recurrence.expand(
+        anchors, frequencies, [income['next_date'] for income in due_incomes], lasts
+    )
+    next_dates = list(zip(ids, recurrence.next_occurrences(anchors, frequencies, lasts)))
+
+    records = []
+    created = defaultdict(list)
+    for index, occurrence in zip(indexes.tolist(), dates.tolist()):
+        income = due_incomes[index]
+        if (income['id'], occurrence) in posted:
+            continue
+        records.append((income['user_id'], income['amount'], income['description'],
+                        occurrence, income['source_id'], income['id']))
+        created[income['user_id']].append((income['source_id'], occurrence, income['amount']))
+
+    add_query = """
+        INSERT INTO income_tracker
+        (user_id, amount, description, date, source_id, recurring_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    for start in range(0, len(records), CATCH_UP_CHUNK_SIZE):
+        cursor.executemany(add_query, records[start:start + CATCH_UP_CHUNK_SIZE])
+
+    for user_id, rows in created.items():
+        add_to_rollup(cursor, user_id, INCOME, rows)
+
+    cases = " ".join(["WHEN %s THEN %s"] * len(next_dates))
+    cursor.execute(
+        f"""
+        UPDATE recurring_income
+        SET next_date = CASE id {cases} END, lease_owner = NULL, lease_expires = NULL
+        WHERE id IN ({placeholders}) AND lease_owner = %s
+        """,
+        [value for pair in next_dates for value in pair] + ids + [token]
+    )
+    if cursor.rowcount != len(ids):
+        return None
+    return due_incomes, len(records)
+
+
+def process_recurring_income(shard=None):
+    """Post every missed occurrence of the due recurring income schedules.
+
+    Safe to run from several processes at once: each batch of schedules is
+    first leased to this run, then posted in one transaction with chunked
+    executemany and a single next_date UPDATE. shard=(index, count) limits
+    the run to the users with user_id % count == index."""
+    started = time.perf_counter()
+    token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-64:]
+    schedules = 0
+    occurrences = 0
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
-        
-        # Get current date
+
         current_date = datetime.now().date()
-        
-        # Get all recurring incomes that are due
-        query = """
-            SELECT id, user_id, amount, description, source_id, frequency, 
-                   start_date, end_date, next_date
-            FROM recurring_income
-            WHERE next_date <= %s
-            AND (end_date IS NULL OR end_date >= %s)
-        """
-        cursor.execute(query, (current_date, current_date))
-        due_incomes = cursor.fetchall()
-        
-        for income in due_incomes:
-            # Add the income record
-            add_query = """
-                INSERT INTO income_tracker 
-                (user_id, amount, description, date, source_id)
-                VALUES (%s, %s, %s, %s, %s)
-            """
-            cursor.execute(add_query, (
-                income['user_id'], 
-                income['amount'], 
-                income['description'], 
-                income['next_date'],
-                income['source_id']
-            ))
-            
-            # Calculate next date based on frequency
-            next_date = income['next_date']
-            if income['frequency'] == "Daily":
-                next_date = next_date + timedelta(days=1)
-            elif income['frequency'] == "Monthly":
-                if next_date.month == 12:
-                    next_date = next_date.replace(year=next_date.year + 1, month=1)
-                else:
-                    next_date = next_date.replace(month=next_date.month + 1)
-            elif income['frequency'] == "Bi-monthly":
-                if next_date.month >= 11:
-                    next_date = next_date.replace(year=next_date.year + 1, month=(next_date.month + 2) % 12)
-                else:
-                    next_date = next_date.replace(month=next_date.month + 2)
-            elif income['frequency'] == "Quarterly":
-                if next_date.month > 9:
-                    next_date = next_date.replace(year=next_date.year + 1, month=(next_date.month + 3) % 12)
-                else:
-                    next_date = next_date.replace(month=next_date.month + 3)
-            elif income['frequency'] == "Semi-annually":
-                if next_date.month > 6:
-                    next_date = next_date.replace(year=next_date.year + 1, month=(next_date.month + 6) % 12)
-                else:
-                    next_date = next_date.replace(month=next_date.month + 6)
-            elif income['frequency'] == "Annually":
-                next_date = next_date.replace(year=next_date.year + 1)
-            
-            # Update next_date in recurring_income
-            update_query = """
-                UPDATE recurring_income
-                SET next_date = %s
-                WHERE id = %s
-            """
-            cursor.execute(update_query, (next_date, income['id']))
-        
-        connection.commit()
-        return True, f"Processed {len(due_incomes)} recurring incomes"
+
+        while True:
+            ids = claim_due_schedules(cursor, token, current_date, shard)
+            connection.commit()
+            if not ids:
+                break
+
+            try:
+                result = post_claimed_schedules(cursor, token, current_date, ids)
+            except mysql.connector.Error as err:
+                if err.errno != DUPLICATE_ENTRY:
+                    raise
+                result = None
+            if result is None:
+                # Another worker took over after our lease ran out; it posts
+                # these schedules, so leave them to it
+                connection.rollback()
+                print("Recurring income lease lost to another worker; batch left to it")
+                break
+
+            due_incomes, posted = result
+            connection.commit()
+            schedules += len(due_incomes)
+            occurrences += posted
+            for user_id in {income['user_id'] for income in due_incomes}:
+                invalidate(user_id, INCOME_RECORDS, RECURRING_INCOME)
+
+        elapsed = time.perf_counter() - started
+        rate = occurrences / elapsed if elapsed > 0 else 0
+        return True, (f"Processed {schedules} recurring incomes: {occurrences} occurrences "
+                      f"in {elapsed:.2f}s ({rate:.0f} occurrences/s)")
     except mysql.connector.Error as err:
+        connection.rollback()
         print(f"Error processing recurring income: {err}")
         return False, f"Error: {err}"
     finally:
@@ -510,6 +749,8 @@ def update_recurring_income(recurring_id, user_id, amount, description, source_i
         if cursor.rowcount > 0:
             print("Recurring income record updated successfully")
             connection.commit()
+            invalidate(user_id, RECURRING_INCOME)
+            scheduler.notify(SCHEDULE_TOPIC)
             return True, "Recurring income updated successfully"
         return False, "Recurring income not found or unauthorized"
     except mysql.connector.Error as err:
@@ -534,6 +775,8 @@ def delete_recurring_income(recurring_id, user_id):
         
         if cursor.rowcount > 0:
             connection.commit()
+            invalidate(user_id, RECURRING_INCOME)
+            scheduler.notify(SCHEDULE_TOPIC)
             return True, "Recurring income schedule deleted successfully"
         return False, "Recurring income not found or unauthorized"
     except mysql.connector.Error as err:
@@ -542,6 +785,7 @@ def delete_recurring_income(recurring_id, user_id):
         cursor.close()
         connection.close()
 
+@cached(INCOME_RECORDS)
 def get_income_date_range(user_id):
     """Get the earliest and latest dates from income records"""
     try:
@@ -564,30 +808,44 @@ def get_income_date_range(user_id):
         return result['earliest_date'], result['latest_date']
     except mysql.connector.Error as err:
         print(f"Error: {err}")
+        skip_store()
         today = datetime.now().date()
         return today, today
     finally:
         cursor.close()
         connection.close()
 
-def get_recurring_income(user_id):
+RECURRING_SORT_COLUMNS = {
+    "description": "r.description",
+    "amount": "r.amount",
+    "frequency": "r.frequency",
+    "next_date": "r.next_date",
+    "source": "s.name",
+}
+
+@cached(RECURRING_INCOME, INCOME_SOURCES)
+def get_recurring_income(user_id, order_by="next_date", descending=False):
     """Get all recurring income records for a user"""
+    if order_by not in RECURRING_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort recurring income by {order_by!r}")
+    direction = "DESC" if descending else "ASC"
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
-        query = """
+        query = f"""
             SELECT r.id, r.amount, r.description, s.name as source_name, s.id as source_id,
                    r.frequency, r.start_date, r.end_date, r.next_date
             FROM recurring_income r
             JOIN income_sources s ON r.source_id = s.id
             WHERE r.user_id = %s
-            ORDER BY r.next_date
+            ORDER BY {RECURRING_SORT_COLUMNS[order_by]} {direction}, r.id {direction}
         """
         cursor.execute(query, (user_id,))
         return cursor.fetchall()
     except mysql.connector.Error as err:
         print(f"Error in get_recurring_income: {err}")
+        skip_store()
         return []
     finally:
         cursor.close()
@@ -3,12 +3,32 @@ from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
 from datetime import datetime, timedelta, date
 from .database import (
-    add_income, get_income, update_income, delete_income,
-    get_monthly_income, get_total_income, get_income_sources,
+    add_income, search_income, update_income, delete_income,
+    get_monthly_income, get_income_sources,
     add_income_source, update_income_source, delete_income_source,
     add_recurring_income, get_recurring_income, update_recurring_income,
     delete_recurring_income, get_income_date_range
 )
+from pages.common.executor import LatestRequest, busy_cursor, submit
+from pages.common.recurrence import FREQUENCIES
+
+# Column headings -> sort keys understood by the database queries. Sorting
+# re-runs the query with a new ORDER BY instead of reordering tree rows.
+INCOME_SORT_KEYS = {"Date": "date", "Description": "description", "Amount": "amount", "Source": "source"}
+RECURRING_SORT_KEYS = {
+    "Description": "description", "Amount": "amount", "Frequency": "frequency",
+    "Next Date": "next_date", "Source": "source",
+}
+SOURCE_SORT_KEYS = {"Name": "name", "Description": "description"}
+
+
+def toggle_order(order, key):
+    """Clicking the sorted column flips its direction, another column sorts
+    ascending, and the No. column (key None) reverses the current order"""
+    order_by, descending = order
+    if key is None or key == order_by:
+        return order_by, not descending
+    return key, False
 
 class IncomeTrackingTab:
     def __init__(self, parent, user_id):
@@ -22,13 +42,21 @@ class IncomeTrackingTab:
         self.recurring_id_map = {}  # Maps row numbers to recurring income IDs
         self.source_id_map = {}  # Maps row numbers to source IDs
         
-        # Add sort state tracking
-        self.income_sort_column = None
-        self.income_sort_reverse = False
-        self.recurring_sort_column = None
-        self.recurring_sort_reverse = False
-        self.sources_sort_column = None
-        self.sources_sort_reverse = False
+        # Sort state as (sort key, descending), and the filters of the
+        # income list currently shown
+        self.income_order = ("date", True)
+        self.recurring_order = ("next_date", False)
+        self.sources_order = ("name", False)
+        self.income_filters = {}
+        
+        # Background loaders; the income list and its filters share one slot
+        # so the newest refresh always wins
+        self.income_loader = LatestRequest(on_busy=busy_cursor(self.parent))
+        self.recurring_loader = LatestRequest()
+        self.recurring_records = []
+        self.sources_loader = LatestRequest()
+        self.source_combo_loader = LatestRequest()
+        self.date_range_loader = LatestRequest()
         
         self.setup_ui()
         
@@ -82,9 +110,7 @@ class IncomeTrackingTab:
         self.date_to.pack(side="left", padx=5)
         
         # Set date range based on existing records
-        start_date, end_date = get_income_date_range(self.user_id)
-        self.date_from.set_date(start_date)
-        self.date_to.set_date(end_date)
+        self.load_date_range()
         
         # Quick Date Filters
         quick_filter_frame = ttk.Frame(filter_frame)
@@ -108,6 +134,18 @@ class IncomeTrackingTab:
         self.filter_source_combo = ttk.Combobox(source_frame, textvariable=self.filter_source_var)
         self.filter_source_combo.pack(side="left", padx=5, fill="x", expand=True)
         
+        # Amount Range Filter
+        amount_frame = ttk.Frame(filter_frame)
+        amount_frame.pack(fill="x", pady=5)
+        
+        ttk.Label(amount_frame, text="Min Amount:").pack(side="left", padx=5)
+        self.min_amount_var = tk.StringVar()
+        ttk.Entry(amount_frame, textvariable=self.min_amount_var, width=10).pack(side="left", padx=5)
+        
+        ttk.Label(amount_frame, text="Max Amount:").pack(side="left", padx=5)
+        self.max_amount_var = tk.StringVar()
+        ttk.Entry(amount_frame, textvariable=self.max_amount_var, width=10).pack(side="left", padx=5)
+        
         # Search by Description
         search_frame = ttk.Frame(filter_frame)
         search_frame.pack(fill="x", pady=5)
@@ -137,6 +175,29 @@ class IncomeTrackingTab:
         
         self.setup_form()
         
+    def load_date_range(self, then=None):
+        """Set the filter dates to span the existing records"""
+        def show_range(date_range):
+            start_date, end_date = date_range
+            self.date_from.set_date(start_date)
+            self.date_to.set_date(end_date)
+            if then:
+                then()
+
+        self.date_range_loader.submit(get_income_date_range, self.user_id, on_success=show_range)
+
+    def submit_change(self, fn, *args, on_success):
+        """Run a write returning (success, message) in the background"""
+        def done(result):
+            success, message = result
+            if success:
+                on_success(message)
+            else:
+                messagebox.showerror("Error", message)
+
+        submit(fn, *args, on_success=done,
+               on_error=lambda e: messagebox.showerror("Error", f"Error: {e}"))
+
     def setup_recurring_tab(self):
         # Setup recurring income tab
         self.setup_recurring_form()
@@ -337,8 +398,7 @@ class IncomeTrackingTab:
         # Frequency
         ttk.Label(form_frame, text="Frequency:").pack(pady=2)
         self.recurring_frequency = ttk.Combobox(form_frame, width=27, state="readonly")
-        self.recurring_frequency["values"] = ("Daily", "Monthly", "Bi-monthly", "Quarterly", 
-                                            "Semi-annually", "Annually")
+        self.recurring_frequency["values"] = FREQUENCIES
         self.recurring_frequency.set("Monthly")
         self.recurring_frequency.pack(pady=2)
         
@@ -379,18 +439,12 @@ class IncomeTrackingTab:
                 messagebox.showerror("Error", "Please select a valid source")
                 return
             
-            success, message = add_recurring_income(
+            self.submit_change(
+                add_recurring_income,
                 self.user_id, amount, description, source_id, frequency, 
-                start_date, end_date
+                start_date, end_date,
+                on_success=self.on_recurring_changed
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                self.clear_recurring_form()
-                self.load_recurring_income()
-                self.load_income_data()  # Refresh regular income list
-            else:
-                messagebox.showerror("Error", message)
                 
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid amount")
@@ -419,18 +473,12 @@ class IncomeTrackingTab:
                 messagebox.showerror("Error", "Please select a valid source")
                 return
             
-            success, message = update_recurring_income(
+            self.submit_change(
+                update_recurring_income,
                 recurring_id, self.user_id, amount, description, source_id,
-                frequency, start_date, end_date
+                frequency, start_date, end_date,
+                on_success=self.on_recurring_changed
             )
-            
-            if success:
-                messagebox.showinfo("Success", message)
-                self.clear_recurring_form()
-                self.load_recurring_income()
-                self.load_income_data()  # Refresh regular income list
-            else:
-                messagebox.showerror("Error", message)
                 
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid amount")
@@ -444,15 +492,16 @@ class IncomeTrackingTab:
         if messagebox.askyesno("Confirm Delete", 
                               "Are you sure you want to delete this recurring income?"):
             recurring_id = self.recurring_tree.item(selection[0])["values"][0]
-            success, message = delete_recurring_income(recurring_id, self.user_id)
+            self.submit_change(
+                delete_recurring_income, recurring_id, self.user_id,
+                on_success=self.on_recurring_changed
+            )
             
-            if success:
-                messagebox.showinfo("Success", message)
-                self.clear_recurring_form()
-                self.load_recurring_income()
-                self.load_income_data()  # Refresh regular income list
-            else:
-                messagebox.showerror("Error", message)
+    def on_recurring_changed(self, message):
+        messagebox.showinfo("Success", message)
+        self.clear_recurring_form()
+        self.load_recurring_income()
+        self.load_income_data()  # Refresh regular income list
             
     def clear_recurring_form(self):
         self.recurring_description.delete(0, "end")
@@ -470,10 +519,9 @@ class IncomeTrackingTab:
             row_number = values[0]
             selected_id = self.recurring_id_map.get(row_number)
             
-            # Get the record from the database
-            records = get_recurring_income(self.user_id)
+            # Use the records from the last load instead of querying again
             selected_record = None
-            for record in records:
+            for record in self.recurring_records:
                 if record["id"] == selected_id:
                     selected_record = record
                     break
@@ -493,15 +541,20 @@ class IncomeTrackingTab:
                     self.recurring_end_date.set_date(datetime.now().date())
         
     def load_recurring_income(self):
+        order_by, descending = self.recurring_order
+        self.recurring_loader.submit(get_recurring_income, self.user_id, order_by, descending,
+                                     on_success=self.show_recurring_income)
+
+    def show_recurring_income(self, records):
         # Clear existing items
         for item in self.recurring_tree.get_children():
             self.recurring_tree.delete(item)
         
         # Clear ID mapping
         self.recurring_id_map = {}
+        self.recurring_records = records
         
         # Load recurring income records
-        records = get_recurring_income(self.user_id)
         for index, record in enumerate(records, 1):
             self.recurring_id_map[index] = record["id"]  # Store mapping
             self.recurring_tree.insert("", "end", values=(
@@ -515,7 +568,9 @@ class IncomeTrackingTab:
     
     def update_source_combo(self):
         """Update source comboboxes with current sources"""
-        sources = get_income_sources(self.user_id)
+        self.source_combo_loader.submit(get_income_sources, self.user_id, on_success=self.show_source_combo)
+
+    def show_source_combo(self, sources):
         print(f"Retrieved sources: {sources}")  # Debug print
         
         self.sources = {source['id']: source['name'] for source in sources}
@@ -552,13 +607,17 @@ class IncomeTrackingTab:
         
     def load_sources(self):
         """Load sources into the sources treeview"""
+        order_by, descending = self.sources_order
+        self.sources_loader.submit(get_income_sources, self.user_id, order_by, descending,
+                                   on_success=self.show_sources)
+
+    def show_sources(self, sources):
         for item in self.sources_tree.get_children():
             self.sources_tree.delete(item)
         
         # Clear ID mapping
         self.source_id_map = {}
         
-        sources = get_income_sources(self.user_id)
         for index, source in enumerate(sources, 1):
             self.source_id_map[index] = source["id"]  # Store mapping
             self.sources_tree.insert("", "end", values=(
@@ -592,14 +651,8 @@ class IncomeTrackingTab:
             messagebox.showerror("Error", "Please enter a source name")
             return
         
-        success, message = add_income_source(self.user_id, name, description)
-        if success:
-            messagebox.showinfo("Success", message)
-            self.clear_source_form()
-            self.load_sources()
-            self.update_source_combo()
-        else:
-            messagebox.showerror("Error", message)
+        self.submit_change(add_income_source, self.user_id, name, description,
+                           on_success=self.on_sources_changed)
     
     def update_source(self):
         """Update selected income source"""
@@ -614,16 +667,11 @@ class IncomeTrackingTab:
             messagebox.showerror("Error", "Please enter a source name")
             return
         
-        success, message = update_income_source(
-            self.selected_source_id, self.user_id, name, description
+        self.submit_change(
+            update_income_source,
+            self.selected_source_id, self.user_id, name, description,
+            on_success=self.on_sources_changed
         )
-        if success:
-            messagebox.showinfo("Success", message)
-            self.clear_source_form()
-            self.load_sources()
-            self.update_source_combo()
-        else:
-            messagebox.showerror("Error", message)
     
     def delete_source(self):
         """Delete selected income source"""
@@ -633,14 +681,14 @@ class IncomeTrackingTab:
         
         if messagebox.askyesno("Confirm Delete", 
                               "Are you sure you want to delete this source?"):
-            success, message = delete_income_source(self.selected_source_id, self.user_id)
-            if success:
-                messagebox.showinfo("Success", message)
-                self.clear_source_form()
-                self.load_sources()
-                self.update_source_combo()
-            else:
-                messagebox.showerror("Error", message)
+            self.submit_change(delete_income_source, self.selected_source_id, self.user_id,
+                               on_success=self.on_sources_changed)
+    
+    def on_sources_changed(self, message):
+        messagebox.showinfo("Success", message)
+        self.clear_source_form()
+        self.load_sources()
+        self.update_source_combo()
     
     def clear_source_form(self):
         """Clear the source form"""
@@ -649,6 +697,22 @@ class IncomeTrackingTab:
         self.source_desc_var.set("")
     
     def load_income_data(self):
+        """Show every income record"""
+        self.income_filters = {}
+        self.query_income()
+
+    def query_income(self):
+        """Load the income list for the current filters and sort order"""
+        order_by, descending = self.income_order
+        self.income_loader.submit(
+            search_income, self.user_id, **self.income_filters,
+            order_by=order_by, descending=descending,
+            on_success=self.show_income_data
+        )
+
+    def show_income_data(self, data):
+        records, total = data
+
         # Clear existing items
         for item in self.tree.get_children():
             self.tree.delete(item)
@@ -657,7 +721,6 @@ class IncomeTrackingTab:
         self.income_id_map = {}
         
         # Load income records
-        records = get_income(self.user_id)
         for index, record in enumerate(records, 1):
             self.income_id_map[index] = record["id"]  # Store mapping
             self.tree.insert("", "end", values=(
@@ -669,7 +732,6 @@ class IncomeTrackingTab:
             ))
         
         # Update summary
-        total = get_total_income(self.user_id)
         self.total_income_var.set(f"Total Income: ${total:.2f}")
         
     def on_select_income(self, event):
@@ -713,16 +775,11 @@ class IncomeTrackingTab:
                 messagebox.showerror("Error", "Please select a valid source")
                 return
                 
-            success, message = add_income(
-                self.user_id, amount, description, date, source_id
+            self.submit_change(
+                add_income,
+                self.user_id, amount, description, date, source_id,
+                on_success=self.on_income_saved
             )
-            
-            if success:
-                self.clear_form()
-                self.apply_filters()
-                messagebox.showinfo("Success", message)
-            else:
-                messagebox.showerror("Error", message)
                 
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid amount")
@@ -748,17 +805,12 @@ class IncomeTrackingTab:
                 messagebox.showerror("Error", "Please select a valid source")
                 return
                 
-            success, message = update_income(
+            self.submit_change(
+                update_income,
                 self.selected_income_id, self.user_id,
-                amount, description, date, source_id
+                amount, description, date, source_id,
+                on_success=self.on_income_saved
             )
-            
-            if success:
-                self.clear_form()
-                self.apply_filters()
-                messagebox.showinfo("Success", message)
-            else:
-                messagebox.showerror("Error", message)
                 
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid amount")
@@ -769,14 +821,18 @@ class IncomeTrackingTab:
             return
             
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this income record?"):
-            success, message = delete_income(self.selected_income_id, self.user_id)
-            
-            if success:
+            def on_deleted(message):
                 messagebox.showinfo("Success", message)
                 self.clear_form()
                 self.load_income_data()
-            else:
-                messagebox.showerror("Error", message)
+
+            self.submit_change(delete_income, self.selected_income_id, self.user_id,
+                               on_success=on_deleted)
+    
+    def on_income_saved(self, message):
+        self.clear_form()
+        self.apply_filters()
+        messagebox.showinfo("Success", message)
                 
     def clear_form(self):
         """Clear the income form"""
@@ -809,147 +865,49 @@ class IncomeTrackingTab:
         self.apply_filters()
     
     def apply_filters(self):
-        """Apply date range and source filters"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Clear ID mapping
-        self.income_id_map = {}
-        
-        # Get filter values
-        date_from = self.date_from.get_date()
-        date_to = self.date_to.get_date()
+        """Apply date range, source, amount and description filters"""
         selected_source = self.filter_source_var.get()
-        search_text = self.search_var.get().lower()
-        
-        # Get all records and filter
-        records = get_income(self.user_id)
-        filtered_records = []
-        
-        for record in records:
-            # Date filter
-            record_date = record["date"]
-            if not (date_from <= record_date <= date_to):
-                continue
-                
-            # Source filter
-            if selected_source != "All Sources" and record["source_name"] != selected_source:
-                continue
-                
-            # Search filter
-            if search_text and search_text not in record["description"].lower():
-                continue
-                
-            filtered_records.append(record)
-        
-        # Insert filtered records with sequential numbering
-        for index, record in enumerate(filtered_records, 1):
-            self.income_id_map[index] = record["id"]  # Store mapping
-            self.tree.insert("", "end", values=(
-                index,  # Use sequential number instead of ID
-                record["date"].strftime("%Y-%m-%d"),
-                record["description"],
-                f"${record['amount']:.2f}",
-                record["source_name"]
-            ))
-        
-        # Update total for filtered records
-        filtered_total = sum(record["amount"] for record in filtered_records)
-        self.total_income_var.set(f"Total Income: ${filtered_total:.2f}")
-    
+        try:
+            min_amount = float(self.min_amount_var.get()) if self.min_amount_var.get().strip() else None
+            max_amount = float(self.max_amount_var.get()) if self.max_amount_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror("Error", "Amount filters must be valid numbers")
+            return
+
+        self.income_filters = {
+            "start_date": self.date_from.get_date(),
+            "end_date": self.date_to.get_date(),
+            "source_id": None if selected_source == "All Sources" else self.get_source_id_by_name(selected_source),
+            "min_amount": min_amount,
+            "max_amount": max_amount,
+            "search": self.search_var.get().strip(),
+        }
+        self.query_income()
+
     def clear_filters(self):
         """Clear all filters"""
-        # Get the earliest and latest dates from income records
-        start_date, end_date = get_income_date_range(self.user_id)
-        self.date_from.set_date(start_date)
-        self.date_to.set_date(end_date)
         self.filter_source_var.set("All Sources")
+        self.min_amount_var.set("")
+        self.max_amount_var.set("")
         self.search_var.set("")
-        self.load_income_data()  # Reset to show all records
+        # Get the earliest and latest dates from income records, then
+        # reset to show all records
+        self.load_date_range(then=self.load_income_data)
 
     def sort_income_records(self, column):
-        """Sort income records by the selected column"""
-        items = [(self.tree.set(item, column), item) for item in self.tree.get_children('')]
-        
-        # Determine sort order
-        reverse = False
-        if self.income_sort_column == column and not self.income_sort_reverse:
-            reverse = True
-        
-        # Update sort state
-        self.income_sort_column = column
-        self.income_sort_reverse = reverse
-        
-        # Sort based on column type
-        if column == "Amount":
-            items.sort(key=lambda x: float(x[0].replace('$', '').replace(',', '')), reverse=reverse)
-        elif column == "Date":
-            items.sort(key=lambda x: datetime.strptime(x[0], "%Y-%m-%d"), reverse=reverse)
-        elif column == "No.":
-            items.sort(key=lambda x: int(x[0]), reverse=reverse)
-        else:
-            items.sort(key=lambda x: x[0].lower(), reverse=reverse)
-        
-        # Rearrange items
-        for index, (_, item) in enumerate(items):
-            self.tree.move(item, '', index)
-            # Update the No. column to maintain sequential ordering
-            self.tree.set(item, "No.", str(index + 1))
+        """Re-query the income list ordered by the selected column"""
+        self.income_order = toggle_order(self.income_order, INCOME_SORT_KEYS.get(column))
+        self.query_income()
     
     def sort_recurring_income(self, column):
-        """Sort recurring income by the selected column"""
-        items = [(self.recurring_tree.set(item, column), item) for item in self.recurring_tree.get_children('')]
-        
-        # Determine sort order
-        reverse = False
-        if self.recurring_sort_column == column and not self.recurring_sort_reverse:
-            reverse = True
-        
-        # Update sort state
-        self.recurring_sort_column = column
-        self.recurring_sort_reverse = reverse
-        
-        # Sort based on column type
-        if column == "Amount":
-            items.sort(key=lambda x: float(x[0].replace('$', '').replace(',', '')), reverse=reverse)
-        elif column == "Next Date":
-            items.sort(key=lambda x: datetime.strptime(x[0], "%Y-%m-%d"), reverse=reverse)
-        elif column == "No.":
-            items.sort(key=lambda x: int(x[0]), reverse=reverse)
-        else:
-            items.sort(key=lambda x: x[0].lower(), reverse=reverse)
-        
-        # Rearrange items
-        for index, (_, item) in enumerate(items):
-            self.recurring_tree.move(item, '', index)
-            # Update the No. column to maintain sequential ordering
-            self.recurring_tree.set(item, "No.", str(index + 1))
+        """Re-query recurring income ordered by the selected column"""
+        self.recurring_order = toggle_order(self.recurring_order, RECURRING_SORT_KEYS.get(column))
+        self.load_recurring_income()
     
     def sort_sources(self, column):
-        """Sort sources by the selected column"""
-        items = [(self.sources_tree.set(item, column), item) for item in self.sources_tree.get_children('')]
-        
-        # Determine sort order
-        reverse = False
-        if self.sources_sort_column == column and not self.sources_sort_reverse:
-            reverse = True
-        
-        # Update sort state
-        self.sources_sort_column = column
-        self.sources_sort_reverse = reverse
-        
-        # Sort based on column type
-        if column == "No.":
-            items.sort(key=lambda x: int(x[0]), reverse=reverse)
-        else:
-            items.sort(key=lambda x: x[0].lower(), reverse=reverse)
-        
-        # Rearrange items
-        for index, (_, item) in enumerate(items):
-            self.sources_tree.move(item, '', index)
-            # Update the No. column to maintain sequential ordering
-            self.sources_tree.set(item, "No.", str(index + 1))
+        """Re-query sources ordered by the selected column"""
+        self.sources_order = toggle_order(self.sources_order, SOURCE_SORT_KEYS.get(column))
+        self.load_sources()
 
 def create_income_tracking_tab(notebook, user_id):
     """Create and return the income tracking tab"""
@@ -1,22 +1,17 @@
 import mysql.connector
-import os
-from dotenv import load_dotenv
-from datetime import datetime, timedelta
-from pages.alerts_and_reminder.database import check_budget_exceeded
+from collections import defaultdict
+from datetime import date, datetime
+from pages.common import budget_state, scheduler
+from pages.common.cache import CATEGORIES, EXPENSE_RECORDS, RECURRING, cached, invalidate
+from pages.common.db_pool import get_db_connection
+from pages.common.recurrence import expand, next_occurrence, next_occurrences, occurrence_dates
+from pages.common.rollup import EXPENSE, add_to_rollup, refresh_buckets
 
-load_dotenv()
-
-def get_db_connection():
-
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME")
-    )
 
 def get_all_recurring_transactions():
 
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)  # Use dictionary=True to return results as dicts
@@ -36,30 +31,41 @@ def get_all_recurring_transactions():
 
 def insert_recurring_transaction(name, amount, recurrence, start_date, end_date, category, user_id):
     """
-    Insert a new recurring transaction into the database and populate expenses_tracker.
+    Insert a new recurring transaction and its occurrences up to today into
+    expenses_tracker in one transaction.
     """
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
-        str_start_date = datetime.strptime(start_date, "%m/%d/%Y")
+        start_date = datetime.strptime(start_date, "%m/%d/%Y").date()
+        end_date = datetime.strptime(end_date, "%m/%d/%Y").date()
 
-        str_end_date = datetime.strptime(end_date, "%m/%d/%Y")
-        formatted_start_date = str_start_date.strftime("%Y-%m-%d")
-        formatted_end_date = str_end_date.strftime("%Y-%m-%d")
+        # Occurrences up to today are recorded now. Later ones are projected
+        # on read (common.projection) and recorded by
+        # process_recurring_transactions as they fall due.
+        last = min(date.today(), end_date)
+        next_due_date = next_occurrence(start_date, recurrence, last)
 
         # Insert recurring transaction
         query = """
-        INSERT INTO recurring_transactions (name, amount, recurrence, start_date, end_date, category, user_id)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO recurring_transactions (name, amount, recurrence, start_date, end_date, next_due_date, category, user_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (name, amount, recurrence, formatted_start_date, formatted_end_date, category, user_id))
-        connection.commit()
+        cursor.execute(query, (name, amount, recurrence, start_date, end_date, next_due_date, category, user_id))
+        recurring_id = cursor.lastrowid
 
-        # Call function to populate expenses_tracker
-        insert_recurring_to_tracker(user_id, name, amount, category, start_date, end_date, recurrence)
-        check_budget_exceeded(user_id)
-        print("Recurring transaction and expenses tracker records added successfully!")
+        dates = occurrence_dates(start_date, recurrence, start_date, last)
+        alerts = insert_recurring_to_tracker(cursor, recurring_id, user_id, name, amount, category, dates)
+        connection.commit()
+        invalidate(user_id, RECURRING, EXPENSE_RECORDS)
+        budget_state.publish(user_id, alerts)
+        scheduler.notify(SCHEDULE_TOPIC, next_due_date)
+        print(f"Recurring transaction added with {len(dates)} {recurrence} expenses")
     except mysql.connector.Error as err:
+        if connection:
+            connection.rollback()
         print(f"Error: {err}")
     finally:
         if cursor:
@@ -70,15 +76,43 @@ def insert_recurring_transaction(name, amount, recurrence, start_date, end_date,
 
 
 def delete_recurring_transaction(recurring_id):
-
+    """
+    Delete a recurring transaction. Occurrences up to today stay as spending
+    history; any recorded after today (before occurrences were projected) go.
+    """
+    connection = None
+    cursor = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor()
-        query = "DELETE FROM recurring_transactions WHERE recurring_id = %s"
-        cursor.execute(query, (recurring_id,))
+        cursor.execute("SELECT user_id FROM recurring_transactions WHERE recurring_id = %s", (recurring_id,))
+        schedule = cursor.fetchone()
+        if schedule is None:
+            print(f"Recurring transaction with ID {recurring_id} not found.")
+            return
+        user_id = schedule[0]
+
+        today = date.today()
+        cursor.execute(
+            "SELECT category, date, amount FROM expenses_tracker WHERE recurring_id = %s AND date > %s",
+            (recurring_id, today)
+        )
+        future = cursor.fetchall()
+        cursor.execute("DELETE FROM expenses_tracker WHERE recurring_id = %s AND date > %s", (recurring_id, today))
+        cursor.execute("DELETE FROM recurring_transactions WHERE recurring_id = %s", (recurring_id,))
+
+        refresh_buckets(cursor, user_id, EXPENSE, [(category, row_date) for category, row_date, _ in future])
+        alerts = budget_state.apply_expense_changes(
+            cursor, user_id, [(category, row_date, -amount) for category, row_date, amount in future]
+        )
         connection.commit()
-        print(f"Recurring transaction with ID {recurring_id} deleted successfully.")
+        invalidate(user_id, RECURRING, EXPENSE_RECORDS)
+        budget_state.publish(user_id, alerts)
+        scheduler.notify(SCHEDULE_TOPIC)
+        print(f"Recurring transaction with ID {recurring_id} deleted with {len(future)} future expenses.")
     except mysql.connector.Error as err:
+        if connection:
+            connection.rollback()
         print(f"Error: {err}")
     finally:
         if cursor:
@@ -86,7 +120,9 @@ def delete_recurring_transaction(recurring_id):
         if connection:
             connection.close()
 
+@cached(CATEGORIES)
 def get_expenses_categories(user_id):
+    connection = None
     try:
         connection = get_db_connection()
         cursor = connection.cursor(dictionary=True)
@@ -103,52 +139,132 @@ def get_expenses_categories(user_id):
         return category_names
     except Exception as e:
         raise Exception(f"Error fetching expense categories: {e}")
+    finally:
+        if connection:
+            connection.close()
 
-def insert_recurring_to_tracker(user_id, name, amount, category, start_date, end_date, recurrence):
+# Occurrence rows per multi-row INSERT
+MATERIALIZE_CHUNK_SIZE = 1000
+
+
+def insert_recurring_to_tracker(cursor, recurring_id, user_id, name, amount, category, dates):
     """
-    Inserts recurring expense records into the expenses_tracker table based on the recurrence type.
+    Insert one expenses_tracker row per date for a recurring transaction, on the
+    caller's cursor so it commits with the schedule. Returns the budget alerts
+    to publish once committed.
     """
-    try:
-        # Parse dates from MM/DD/YYYY and convert to datetime objects
-        current_date = datetime.strptime(start_date, "%m/%d/%Y")
-        end_date = datetime.strptime(end_date, "%m/%d/%Y")
+    _insert_occurrences(
+        cursor, [(name, amount, category, occurrence, user_id, recurring_id) for occurrence in dates]
+    )
+    created = [(category, occurrence, amount) for occurrence in dates]
+    add_to_rollup(cursor, user_id, EXPENSE, created)
+    return budget_state.apply_expense_changes(cursor, user_id, created)
+
+
+def _insert_occurrences(cursor, rows):
+    """rows: (description, amount, category, date, user_id, recurring_id)"""
+    query = """
+        INSERT INTO expenses_tracker (description, amount, category, date, user_id, recurring_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    # executemany sends each chunk as a single multi-row INSERT
+    for start in range(0, len(rows), MATERIALIZE_CHUNK_SIZE):
+        cursor.executemany(query, rows[start:start + MATERIALIZE_CHUNK_SIZE])
+
 
-        # Get database connection
+# Scheduler topic woken whenever a recurring transaction changes
+SCHEDULE_TOPIC = "recurring_transactions"
+
+
+def get_recurring_due_dates():
+    """next_due_date of every recurring transaction with occurrences left to record"""
+    connection = None
+    cursor = None
+    try:
         connection = get_db_connection()
         cursor = connection.cursor()
+        cursor.execute("SELECT next_due_date FROM recurring_transactions WHERE next_due_date <= end_date")
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        if cursor:
+            cursor.close()
+        if connection:
+            connection.close()
 
-        # Loop through the dates based on recurrence type
-        while current_date <= end_date:
-            # Convert date to YYYY-MM-DD format for database
-            formatted_date = current_date.strftime("%Y-%m-%d")
 
-            # Insert the current record into expenses_tracker
-            query = """
-                INSERT INTO expenses_tracker (description, amount, category, date, user_id)
-                VALUES (%s, %s, %s, %s, %s)
+def process_recurring_transactions():
+    """
+    Record every occurrence of recurring expenses that has fallen due and move
+    each next_due_date past today, in one transaction. Schedules another
+    process is recording are skipped, and the (recurring_id, date) key
+    rejects an occurrence recorded twice.
+    """
+    connection = None
+    cursor = None
+    try:
+        connection = get_db_connection()
+        cursor = connection.cursor(dictionary=True)
+        today = date.today()
+
+        cursor.execute(
             """
-            cursor.execute(query, (name, amount, category, formatted_date, user_id))
-
-            # Move to the next date based on the recurrence
-            if recurrence == "Daily":
-                current_date += timedelta(days=1)
-            elif recurrence == "Monthly":
-                next_month = current_date.month + 1 if current_date.month < 12 else 1
-                next_year = current_date.year + (1 if next_month == 1 else 0)
-                current_date = current_date.replace(year=next_year, month=next_month)
-            elif recurrence == "Yearly":
-                current_date = current_date.replace(year=current_date.year + 1)
-
-        # Commit the transaction
+            SELECT recurring_id, user_id, name, amount, category, recurrence, start_date, end_date, next_due_date
+            FROM recurring_transactions
+            WHERE next_due_date <= %s AND next_due_date <= end_date
+            FOR UPDATE SKIP LOCKED
+            """,
+            (today,)
+        )
+        due = cursor.fetchall()
+        if not due:
+            return True, "Recorded 0 recurring expenses"
+
+        anchors = [schedule["start_date"] for schedule in due]
+        recurrences = [schedule["recurrence"] for schedule in due]
+        lasts = [min(today, schedule["end_date"]) for schedule in due]
+        indexes, dates = expand(anchors, recurrences, [schedule["next_due_date"] for schedule in due], lasts)
+        next_dates = next_occurrences(anchors, recurrences, lasts)
+
+        # All schedules' occurrences go in together, then the rollup and
+        # budget state move once per user
+        records = []
+        created = defaultdict(list)
+        for index, occurrence in zip(indexes.tolist(), dates.tolist()):
+            schedule = due[index]
+            records.append((schedule["name"], schedule["amount"], schedule["category"],
+                            occurrence, schedule["user_id"], schedule["recurring_id"]))
+            created[schedule["user_id"]].append((schedule["category"], occurrence, schedule["amount"]))
+        _insert_occurrences(cursor, records)
+
+        alerts = defaultdict(list)
+        for user_id, rows in created.items():
+            add_to_rollup(cursor, user_id, EXPENSE, rows)
+            alerts[user_id] = budget_state.apply_expense_changes(cursor, user_id, rows)
+
+        ids = [schedule["recurring_id"] for schedule in due]
+        cases = " ".join(["WHEN %s THEN %s"] * len(ids))
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"""
+            UPDATE recurring_transactions
+            SET next_due_date = CASE recurring_id {cases} END
+            WHERE recurring_id IN ({placeholders})
+            """,
+            [value for pair in zip(ids, next_dates) for value in pair] + ids
+        )
         connection.commit()
-        print(f"Inserted records into expenses_tracker for {recurrence} recurrence.")
 
-    except Exception as e:
-        print(f"Error inserting recurring expenses into tracker: {e}")
+        for user_id in {schedule["user_id"] for schedule in due}:
+            invalidate(user_id, RECURRING, EXPENSE_RECORDS)
+            budget_state.publish(user_id, alerts[user_id])
+        return True, f"Recorded {len(indexes)} recurring expenses for {len(due)} schedules"
+    except mysql.connector.Error as err:
+        if connection:
+            connection.rollback()
+        print(f"Error processing recurring transactions: {err}")
+        return False, f"Error: {err}"
     finally:
         if cursor:
             cursor.close()
         if connection:
             connection.close()
-
-
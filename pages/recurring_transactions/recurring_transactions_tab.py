@@ -3,19 +3,25 @@ from tkinter import ttk, messagebox
 from .database import insert_recurring_transaction, get_all_recurring_transactions, delete_recurring_transaction, get_expenses_categories
 from datetime import datetime
 from tkcalendar import DateEntry
+from pages.common.executor import LatestRequest, busy_cursor, submit
 from datetime import date, timedelta
 
 def create_recurring_transactions_tab(notebook, user_id):
     #load category
     def load_categories():
-        try:
-            categories = get_expenses_categories(user_id)
+        def show_categories(categories):
             category_combobox['values'] = categories
-        except Exception as e:
-            messagebox.showerror("Database Error", f"Error loading categories: {e}")
+
+        categories_loader.submit(
+            get_expenses_categories, user_id,
+            on_success=show_categories,
+            on_error=lambda e: messagebox.showerror("Database Error", f"Error loading categories: {e}")
+        )
 
     tab_frame = ttk.Frame(notebook)
     tab_frame.pack(fill=tk.BOTH, expand=True)
+    categories_loader = LatestRequest()
+    transactions_loader = LatestRequest(on_busy=busy_cursor(tab_frame))
 
     # Label for the tab
     tk.Label(tab_frame, text="Recurring Expenses", font=("Arial", 16)).pack(pady=10)
@@ -35,7 +41,7 @@ def create_recurring_transactions_tab(notebook, user_id):
 
     ttk.Label(form_frame, text="Recurrence:").grid(row=2, column=0, padx=5, pady=5)
     recurrence_combobox = ttk.Combobox(
-        form_frame, values=["Daily", "Monthly", "Yearly"], state="readonly", width=18
+        form_frame, values=["Daily", "Weekly", "Monthly", "Yearly"], state="readonly", width=18
     )
     recurrence_combobox.grid(row=2, column=1, padx=5, pady=5)
 
@@ -75,8 +81,15 @@ def create_recurring_transactions_tab(notebook, user_id):
 
     # Load existing transactions from the database
     def load_transactions():
+        transactions_loader.submit(
+            get_all_recurring_transactions,
+            on_success=show_transactions,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load transactions: {e}")
+        )
+
+    def show_transactions(transactions):
+        transaction_table.delete(*transaction_table.get_children())
         try:
-            transactions = get_all_recurring_transactions()
             for transaction in transactions:
                 transaction_table.insert("", "end", values=(
                     transaction["recurring_id"],
@@ -113,25 +126,24 @@ def create_recurring_transactions_tab(notebook, user_id):
             messagebox.showerror("Error", "Amount must be a number!")
             return
 
-        # insert to  database
-        try:
-            insert_recurring_transaction(name, amount, recurrence, start_date, end_date, category, user_id)  # Insert into the database
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to add transaction to the database: {e}")
-            return
-
-        # reload the table
-        transaction_table.delete(*transaction_table.get_children())
-        load_transactions()
+        def on_added(_):
+            # reload the table
+            load_transactions()
 
+            # clear input fields
+            expense_name_entry.delete(0, tk.END)
+            expense_amount_entry.delete(0, tk.END)
+            recurrence_combobox.set("")
+            start_date_picker.delete(0, tk.END)
 
-        # clear input fields
-        expense_name_entry.delete(0, tk.END)
-        expense_amount_entry.delete(0, tk.END)
-        recurrence_combobox.set("")
-        start_date_picker.delete(0, tk.END)
+            messagebox.showinfo("Success", "Recurring transaction added!")
 
-        messagebox.showinfo("Success", "Recurring transaction added!")
+        # insert to database in the background
+        submit(
+            insert_recurring_transaction, name, amount, recurrence, start_date, end_date, category, user_id,
+            on_success=on_added,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to add transaction to the database: {e}")
+        )
 
     # delete function
     def delete_selected_transaction():
@@ -148,18 +160,15 @@ def create_recurring_transactions_tab(notebook, user_id):
             recurring_id = item["values"][0]  # ID is the first column
 
 
-            try:
-                delete_recurring_transaction(recurring_id)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to delete transaction from the database: {e}")
-                return
-
-
-            transaction_table.delete(*transaction_table.get_children())
-            load_transactions()
-
+            def on_deleted(_):
+                load_transactions()
+                messagebox.showinfo("Success", "Transaction deleted successfully.")
 
-            messagebox.showinfo("Success", "Transaction deleted successfully.")
+            submit(
+                delete_recurring_transaction, recurring_id,
+                on_success=on_deleted,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to delete transaction from the database: {e}")
+            )
 
 
 
@@ -1,29 +1,46 @@
-from pages.income_tracking.database import process_recurring_income
-import time
+from pages.income_tracking.database import SCHEDULE_TOPIC, get_recurring_due_dates, process_recurring_income
+from pages.common.scheduler import DueDateScheduler
+import argparse
 import sys
 from datetime import datetime
 
-def run_processor():
+def catch_up(shard=None):
+    """Post every missed occurrence once and report the throughput"""
+    success, message = process_recurring_income(shard)
+    print(message if success else f"Error: {message}")
+    return 0 if success else 1
+
+def run_processor(shard=None):
     """Run the recurring income processor service"""
     print("Starting Recurring Income Processor Service")
     print(f"Started at: {datetime.now()}")
-    
+    if shard is not None:
+        print(f"Handling users with user_id % {shard[1]} == {shard[0]}")
+
+    # Sleeps until the earliest schedule falls due; schedules edited from a
+    # client are picked up when the scheduler reloads its due dates
+    scheduler = DueDateScheduler(
+        SCHEDULE_TOPIC,
+        lambda: get_recurring_due_dates(shard),
+        lambda: process_recurring_income(shard)
+    )
     try:
-        while True:
-            try:
-                success, message = process_recurring_income()
-                if success:
-                    print(f"[{datetime.now()}] {message}")
-                else:
-                    print(f"[{datetime.now()}] Error: {message}")
-            except Exception as e:
-                print(f"[{datetime.now()}] Error in processor: {e}")
-            
-            # Sleep for 1 hour before next check
-            time.sleep(3600)
+        scheduler.run()
     except KeyboardInterrupt:
         print("\nShutting down Recurring Income Processor Service")
+        scheduler.stop()
         sys.exit(0)
 
 if __name__ == "__main__":
-    run_processor() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Post recurring income as it falls due")
+    parser.add_argument("--once", action="store_true", help="catch up once and exit")
+    parser.add_argument("--shards", type=int, default=1, help="number of workers splitting the users")
+    parser.add_argument("--shard", type=int, default=0, help="this worker's shard, 0 to shards-1")
+    args = parser.parse_args()
+    if not 0 <= args.shard < args.shards:
+        parser.error("--shard must be between 0 and --shards - 1")
+    shard = (args.shard, args.shards) if args.shards > 1 else None
+
+    if args.once:
+        sys.exit(catch_up(shard))
+    run_processor(shard)
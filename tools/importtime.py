@@ -0,0 +1,81 @@
+"""Profile what `import main` loads at startup and hold it to a budget.
+
+Runs a fresh interpreter with -X importtime, so nothing is cached from this
+process, and reports the slowest top-level imports. Fails when the total
+exceeds the budget or when one of the heavy optional dependencies is pulled
+in eagerly - those belong inside the function that needs them.
+
+    python -m tools.importtime                  # exits 1 when over budget
+    python -m tools.importtime --budget-ms 400 --top 25
+"""
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_BUDGET_MS = 500
+
+# Only loaded by the tab or action that uses them
+DEFERRED = [
+    "matplotlib", "pandas", "numpy", "reportlab", "openpyxl", "PIL",
+    "requests", "speech_recognition", "pyttsx3",
+]
+
+LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module):
+    """Return [(self_us, cumulative_us, depth, name)] for a cold import of module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip()}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # Nested imports are indented two spaces per level
+            rows.append((int(self_us), int(cumulative_us), (len(indent) - 1) // 2, name))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check startup import time against a budget")
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="number of top-level imports to list")
+    args = parser.parse_args()
+
+    try:
+        rows = profile(args.module)
+    except RuntimeError as e:
+        print(e)
+        return 1
+
+    top_level = sorted((row for row in rows if row[2] == 0), key=lambda row: row[1], reverse=True)
+    total_ms = sum(row[1] for row in top_level) / 1000
+
+    print(f"{'cumulative ms':>14}  {'self ms':>8}  module")
+    for self_us, cumulative_us, _, name in top_level[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>8.1f}  {name}")
+    print(f"Total import time for '{args.module}': {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = sorted({row[3].split(".")[0] for row in rows} & set(DEFERRED))
+    if eager:
+        failed = True
+        print("Imported at startup but should be deferred: " + ", ".join(eager))
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"Over budget by {total_ms - args.budget_ms:.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""Reject non-sargable date predicates in the database.py query strings.
+
+Wrapping a date column in a function inside WHERE / ON / HAVING (for example
+MONTH(date) = ...) stops MySQL from using the (user_id, date) indexes, so
+every call scans the user's whole history. Use the half-open ranges from
+pages.common.periods instead. Function calls in the SELECT list or GROUP BY
+are fine and are not reported.
+
+    python -m tools.lint_queries          # exits 1 when violations are found
+"""
+import ast
+import re
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DATE_COLUMNS = r"(?:date|next_date|next_due_date|start_date|end_date|created_at)"
+WRAPPED_DATE = re.compile(
+    r"\b(?:MONTH|YEAR|DAY|DAYOFMONTH|WEEK|QUARTER|DATE|DATE_FORMAT|EXTRACT|TO_DAYS|UNIX_TIMESTAMP)"
+    r"\s*\(\s*(?:\w+\s+FROM\s+)?(?:\w+\.)?" + DATE_COLUMNS + r"\b",
+    re.IGNORECASE,
+)
+# Predicate clauses run from their keyword to the next clause boundary
+PREDICATE = re.compile(
+    r"\b(?:WHERE|ON|HAVING)\b(.*?)(?=\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|UNION|LEFT\s+JOIN|"
+    r"RIGHT\s+JOIN|INNER\s+JOIN|JOIN|WHERE)\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+SQL_HINT = re.compile(r"\b(?:SELECT|UPDATE|DELETE|INSERT)\b", re.IGNORECASE)
+
+
+def query_strings(path):
+    """Yield (line, text) for every string constant in the module that looks like SQL"""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and SQL_HINT.search(node.value):
+            yield node.lineno, node.value
+
+
+def check_file(path):
+    problems = []
+    for lineno, text in query_strings(path):
+        for clause in PREDICATE.finditer(text):
+            for match in WRAPPED_DATE.finditer(clause.group(1)):
+                problems.append((lineno, match.group(0)))
+    return problems
+
+
+def main():
+    failed = False
+    for path in sorted(ROOT.glob("pages/*/database.py")):
+        for lineno, snippet in check_file(path):
+            failed = True
+            print(f"{path.relative_to(ROOT)}:{lineno}: function-wrapped date column in predicate: {snippet}")
+    if not failed:
+        print("No function-wrapped date predicates found")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())